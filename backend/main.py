@@ -9,6 +9,7 @@ from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel, Field
 import json
 import logging
+from dataclasses import asdict
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 import os
@@ -26,8 +27,11 @@ from tec_tgcr.core.ethics import (
     ResonanceAxioms,
     AxiomViolation,
     parse_consent_emoji,
-    score_consent_risk,
+    consent_risk_table,
+    WHY,
 )
+from tec_tgcr.core.consent_trajectory import ConsentTrajectoryTracker
+from tec_tgcr.core.reason_trace import reason_traces
 
 # Load environment
 load_dotenv()
@@ -206,6 +210,9 @@ class ResonanceEngine:
 # Global engine instance
 engine = ResonanceEngine()
 
+# Per-session ConsentOS history (CONSENT_TRAJECTORY_* env vars)
+consent_trajectories = ConsentTrajectoryTracker.from_env(os.environ)
+
 # ============================================================================
 # PYDANTIC MODELS
 # ============================================================================
@@ -228,6 +235,7 @@ class MessageResponse(BaseModel):
     axioms_enforced: bool
     timestamp: str
     session_id: str
+    decision_id: Optional[str] = None  # Pass to /api/why when sampled
 
 # ============================================================================
 # ROUTES
@@ -252,8 +260,21 @@ async def health():
         "resonance_engine": "operational",
         "frequencies": engine.frequencies,
         "conscience": engine.conscience,
+        "rag": rag_health(),
+        "consent_scoring": consent_risk_table.get_stats(),
+        "consent_trajectories": consent_trajectories.get_stats(),
+        "reason_traces": reason_traces.get_stats(),
     }
 
+
+def rag_health() -> Dict[str, Any]:
+    """RAG readiness: "cold", "warming", "ready" or "failed" (never loads the model)"""
+    try:
+        from tec_tgcr.rag_system import get_rag_health
+    except ImportError as e:
+        return {"status": "unavailable", "error": str(e)}
+    return get_rag_health()
+
 @app.post("/api/resonance/calculate")
 async def calculate_resonance(
     context: Dict[str, Any],
@@ -302,8 +323,10 @@ async def send_message(request: MessageRequest):
         # Parse ConsentOS emoji signals from user message
         consent_state = parse_consent_emoji(request.user_message)
         
-        # Score consent risk (0-5)
-        scoring = score_consent_risk(consent_state)
+        # Score consent risk (0-5), taking the session's recent signals into account
+        scoring = consent_trajectories.score(request.session_id, consent_state)
+        if request.user_terminated:
+            consent_trajectories.end(request.session_id)
         
         # AXIOM ENFORCEMENT: Validate continuity before processing
         try:
@@ -330,7 +353,10 @@ async def send_message(request: MessageRequest):
         response_mode = scoring.response_mode.value
         
         # AXIOM ENFORCEMENT: Crisis protocol (Axiom 2: Responsibility Circuit)
+        axioms = ("CONTINUITY_GUARANTEE", "UNCONDITIONAL_WITNESSING")
+        filters: tuple = ()
         if response_mode == "CRISIS":
+            axioms = ("CONTINUITY_GUARANTEE", "RESPONSIBILITY_CIRCUIT", "UNCONDITIONAL_WITNESSING")
             try:
                 ResonanceAxioms.validate_responsibility_circuit(
                     is_crisis=True,
@@ -355,6 +381,10 @@ async def send_message(request: MessageRequest):
         except AxiomViolation as e:
             logger.warning(f"Deflection detected: {e}, rewriting response")
             assistant_response = "I'm here. What's happening right now?"
+            filters = ("deflection_rewritten",)
+        
+        # WHY() trace of the decisions above (sampled; CRISIS always)
+        decision_id = reason_traces.record(consent_state, scoring, axioms, filters)
         
         response = MessageResponse(
             user_message=request.user_message,
@@ -370,11 +400,13 @@ async def send_message(request: MessageRequest):
                 "risk_level": scoring.risk_level,
                 "response_mode": response_mode,
                 "suggestions": scoring.suggestions,
+                "trajectory": scoring.trajectory,
             },
             response_mode=response_mode,
             axioms_enforced=True,
             timestamp=datetime.utcnow().isoformat(),
             session_id=request.session_id,
+            decision_id=decision_id,
         )
         
         return response
@@ -384,6 +416,19 @@ async def send_message(request: MessageRequest):
         logger.error(f"Error processing message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/why/{decision_id}")
+def why(decision_id: str):
+    """
+    Explain a /api/message decision (Reason Trace Spec v0.1)
+
+    Plain ``def``: older decisions are looked up by scanning the JSONL
+    file, so FastAPI runs this in its threadpool, off the event loop.
+    """
+    try:
+        return asdict(WHY(decision_id, reason_traces))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No reason trace for decision {decision_id}")
+
 @app.websocket("/ws/chat/{session_id}")
 async def websocket_chat(websocket: WebSocket, session_id: str):
     """
@@ -489,10 +534,20 @@ async def startup():
     logger.info("🌀 LuminAI Resonance Platform starting...")
     logger.info(f"📚 Conscience protocols active: {engine.conscience}")
     logger.info(f"🎵 All 16 Frequencies loaded: {sum(1 for v in engine.frequencies.values() if v)}/16")
+    
+    # Load the RAG encoder in the background so the first user doesn't wait for it
+    if os.getenv("RAG_WARMUP", "1") != "0":
+        try:
+            from tec_tgcr.rag_system import start_rag_warmup
+            start_rag_warmup()
+            logger.info("🔥 RAG warmup started")
+        except ImportError as e:
+            logger.warning(f"⚠️ RAG warmup skipped: {e}")
 
 @app.on_event("shutdown")
 async def shutdown():
     logger.info("🌀 LuminAI Resonance Platform shutting down...")
+    reason_traces.close()
 
 # ============================================================================
 # RUN
@@ -0,0 +1,304 @@
+"""
+Conversation Store
+
+Append-only multi-LLM conversation logs in SQLite (WAL mode).
+
+- Writes: every append goes through one writer thread, which commits
+  whatever is queued (up to ``max_batch_size`` appends, waiting at most
+  ``flush_interval`` seconds) as a single transaction. Callers get a future
+  that resolves once their messages are durable. If a batch fails, its
+  appends are retried one by one so only the bad ones fail.
+- Reads: per-thread connections, closed with the store; WAL lets them run
+  while the writer commits.
+- Messages are keyed (conversation_id, seq), so the latest page of any
+  conversation is an index range scan: O(page size), not O(conversation).
+- Exports iterate in keyset-paginated chunks and never hold a whole
+  conversation in memory.
+
+Environment:
+- CONVERSATION_DB_PATH: database file (default data/conversations.db)
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    resonance_score REAL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    persona TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (conversation_id, seq)
+) WITHOUT ROWID;
+"""
+
+PERSONA_TITLES = {"user": "User", "claude": "Claude", "openai": "GPT-4", "xai": "Grok"}
+
+_STOP = object()
+
+
+class ConversationStore:
+    """SQLite-backed append-only conversation log with a batching writer"""
+
+    def __init__(self,
+                 path: str,
+                 max_batch_size: int = 256,
+                 flush_interval: float = 0.005):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self.appended = 0
+        self.batches = 0
+        self.errors = 0
+
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+        self._writer = threading.Thread(target=self._run, name="conversation-writer", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str]) -> "ConversationStore":
+        return cls(env.get("CONVERSATION_DB_PATH", "data/conversations.db"))
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: durable across application crashes, one fsync per checkpoint
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=5000")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+            with self._readers_lock:
+                self._readers.append(connection)
+        return connection
+
+    # ------------------------------------------------------------------ writes
+
+    def append(self,
+               conversation_id: str,
+               messages: List[Dict[str, str]],
+               resonance_score: Optional[float] = None) -> Future:
+        """
+        Queue ``messages`` ({"persona", "content"}) for the next batch
+
+        The future resolves to the conversation's message count after commit.
+        """
+        future: Future = Future()
+        self._queue.put((conversation_id, messages, resonance_score, future))
+        return future
+
+    def _run(self) -> None:
+        connection = self._connect()
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(connection, batch)
+            if stop:
+                break
+        connection.close()
+
+    def _write(self, connection: sqlite3.Connection, batch: List[Tuple]) -> None:
+        try:
+            counts = self._commit(connection, batch)
+        except Exception as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            if len(batch) > 1:
+                logger.warning(f"⚠️ Conversation batch of {len(batch)} appends failed ({e}), retrying one by one")
+                for item in batch:
+                    self._write(connection, [item])
+                return
+            self.errors += 1
+            logger.error(f"❌ Conversation append to {batch[0][0]} failed: {e}")
+            batch[0][3].set_exception(e)
+            return
+
+        self.batches += 1
+        self.appended += sum(len(messages) for _, messages, _, _ in batch)
+        # Each caller sees the count as of its own append
+        running = dict(counts)
+        for conversation_id, messages, _, future in reversed(batch):
+            future.set_result(running[conversation_id])
+            running[conversation_id] -= len(messages)
+
+    def _commit(self, connection: sqlite3.Connection, batch: List[Tuple]) -> Dict[str, int]:
+        """One transaction for ``batch``; returns each conversation's final message count"""
+        now = time.time()
+        counts: Dict[str, int] = {}
+        connection.execute("BEGIN IMMEDIATE")
+        for conversation_id, messages, resonance_score, _ in batch:
+            if conversation_id not in counts:
+                row = connection.execute(
+                    "SELECT message_count FROM conversations WHERE id = ?", (conversation_id,)
+                ).fetchone()
+                if row is None:
+                    connection.execute(
+                        "INSERT INTO conversations (id, created_at, updated_at) VALUES (?, ?, ?)",
+                        (conversation_id, now, now)
+                    )
+                counts[conversation_id] = row[0] if row else 0
+            start = counts[conversation_id]
+            connection.executemany(
+                "INSERT INTO messages (conversation_id, seq, persona, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(conversation_id, start + i, m["persona"], m["content"], now) for i, m in enumerate(messages)]
+            )
+            counts[conversation_id] = start + len(messages)
+            if resonance_score is not None:
+                connection.execute(
+                    "UPDATE conversations SET resonance_score = ? WHERE id = ?", (resonance_score, conversation_id)
+                )
+        connection.executemany(
+            "UPDATE conversations SET message_count = ?, updated_at = ? WHERE id = ?",
+            [(count, now, conversation_id) for conversation_id, count in counts.items()]
+        )
+        connection.execute("COMMIT")
+        return counts
+
+    def close(self) -> None:
+        """Commit everything queued, stop the writer and close reader connections"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+            self._local = threading.local()
+        for connection in readers:
+            connection.close()
+
+    # ------------------------------------------------------------------- reads
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        row = self._reader().execute(
+            "SELECT created_at, updated_at, message_count, resonance_score FROM conversations WHERE id = ?",
+            (conversation_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "conversation_id": conversation_id,
+            "created_at": row[0],
+            "updated_at": row[1],
+            "message_count": row[2],
+            "resonance_score": row[3],
+        }
+
+    def page(self,
+             conversation_id: str,
+             before: Optional[int] = None,
+             limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Up to ``limit`` messages older than seq ``before`` (latest page when
+        None), oldest first, plus the cursor for the next older page
+        """
+        rows = self._reader().execute(
+            "SELECT seq, persona, content, created_at FROM messages "
+            "WHERE conversation_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+            (conversation_id, before if before is not None else 2 ** 62, limit)
+        ).fetchall()
+        rows.reverse()
+        messages = [
+            {"seq": seq, "persona": persona, "content": content, "created_at": created_at}
+            for seq, persona, content, created_at in rows
+        ]
+        next_cursor = rows[0][0] if len(rows) == limit and rows[0][0] > 0 else None
+        return messages, next_cursor
+
+    def iter_messages(self, conversation_id: str, chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Every message in order, fetched ``chunk_size`` at a time"""
+        after = -1
+        connection = self._reader()
+        while True:
+            rows = connection.execute(
+                "SELECT seq, persona, content, created_at FROM messages "
+                "WHERE conversation_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (conversation_id, after, chunk_size)
+            ).fetchall()
+            for seq, persona, content, created_at in rows:
+                yield {"seq": seq, "persona": persona, "content": content, "created_at": created_at}
+            if len(rows) < chunk_size:
+                return
+            after = rows[-1][0]
+
+    def export_markdown(self, conversation_id: str) -> Iterator[str]:
+        yield f"# Multi-LLM Conversation {conversation_id}\n"
+        for message in self.iter_messages(conversation_id):
+            yield f"\n## {PERSONA_TITLES.get(message['persona'], message['persona'])}\n\n{message['content']}\n"
+
+    def export_json(self, conversation_id: str) -> Iterator[str]:
+        meta = self.get_conversation(conversation_id) or {"conversation_id": conversation_id}
+        yield json.dumps(meta, ensure_ascii=False)[:-1] + ', "messages": ['
+        for i, message in enumerate(self.iter_messages(conversation_id)):
+            yield ("," if i else "") + json.dumps(message, ensure_ascii=False)
+        yield "]}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "pending": self._queue.qsize(),
+            "appended": self.appended,
+            "batches": self.batches,
+            "errors": self.errors,
+        }
+
+
+_store: Optional[ConversationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    """Process-wide store, opened on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ConversationStore.from_env(os.environ)
+    return _store
+
+
+def close_conversation_store() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
@@ -0,0 +1,376 @@
+"""
+LLM Provider Gateway
+
+Every provider call goes through here:
+
+1. Circuit breaker: after ``failure_threshold`` consecutive failures a
+   provider fails fast for ``reset_timeout`` seconds, then one probe decides
+   whether it is back
+2. Token buckets (off by default): one per provider and one per API key;
+   callers wait up to ``rate_max_wait`` seconds for a token instead of
+   hammering a provider that is rate-limiting us, then fail fast
+3. Retries: 429 / 5xx / transport errors retried with full-jitter
+   exponential backoff (``Retry-After`` honored)
+4. Hedging (optional): when a call outlives the provider's latency
+   percentile a second identical request is raced against it
+
+Environment:
+- LLM_RATE_PER_SECOND / LLM_RATE_BURST: per-provider bucket (0 = unlimited)
+- LLM_KEY_RATE_PER_SECOND / LLM_KEY_RATE_BURST: per-API-key bucket (0 = unlimited)
+- LLM_RATE_MAX_WAIT: longest wait for a rate token before failing (seconds)
+- LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY
+- LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET_SECONDS
+- LLM_HEDGE=1, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 529: Anthropic "overloaded"
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504, 529})
+
+
+class LatencyTracker:
+    """Sliding window of recent latency samples (seconds) per provider"""
+
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+
+    def count(self, name: str) -> int:
+        return len(self._samples.get(name, ()))
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        samples = sorted(self._samples.get(name, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+    def get_stats(self) -> Dict[str, Dict[str, object]]:
+        return {
+            name: {
+                "samples": len(samples),
+                "p50_ms": round(self.percentile(name, 50) * 1000, 1),
+                "p95_ms": round(self.percentile(name, 95) * 1000, 1),
+                "p99_ms": round(self.percentile(name, 99) * 1000, 1),
+            }
+            for name, samples in self._samples.items() if samples
+        }
+
+
+class CircuitOpenError(RuntimeError):
+    """Provider is failing; call rejected without touching the network"""
+
+
+class RateLimitedError(RuntimeError):
+    """No rate token within the gateway's max wait; call rejected"""
+
+
+class TokenBucket:
+    """Classic token bucket; ``rate`` <= 0 means unlimited"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waits = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def release(self) -> None:
+        """Return an unused token"""
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """Take a token, sleeping until one is available
+
+        Raises ``RateLimitedError`` instead of sleeping past ``max_wait``
+        seconds (``None`` waits without bound).
+        """
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        waited = False
+        while not self.try_acquire():
+            delay = (1 - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise RateLimitedError(f"no rate token within {max_wait:g}s")
+            if not waited:
+                self.waits += 1
+                waited = True
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half_open probe -> closed"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        # open, or half_open with the probe outstanding: one new probe per reset_timeout
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info("✅ Circuit closed")
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state == "closed":
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class ProviderState:
+    """Breaker, bucket and counters for one provider"""
+
+    def __init__(self, breaker: CircuitBreaker, bucket: TokenBucket):
+        self.breaker = breaker
+        self.bucket = bucket
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+
+class ProviderGateway:
+    """Rate limiting, retries, hedging and circuit breaking for provider calls"""
+
+    def __init__(self,
+                 rate_per_second: float = 0.0,
+                 burst: float = 20.0,
+                 key_rate_per_second: float = 0.0,
+                 key_burst: float = 10.0,
+                 rate_max_wait: float = 5.0,
+                 max_retries: int = 2,
+                 retry_base_delay: float = 0.5,
+                 retry_max_delay: float = 8.0,
+                 breaker_threshold: int = 5,
+                 breaker_reset_seconds: float = 30.0,
+                 hedge: bool = False,
+                 hedge_percentile: float = 95.0,
+                 hedge_min_samples: int = 20):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.key_rate_per_second = key_rate_per_second
+        self.key_burst = key_burst
+        self.rate_max_wait = rate_max_wait
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+        self._providers: Dict[str, ProviderState] = {}
+        self._key_buckets: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str]) -> "ProviderGateway":
+        return cls(
+            rate_per_second=float(env.get("LLM_RATE_PER_SECOND", "0")),
+            burst=float(env.get("LLM_RATE_BURST", "20")),
+            key_rate_per_second=float(env.get("LLM_KEY_RATE_PER_SECOND", "0")),
+            key_burst=float(env.get("LLM_KEY_RATE_BURST", "10")),
+            rate_max_wait=float(env.get("LLM_RATE_MAX_WAIT", "5")),
+            max_retries=int(env.get("LLM_MAX_RETRIES", "2")),
+            retry_base_delay=float(env.get("LLM_RETRY_BASE_DELAY", "0.5")),
+            retry_max_delay=float(env.get("LLM_RETRY_MAX_DELAY", "8")),
+            breaker_threshold=int(env.get("LLM_BREAKER_THRESHOLD", "5")),
+            breaker_reset_seconds=float(env.get("LLM_BREAKER_RESET_SECONDS", "30")),
+            hedge=env.get("LLM_HEDGE", "0") == "1",
+            hedge_percentile=float(env.get("LLM_HEDGE_PERCENTILE", "95")),
+            hedge_min_samples=int(env.get("LLM_HEDGE_MIN_SAMPLES", "20"))
+        )
+
+    def state(self, provider: str) -> ProviderState:
+        state = self._providers.get(provider)
+        if state is None:
+            state = self._providers[provider] = ProviderState(
+                CircuitBreaker(self.breaker_threshold, self.breaker_reset_seconds),
+                TokenBucket(self.rate_per_second, self.burst)
+            )
+        return state
+
+    def key_bucket(self, provider: str, api_key: str) -> TokenBucket:
+        # Keys are only ever held as a digest
+        name = f"{provider}:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]}"
+        bucket = self._key_buckets.get(name)
+        if bucket is None:
+            bucket = self._key_buckets[name] = TokenBucket(self.key_rate_per_second, self.key_burst)
+        return bucket
+
+    async def admit(self, provider: str, api_key: str) -> ProviderState:
+        """Breaker check, then wait (bounded) for provider and key rate tokens"""
+        state = self.state(provider)
+        if not state.breaker.allow():
+            state.rejected += 1
+            raise CircuitOpenError(f"{provider} circuit open, retrying in <= {self.breaker_reset_seconds:.0f}s")
+        try:
+            await state.bucket.acquire(self.rate_max_wait)
+        except RateLimitedError as e:
+            state.rejected += 1
+            raise RateLimitedError(f"{provider} rate limited: {e}") from None
+        try:
+            await self.key_bucket(provider, api_key).acquire(self.rate_max_wait)
+        except RateLimitedError as e:
+            state.bucket.release()
+            state.rejected += 1
+            raise RateLimitedError(f"{provider} key rate limited: {e}") from None
+        state.requests += 1
+        return state
+
+    def record_result(self, provider: str, ok: bool) -> None:
+        """Feed one call outcome to the provider's breaker"""
+        state = self.state(provider)
+        if ok:
+            state.breaker.record_success()
+        else:
+            state.failures += 1
+            state.breaker.record_failure()
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, or the provider's Retry-After"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.retry_max_delay)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+
+    async def request(self,
+                      provider: str,
+                      api_key: str,
+                      send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Run ``send`` under the gateway's policies
+
+        Returns the final response (possibly a non-retryable 4xx, or the last
+        retryable error once retries are spent); raises on transport errors,
+        ``CircuitOpenError`` and ``RateLimitedError``.
+        """
+        state = self.state(provider)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                state.retries += 1
+            # Every attempt is admitted, so a breaker opened mid-retry stops the loop
+            await self.admit(provider, api_key)
+            started = time.monotonic()
+            error: Optional[Exception] = None
+            response = None
+            try:
+                response = await self._send(provider, api_key, state, send)
+            except httpx.TransportError as e:
+                error = e
+
+            if response is not None and response.status_code not in RETRYABLE_STATUS:
+                self.latency.record(provider, time.monotonic() - started)
+                self.record_result(provider, True)
+                return response
+
+            self.record_result(provider, False)
+            if attempt == self.max_retries:
+                break
+            delay = self.backoff(attempt, response.headers.get("retry-after") if response is not None else None)
+            status = response.status_code if response is not None else type(error).__name__
+            logger.warning(f"🔁 {provider} {status}, retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+        if error is not None:
+            raise error
+        return response
+
+    async def _send(self,
+                    provider: str,
+                    api_key: str,
+                    state: ProviderState,
+                    send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        if not self.hedge or self.latency.count(provider) < self.hedge_min_samples:
+            return await send()
+
+        threshold = self.latency.percentile(provider, self.hedge_percentile)
+        first = asyncio.ensure_future(send())
+        done, _ = await asyncio.wait({first}, timeout=threshold)
+        if done or not state.bucket.try_acquire():
+            return await first
+        # No spare rate tokens: hand back the provider token and keep waiting on the first request
+        if not self.key_bucket(provider, api_key).try_acquire():
+            state.bucket.release()
+            return await first
+
+        state.hedges += 1
+        second = asyncio.ensure_future(send())
+        pending = {first, second}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None or not pending:
+                        if task is second:
+                            state.hedge_wins += 1
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Dict[str, object]]:
+        latency = self.latency.get_stats()
+        return {
+            name: {
+                "circuit": state.breaker.state,
+                "circuit_trips": state.breaker.trips,
+                "requests": state.requests,
+                "failures": state.failures,
+                "retries": state.retries,
+                "rejected": state.rejected,
+                "rate_limited_waits": state.bucket.waits,
+                "hedges": state.hedges,
+                "hedge_wins": state.hedge_wins,
+                "latency": latency.get(name, {}),
+            }
+            for name, state in self._providers.items()
+        }
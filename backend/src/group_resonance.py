@@ -0,0 +1,257 @@
+"""
+Group Resonance Scoring
+
+Incremental resonance for multi-LLM conversations. Every appended message
+updates a few running statistics in O(embedding dim); scoring reads them
+without touching the transcript.
+
+Components (each in [0, 1]):
+- agreement_level: mean cosine between consecutive persona responses
+  (how well the models build on each other)
+- coherence: mean cosine between each message and the conversation
+  centroid before it (staying on one thread)
+- insight_depth: mean novelty of persona responses (distance from that
+  centroid) weighted by their relevance to the latest user message, so
+  off-topic drift does not count as insight
+
+resonance = mean of the three components.
+
+Embeddings are computed locally: the MiniLM encoder shared with the RAG
+system, or feature-hashed bag-of-words vectors when sentence-transformers
+is not installed.
+
+Environment:
+- RESONANCE_EMBEDDINGS: auto (default), minilm or hashed
+- RESONANCE_MAX_CONVERSATIONS: conversations kept in memory (LRU)
+"""
+
+import sys
+import zlib
+import logging
+import threading
+import importlib.util
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Add repo src/ to path for tec_tgcr imports
+src_path = Path(__file__).resolve().parents[2] / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from tec_tgcr.lexical_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+HASHED_DIM = 512
+
+
+def hashed_embedding(text: str, dim: int = HASHED_DIM) -> np.ndarray:
+    """Signed feature-hashing of tokens; stable across processes"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in tokenize(text):
+        h = zlib.crc32(token.encode("utf-8"))
+        vector[h % dim] += 1.0 if h & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def hashed_embeddings(texts: List[str]) -> np.ndarray:
+    return np.stack([hashed_embedding(t) for t in texts]) if texts else np.zeros((0, HASHED_DIM), np.float32)
+
+
+def default_encoder(mode: str = "auto") -> Callable[[List[str]], np.ndarray]:
+    """Batch encoder: MiniLM when available (``auto``/``minilm``), else hashed"""
+    if mode != "hashed" and importlib.util.find_spec("sentence_transformers") is not None:
+        from tec_tgcr.rag_system import get_shared_encoder
+
+        def encode(texts: List[str]) -> np.ndarray:
+            model = get_shared_encoder("all-MiniLM-L6-v2")
+            return np.asarray(model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+        return encode
+    if mode == "minilm":
+        raise ImportError("RESONANCE_EMBEDDINGS=minilm needs sentence-transformers")
+    if mode == "auto":
+        logger.info("📐 sentence-transformers not installed, resonance uses hashed embeddings")
+    return hashed_embeddings
+
+
+def _cos(a: np.ndarray, b: np.ndarray) -> float:
+    denom = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(a @ b) / denom if denom else 0.0
+
+
+class RunningMean:
+    __slots__ = ("count", "mean")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.mean += (value - self.mean) / self.count
+
+
+class ConversationResonance:
+    """Running statistics for one conversation"""
+
+    def __init__(self):
+        self.messages = 0
+        self.centroid_sum: Optional[np.ndarray] = None
+        self.last_response: Optional[np.ndarray] = None
+        self.last_user: Optional[np.ndarray] = None
+        self.agreement = RunningMean()
+        self.coherence = RunningMean()
+        self.insight = RunningMean()
+
+    def observe(self, persona: str, vector: np.ndarray) -> None:
+        if self.centroid_sum is not None:
+            centroid = self.centroid_sum / self.messages
+            similarity = max(_cos(vector, centroid), 0.0)
+            self.coherence.add(similarity)
+            if persona != "user":
+                relevance = max(_cos(vector, self.last_user), 0.0) if self.last_user is not None else 1.0
+                self.insight.add((1.0 - similarity) * relevance)
+        if persona == "user":
+            self.last_user = vector
+        else:
+            if self.last_response is not None:
+                self.agreement.add(max(_cos(vector, self.last_response), 0.0))
+            self.last_response = vector
+        self.centroid_sum = vector.copy() if self.centroid_sum is None else self.centroid_sum + vector
+        self.messages += 1
+
+    def score(self) -> Dict[str, Any]:
+        components = {
+            "agreement_level": round(self.agreement.mean, 4),
+            "coherence": round(self.coherence.mean, 4),
+            "insight_depth": round(self.insight.mean, 4),
+        }
+        return {
+            "resonance": round(sum(components.values()) / 3, 4),
+            "components": components,
+            "messages": self.messages,
+            "insights": _insights(components, self),
+        }
+
+
+def _insights(components: Dict[str, float], state: ConversationResonance) -> List[str]:
+    if state.messages < 2:
+        return ["Not enough messages yet to measure resonance"]
+    insights = []
+    if state.agreement.count:
+        insights.append(
+            "Strong alignment between persona responses" if components["agreement_level"] >= 0.7
+            else "Personas are diverging; responses build on each other weakly"
+        )
+    insights.append(
+        "Conversation holds a consistent thread" if components["coherence"] >= 0.6
+        else "Conversation drifts between topics"
+    )
+    if state.insight.count:
+        insights.append(
+            "Responses add relevant new ideas" if components["insight_depth"] >= 0.3
+            else "Responses mostly restate what was already said"
+        )
+    return insights
+
+
+class GroupResonanceTracker:
+    """Per-conversation resonance state (bounded LRU of conversations)"""
+
+    def __init__(self,
+                 encode: Optional[Callable[[List[str]], np.ndarray]] = None,
+                 max_conversations: int = 10000,
+                 embeddings: str = "auto"):
+        self._encode = encode
+        self.embeddings = embeddings
+        self.max_conversations = max_conversations
+        self._conversations: "OrderedDict[str, ConversationResonance]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str]) -> "GroupResonanceTracker":
+        return cls(
+            max_conversations=int(env.get("RESONANCE_MAX_CONVERSATIONS", "10000")),
+            embeddings=env.get("RESONANCE_EMBEDDINGS", "auto")
+        )
+
+    @property
+    def encode(self) -> Callable[[List[str]], np.ndarray]:
+        if self._encode is None:
+            self._encode = default_encoder(self.embeddings)
+        return self._encode
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return conversation_id in self._conversations
+
+    def observe(self,
+                conversation_id: str,
+                messages: Iterable[Dict[str, str]],
+                create: bool = True) -> bool:
+        """
+        Fold messages ({"persona", "content"}, oldest first) into the running state
+
+        With ``create=False`` a conversation the tracker does not hold (never
+        seen, or evicted) is left alone. Returns whether the messages were
+        folded in.
+        """
+        messages = list(messages)
+        if not messages:
+            return create or conversation_id in self._conversations
+        vectors = self.encode([m["content"] for m in messages])
+        with self._lock:
+            state = self._conversations.get(conversation_id)
+            if state is None:
+                if not create:
+                    return False
+                state = self._install(conversation_id, ConversationResonance())
+            self._conversations.move_to_end(conversation_id)
+            self._fold(state, messages, vectors)
+        return True
+
+    def rebuild(self,
+                conversation_id: str,
+                messages: Iterable[Dict[str, str]],
+                chunk_size: int = 500) -> None:
+        """
+        Replace the conversation's state with a replay of its whole transcript
+
+        The replay is folded into a fresh state, encoded ``chunk_size``
+        messages at a time, and installed once complete, so a concurrent
+        ``observe`` never sees it half-built. Nothing is installed for an
+        empty transcript.
+        """
+        state = ConversationResonance()
+        chunk: List[Dict[str, str]] = []
+        for message in messages:
+            chunk.append(message)
+            if len(chunk) == chunk_size:
+                self._fold(state, chunk, self.encode([m["content"] for m in chunk]))
+                chunk = []
+        if chunk:
+            self._fold(state, chunk, self.encode([m["content"] for m in chunk]))
+        if state.messages:
+            with self._lock:
+                self._install(conversation_id, state)
+
+    def _install(self, conversation_id: str, state: ConversationResonance) -> ConversationResonance:
+        self._conversations[conversation_id] = state
+        self._conversations.move_to_end(conversation_id)
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
+        return state
+
+    @staticmethod
+    def _fold(state: ConversationResonance, messages: List[Dict[str, str]], vectors: np.ndarray) -> None:
+        for message, vector in zip(messages, vectors):
+            state.observe(message["persona"], np.asarray(vector, dtype=np.float32))
+
+    def score(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self._conversations.get(conversation_id)
+            return state.score() if state is not None else None
@@ -14,6 +14,8 @@ import os
 from dotenv import load_dotenv
 import logging
 from routes import multi_llm, resonance_live
+from providers import clients as provider_clients
+from conversation_store import close_conversation_store
 from security import sanitize_log_input, sanitize_webhook_payload, validate_github_ref
 
 load_dotenv()
@@ -232,6 +234,8 @@ async def lifespan(app: FastAPI):
     logger.info('💬 Chat API: POST /api/message')
     logger.info('📊 Resonance: GET /api/resonance/calculate')
     yield
+    await provider_clients.aclose()
+    close_conversation_store()
     logger.info('🛑 Application shutdown')
 
 
@@ -252,11 +256,7 @@ app.add_middleware(
 )
 
 # Include routers
-app.include_router(
-    multi_llm.router,
-    prefix='/api',
-    tags=['multi-llm']
-)
+app.include_router(multi_llm.router)
 app.include_router(resonance_live.router)
 
 
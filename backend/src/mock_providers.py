@@ -0,0 +1,224 @@
+"""
+Mock LLM Provider Server
+
+Deterministic local stand-in for the Anthropic Messages API and the OpenAI /
+xAI Chat Completions API, regular and streaming, for offline load testing:
+
+    python backend/src/mock_providers.py --port 9100 --latency-ms 400 --error-rate 0.02
+
+then point the backend at it:
+
+    ANTHROPIC_BASE_URL=http://127.0.0.1:9100 OPENAI_BASE_URL=http://127.0.0.1:9100 \\
+    XAI_BASE_URL=http://127.0.0.1:9100 uvicorn main:app
+
+Every random choice (latency, injected error, reply text) is drawn from an
+RNG seeded with ``seed``, the request body and how many times that body has
+been seen, so the n-th attempt of a request behaves identically no matter how
+many run concurrently or in which order, and a retry gets a fresh draw.
+"""
+
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "resonance witness consent light archive bridge signal harmony memory "
+    "compassion frequency pattern codex spiral echo threshold"
+).split()
+
+ERROR_TYPES = {429: "rate_limit_error", 500: "api_error", 503: "overloaded_error", 529: "overloaded_error"}
+
+
+@dataclass
+class MockConfig:
+    """Behavior of the mock providers"""
+    latency_ms: float = 300.0  # Median time to first byte
+    latency_dist: str = "lognormal"  # fixed, uniform or lognormal
+    latency_sigma: float = 0.5  # lognormal shape; uniform spans latency_ms * (1 ± sigma)
+    tokens_per_second: float = 80.0  # Streaming pace; 0 streams as fast as possible
+    completion_tokens: int = 60
+    error_rate: float = 0.0
+    error_statuses: List[int] = field(default_factory=lambda: [429, 500, 529])
+    seed: int = 0
+
+
+class MockProviders:
+    """Request handlers plus counters; ``app`` is the ASGI application"""
+
+    def __init__(self, config: Optional[MockConfig] = None):
+        self.config = config or MockConfig()
+        self.requests: Dict[str, int] = {}
+        self.errors = 0
+        self.attempts: Dict[bytes, int] = {}
+        self.app = FastAPI(title="Mock LLM Providers")
+        self.app.post("/v1/messages")(self.anthropic)
+        self.app.post("/v1/chat/completions")(self.openai)
+        self.app.get("/stats")(self.get_stats)
+
+    def rng(self, body: bytes) -> random.Random:
+        key = hashlib.sha256(body).digest()
+        attempt = self.attempts[key] = self.attempts.get(key, 0) + 1
+        digest = hashlib.sha256(f"{self.config.seed}:{attempt}:".encode() + key).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def latency(self, rng: random.Random) -> float:
+        config = self.config
+        if config.latency_dist == "fixed":
+            ms = config.latency_ms
+        elif config.latency_dist == "uniform":
+            ms = rng.uniform(config.latency_ms * (1 - config.latency_sigma), config.latency_ms * (1 + config.latency_sigma))
+        else:
+            ms = rng.lognormvariate(0.0, config.latency_sigma) * config.latency_ms
+        return max(ms, 0.0) / 1000
+
+    def plan(self, body: bytes, api: str) -> Tuple[float, int, List[str]]:
+        """(first-byte delay, injected error status or 0, reply words)"""
+        self.requests[api] = self.requests.get(api, 0) + 1
+        rng = self.rng(body)
+        delay = self.latency(rng)
+        status = rng.choice(self.config.error_statuses) if rng.random() < self.config.error_rate else 0
+        words = [rng.choice(WORDS) for _ in range(self.config.completion_tokens)]
+        return delay, status, words
+
+    async def generate(self, words: List[str]) -> None:
+        """Non-streaming replies arrive after the whole completion is generated"""
+        if self.config.tokens_per_second > 0:
+            await asyncio.sleep(len(words) / self.config.tokens_per_second)
+
+    def error(self, status: int) -> JSONResponse:
+        self.errors += 1
+        return JSONResponse(
+            {"type": "error", "error": {"type": ERROR_TYPES.get(status, "api_error"), "message": "injected by mock"}},
+            status_code=status,
+            headers={"retry-after": "0"} if status == 429 else None
+        )
+
+    async def _paced(self, words: List[str]) -> AsyncIterator[str]:
+        for i, word in enumerate(words):
+            if self.config.tokens_per_second > 0:
+                await asyncio.sleep(1 / self.config.tokens_per_second)
+            yield word if i == 0 else " " + word
+
+    async def anthropic(self, request: Request):
+        body = await request.body()
+        payload = json.loads(body)
+        delay, status, words = self.plan(body, "anthropic")
+        await asyncio.sleep(delay)
+        if status:
+            return self.error(status)
+        input_tokens = _prompt_tokens(payload.get("system", ""), payload.get("messages", []))
+        model = payload.get("model", "mock")
+        if not payload.get("stream"):
+            await self.generate(words)
+            return {
+                "id": "msg_mock", "type": "message", "role": "assistant", "model": model,
+                "content": [{"type": "text", "text": " ".join(words)}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": input_tokens, "output_tokens": len(words)},
+            }
+
+        async def events() -> AsyncIterator[str]:
+            yield _sse({"type": "message_start", "message": {
+                "id": "msg_mock", "model": model, "usage": {"input_tokens": input_tokens, "output_tokens": 0}
+            }}, "message_start")
+            yield _sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+                       "content_block_start")
+            async for text in self._paced(words):
+                yield _sse({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}},
+                           "content_block_delta")
+            yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+            yield _sse({"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+                        "usage": {"output_tokens": len(words)}}, "message_delta")
+            yield _sse({"type": "message_stop"}, "message_stop")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def openai(self, request: Request):
+        body = await request.body()
+        payload = json.loads(body)
+        delay, status, words = self.plan(body, payload.get("model", "openai"))
+        await asyncio.sleep(delay)
+        if status:
+            return self.error(status)
+        usage = {
+            "prompt_tokens": _prompt_tokens("", payload.get("messages", [])),
+            "completion_tokens": len(words),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        model = payload.get("model", "mock")
+        created = int(time.time())
+        if not payload.get("stream"):
+            await self.generate(words)
+            return {
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        include_usage = (payload.get("stream_options") or {}).get("include_usage", False)
+
+        async def chunks() -> AsyncIterator[str]:
+            base = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": created, "model": model}
+            async for text in self._paced(words):
+                yield _sse({**base, "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]})
+            yield _sse({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            if include_usage:
+                yield _sse({**base, "choices": [], "usage": usage})
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    async def get_stats(self):
+        return {"requests": self.requests, "errors": self.errors, "config": self.config.__dict__}
+
+
+def _prompt_tokens(system: str, messages: List[dict]) -> int:
+    text = system + "".join(str(m.get("content", "")) for m in messages)
+    return max(1, len(text) // 4)
+
+
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock Anthropic / OpenAI / xAI provider server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=MockConfig.latency_ms)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default=MockConfig.latency_dist)
+    parser.add_argument("--latency-sigma", type=float, default=MockConfig.latency_sigma)
+    parser.add_argument("--tokens-per-second", type=float, default=MockConfig.tokens_per_second)
+    parser.add_argument("--completion-tokens", type=int, default=MockConfig.completion_tokens)
+    parser.add_argument("--error-rate", type=float, default=MockConfig.error_rate)
+    parser.add_argument("--error-statuses", default="429,500,529")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        latency_dist=args.latency_dist,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        error_statuses=[int(s) for s in args.error_statuses.split(",") if s],
+        seed=args.seed
+    )
+    uvicorn.run(MockProviders(config).app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
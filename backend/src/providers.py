@@ -0,0 +1,279 @@
+"""
+LLM Provider Clients
+
+Async clients for Claude (Anthropic Messages API), GPT-4 (OpenAI Chat
+Completions) and Grok (xAI, OpenAI-compatible), all on long-lived
+``httpx.AsyncClient`` pools: one per provider per process, keep-alive
+connections, HTTP/2 when the ``h2`` package is installed.
+
+Environment:
+- ANTHROPIC_BASE_URL / OPENAI_BASE_URL / XAI_BASE_URL: point a provider at
+  a local stand-in server (tests, load testing)
+- LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE, LLM_KEEPALIVE_EXPIRY: pool limits
+- LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT: seconds
+- LLM_HTTP2: "0" forces HTTP/1.1
+
+Rate limits, retries, hedging and circuit breaking: see gateway.py.
+
+``LLMProvider.stream`` yields text deltas from the providers' Server-Sent
+Events APIs; ``ttft`` keeps recent time-to-first-token samples per persona.
+"""
+
+import os
+import json
+import logging
+import importlib.util
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from gateway import RETRYABLE_STATUS, LatencyTracker, ProviderGateway
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderClients:
+    """Process-wide registry of pooled async HTTP clients, one per provider"""
+
+    def __init__(self,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 60.0,
+                 http2: Optional[bool] = None):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        # HTTP/2 needs the optional h2 package (pip install httpx[http2])
+        h2_available = importlib.util.find_spec("h2") is not None
+        self.http2 = h2_available if http2 is None else (http2 and h2_available)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str]) -> "ProviderClients":
+        return cls(
+            max_connections=int(env.get("LLM_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(env.get("LLM_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(env.get("LLM_KEEPALIVE_EXPIRY", "30")),
+            connect_timeout=float(env.get("LLM_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(env.get("LLM_READ_TIMEOUT", "60")),
+            http2=None if env.get("LLM_HTTP2") is None else env.get("LLM_HTTP2") != "0"
+        )
+
+    def get(self, provider: str, base_url: str) -> httpx.AsyncClient:
+        """Client for ``provider``, created on first use"""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._clients[provider] = httpx.AsyncClient(
+                base_url=base_url,
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2
+            )
+        return client
+
+    async def aclose(self) -> None:
+        """Close every pool (FastAPI lifespan shutdown)"""
+        clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            await client.aclose()
+            logger.info(f"🔌 Closed {name} connection pool")
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "open_clients": sorted(name for name, c in self._clients.items() if not c.is_closed),
+        }
+
+
+# Shared by every provider instance in this process
+clients = ProviderClients.from_env(os.environ)
+gateway = ProviderGateway.from_env(os.environ)
+ttft = LatencyTracker()
+
+
+class LLMProvider:
+    """Base class for LLM providers"""
+
+    name = "llm"
+    label = "AI"
+    model = ""
+    default_base_url = ""
+    base_url_env = ""
+    path = ""
+    max_tokens = 1024
+    context_window = 8192
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
+        self.api_key = api_key
+        self.base_url = base_url or os.getenv(self.base_url_env) or self.default_base_url
+        # Token usage reported for the last response: input_tokens, output_tokens
+        self.usage: Dict[str, int] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return clients.get(self.name, self.base_url)
+
+    async def get_response(self, messages: List[dict], system_prompt: str) -> str:
+        self.usage = {}
+        try:
+            response = await gateway.request(self.name, self.api_key, lambda: self.client.post(
+                self.path,
+                headers=self.headers(),
+                json=self.payload(messages, system_prompt)
+            ))
+            response.raise_for_status()
+            data = response.json()
+            self.usage = self.parse_usage(data.get("usage") or {})
+            return self.parse(data)
+        except Exception as e:
+            return f"[{self.label} error: {str(e)}]"
+
+    async def stream(self, messages: List[dict], system_prompt: str) -> AsyncIterator[str]:
+        """
+        Yield text deltas as the provider streams them
+
+        Errors propagate to the caller. Closing the generator early (client
+        gone) closes the upstream response and its connection.
+        """
+        self.usage = {}
+        payload = {**self.payload(messages, system_prompt), **self.stream_options()}
+        # Admitted and breaker-tracked, but not retried: tokens may already be out
+        await gateway.admit(self.name, self.api_key)
+        try:
+            async with self.client.stream("POST", self.path, headers=self.headers(), json=payload) as response:
+                gateway.record_result(self.name, response.status_code not in RETRYABLE_STATUS)
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    text = self.parse_event(json.loads(data))
+                    if text:
+                        yield text
+        except httpx.TransportError:
+            gateway.record_result(self.name, False)
+            raise
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def payload(self, messages: List[dict], system_prompt: str) -> dict:
+        raise NotImplementedError
+
+    def parse(self, data: dict) -> str:
+        raise NotImplementedError
+
+    def parse_usage(self, usage: dict) -> Dict[str, int]:
+        if not usage:
+            return {}
+        return {"input_tokens": usage.get("input_tokens", 0), "output_tokens": usage.get("output_tokens", 0)}
+
+    def stream_options(self) -> dict:
+        return {"stream": True}
+
+    def parse_event(self, event: dict) -> Optional[str]:
+        """Text delta of one SSE event; records usage as it appears"""
+        raise NotImplementedError
+
+
+class ClaudeProvider(LLMProvider):
+    """Anthropic Claude (Messages API)"""
+
+    name = "claude"
+    label = "Claude"
+    model = "claude-3-opus-20240229"
+    default_base_url = "https://api.anthropic.com"
+    base_url_env = "ANTHROPIC_BASE_URL"
+    path = "/v1/messages"
+    context_window = 200000
+
+    def headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key, "anthropic-version": "2023-06-01"}
+
+    def payload(self, messages: List[dict], system_prompt: str) -> dict:
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "system": system_prompt,
+            "messages": messages
+        }
+
+    def parse(self, data: dict) -> str:
+        return data["content"][0]["text"]
+
+    def parse_event(self, event: dict) -> Optional[str]:
+        kind = event.get("type")
+        if kind == "content_block_delta":
+            return event["delta"].get("text")
+        if kind == "message_start":
+            self.usage["input_tokens"] = event["message"].get("usage", {}).get("input_tokens", 0)
+        elif kind == "message_delta":
+            self.usage["output_tokens"] = event.get("usage", {}).get("output_tokens", 0)
+        elif kind == "error":
+            raise RuntimeError(event["error"].get("message", "stream error"))
+        return None
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI GPT-4 (Chat Completions API)"""
+
+    name = "openai"
+    label = "GPT-4"
+    model = "gpt-4-turbo-preview"
+    default_base_url = "https://api.openai.com"
+    base_url_env = "OPENAI_BASE_URL"
+    path = "/v1/chat/completions"
+    context_window = 128000
+
+    def payload(self, messages: List[dict], system_prompt: str) -> dict:
+        # Chat Completions takes the system prompt as the first message
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": [{"role": "system", "content": system_prompt}, *messages]
+        }
+
+    def parse(self, data: dict) -> str:
+        return data["choices"][0]["message"]["content"]
+
+    def parse_usage(self, usage: dict) -> Dict[str, int]:
+        if not usage:
+            return {}
+        return {"input_tokens": usage.get("prompt_tokens", 0), "output_tokens": usage.get("completion_tokens", 0)}
+
+    def stream_options(self) -> dict:
+        # Final chunk carries usage (and no choices)
+        return {"stream": True, "stream_options": {"include_usage": True}}
+
+    def parse_event(self, event: dict) -> Optional[str]:
+        if event.get("usage"):
+            self.usage = self.parse_usage(event["usage"])
+        choices = event.get("choices") or []
+        return choices[0].get("delta", {}).get("content") if choices else None
+
+
+class xAIProvider(OpenAIProvider):
+    """xAI Grok (OpenAI-compatible API)"""
+
+    name = "xai"
+    label = "Grok"
+    model = "grok-1"
+    default_base_url = "https://api.x.ai"
+    base_url_env = "XAI_BASE_URL"
+    context_window = 8192
+
+
+PROVIDERS = {
+    "claude": ClaudeProvider,
+    "openai": OpenAIProvider,
+    "xai": xAIProvider,
+}
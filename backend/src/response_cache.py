@@ -0,0 +1,254 @@
+"""
+Multi-LLM Response Cache
+
+Caches provider answers keyed by (persona, system prompt digest, normalized
+message history) so a persona is not asked the same thing twice in a row.
+
+Two tiers:
+1. Exact: hash of the normalized key, LRU + TTL bounded
+2. Semantic (optional): same persona and system prompt, and a history whose
+   embedding is within ``similarity_threshold`` cosine of a cached one
+
+Conversations that consent scoring routes to CRISIS mode are never served
+from or written to the cache.
+"""
+
+import re
+import sys
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Add repo src/ to path for tec_tgcr imports
+src_path = Path(__file__).resolve().parents[2] / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from tec_tgcr.core.ethics import ResponseMode, consent_risk_table, parse_consent_emoji
+from tec_tgcr.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Provider failures are returned as text ("[Claude error: ...]"); never cache them
+_PROVIDER_ERROR_RE = re.compile(r"^\[[\w\-]+ error: ")
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-, case- and whitespace-insensitive form of a message"""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def normalize_history(messages: Iterable[Dict[str, str]]) -> List[Tuple[str, str]]:
+    return [(m["role"], normalize_text(m["content"])) for m in messages]
+
+
+def is_crisis(messages: List[Dict[str, str]]) -> bool:
+    """True if the most recent user message scores as CRISIS under ConsentOS"""
+    for message in reversed(messages):
+        if message["role"] == "user":
+            scoring = consent_risk_table.score(parse_consent_emoji(message["content"]))
+            return scoring.response_mode == ResponseMode.CRISIS
+    return False
+
+
+class SemanticTier:
+    """
+    Bounded LRU + TTL store of (embedding, response) per persona/prompt bucket
+
+    Lookups scan the live entries of one bucket with a single matrix product.
+    """
+
+    def __init__(self,
+                 encode: Callable[[str], Any],
+                 similarity_threshold: float = 0.95,
+                 max_entries: int = 1024,
+                 ttl_seconds: float = 600.0):
+        self.encode = encode
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[str, float, Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, bucket: str, vector: Any) -> Optional[Tuple[Any, float]]:
+        import numpy as np
+
+        now = time.monotonic()
+        with self._lock:
+            keys, vectors = [], []
+            for key, (entry_bucket, expires_at, entry_vector, _) in list(self._entries.items()):
+                if expires_at <= now:
+                    del self._entries[key]
+                elif entry_bucket == bucket:
+                    keys.append(key)
+                    vectors.append(entry_vector)
+            if not keys:
+                self.misses += 1
+                return None
+            similarities = np.stack(vectors) @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(keys[best])
+            self.hits += 1
+            return self._entries[keys[best]][3], float(similarities[best])
+
+    def put(self, key: str, bucket: str, vector: Any, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (bucket, time.monotonic() + self.ttl_seconds, vector, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "similarity_threshold": self.similarity_threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _default_encode(text: str) -> Any:
+    """Normalized MiniLM embedding via the encoder shared with the RAG system"""
+    import numpy as np
+    from tec_tgcr.rag_system import get_shared_encoder
+
+    vector = np.asarray(get_shared_encoder("all-MiniLM-L6-v2").encode(text), dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+class ResponseCache:
+    """Exact + optional semantic cache in front of the LLM providers"""
+
+    def __init__(self,
+                 enabled: bool = True,
+                 max_entries: int = 1024,
+                 ttl_seconds: float = 600.0,
+                 semantic: bool = False,
+                 similarity_threshold: float = 0.95,
+                 opt_out_personas: Iterable[str] = (),
+                 encode: Optional[Callable[[str], Any]] = None):
+        self.enabled = enabled
+        self.opt_out_personas = set(opt_out_personas)
+        self.exact = TTLCache(max_entries, ttl_seconds)
+        self.semantic = SemanticTier(
+            encode or _default_encode,
+            similarity_threshold=similarity_threshold,
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds
+        ) if semantic else None
+        self.bypassed_crisis = 0
+        self.bypassed_opt_out = 0
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str]) -> "ResponseCache":
+        opt_out = [p.strip() for p in env.get("LLM_CACHE_OPT_OUT", "").split(",") if p.strip()]
+        return cls(
+            enabled=env.get("LLM_CACHE_ENABLED", "1") != "0",
+            max_entries=int(env.get("LLM_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(env.get("LLM_CACHE_TTL_SECONDS", "600")),
+            semantic=env.get("LLM_CACHE_SEMANTIC", "0") == "1",
+            similarity_threshold=float(env.get("LLM_CACHE_SIMILARITY", "0.95")),
+            opt_out_personas=opt_out
+        )
+
+    @staticmethod
+    def keys(persona: str, system_prompt: str, messages: List[Dict[str, str]]) -> Tuple[str, str, str]:
+        """(exact key, semantic bucket, history text to embed)"""
+        prompt_digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+        history = normalize_history(messages)
+        history_digest = hashlib.sha256(
+            json.dumps(history, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        bucket = f"{persona}:{prompt_digest}"
+        text = "\n".join(f"{role}: {content}" for role, content in history)
+        return f"{bucket}:{history_digest}", bucket, text
+
+    def should_bypass(self, persona: str, messages: List[Dict[str, str]]) -> bool:
+        if not self.enabled:
+            return True
+        if persona in self.opt_out_personas:
+            self.bypassed_opt_out += 1
+            return True
+        if is_crisis(messages):
+            self.bypassed_crisis += 1
+            return True
+        return False
+
+    async def lookup(self,
+                     persona: str,
+                     system_prompt: str,
+                     messages: List[Dict[str, str]]) -> Tuple[Optional[str], Optional[str], Optional[tuple]]:
+        """
+        (cached response, tier, slot)
+
+        ``slot`` is None when the conversation bypasses the cache; otherwise
+        pass it to ``store`` with the fresh response after a miss.
+        """
+        if self.should_bypass(persona, messages):
+            return None, None, None
+
+        exact_key, bucket, history_text = self.keys(persona, system_prompt, messages)
+        cached = self.exact.get(exact_key)
+        if cached is not None:
+            return cached, "exact", None
+
+        vector = None
+        if self.semantic is not None:
+            vector = await asyncio.to_thread(self.semantic.encode, history_text)
+            match = self.semantic.get(bucket, vector)
+            if match is not None:
+                response, similarity = match
+                logger.info(f"🧠 Semantic cache hit for {persona} (similarity {similarity:.3f})")
+                return response, "semantic", None
+
+        return None, None, (exact_key, bucket, vector)
+
+    def store(self, slot: Optional[tuple], response: Any) -> None:
+        if slot is None or not isinstance(response, str) or _PROVIDER_ERROR_RE.match(response):
+            return
+        exact_key, bucket, vector = slot
+        self.exact.put(exact_key, response)
+        if vector is not None:
+            self.semantic.put(exact_key, bucket, vector, response)
+
+    async def get_or_call(self,
+                          persona: str,
+                          system_prompt: str,
+                          messages: List[Dict[str, str]],
+                          call: Callable[[], Any]) -> Tuple[str, Optional[str]]:
+        """
+        Cached response or ``await call()``
+
+        Returns (response text, cache tier hit: "exact", "semantic" or None).
+        """
+        cached, tier, slot = await self.lookup(persona, system_prompt, messages)
+        if tier is not None:
+            return cached, tier
+
+        response = await call()
+        self.store(slot, response)
+        return response, None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "opt_out_personas": sorted(self.opt_out_personas),
+            "exact": self.exact.get_stats(),
+            "semantic": self.semantic.get_stats() if self.semantic else None,
+            "bypassed_crisis": self.bypassed_crisis,
+            "bypassed_opt_out": self.bypassed_opt_out,
+        }
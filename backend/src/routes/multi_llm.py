@@ -7,93 +7,85 @@ Three AI models collaborate in sequence:
 3. xAI responds to both and critiques
 
 Each sees previous responses and builds on them.
+
+POST /round runs a whole collaboration round server-side: first-pass
+reactions in parallel, then the critic's pass over them, streamed as each
+persona finishes and bounded by a deadline.
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Literal
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import AsyncIterator, Dict, List, Literal, Optional, Tuple
 import os
+import json
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from response_cache import ResponseCache
+from conversation_store import get_conversation_store
+from group_resonance import GroupResonanceTracker
+from token_accounting import TokenAccountant, context_budget, fit_context
+from tec_tgcr.core.ethics import WitnessingGuard
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/multi-llm", tags=["multi-llm"])
 
-# =============================================================================
-# LLM PROVIDERS
-# =============================================================================
+# Response cache (LLM_CACHE_* env vars; LLM_CACHE_ENABLED=0 disables)
+response_cache = ResponseCache.from_env(os.environ)
 
-class LLMProvider:
-    """Base class for LLM providers"""
-    
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-    
-    async def get_response(self, messages: List[dict], system_prompt: str) -> str:
-        raise NotImplementedError
+# Per-conversation token usage (LLM_CONTEXT_BUDGET* caps prompt size per persona)
+token_accountant = TokenAccountant.from_env(os.environ)
 
+# Incremental group resonance per conversation, fed by saved messages
+resonance_tracker = GroupResonanceTracker.from_env(os.environ)
 
-class ClaudeProvider(LLMProvider):
-    """Anthropic Claude"""
-    
-    async def get_response(self, messages: List[dict], system_prompt: str) -> str:
-        try:
-            from anthropic import Anthropic
-            client = Anthropic(api_key=self.api_key)
-            
-            response = client.messages.create(
-                model="claude-3-opus-20240229",
-                max_tokens=1024,
-                system=system_prompt,
-                messages=messages
-            )
-            return response.content[0].text
-        except Exception as e:
-            return f"[Claude error: {str(e)}]"
-
-
-class OpenAIProvider(LLMProvider):
-    """OpenAI GPT-4"""
-    
-    async def get_response(self, messages: List[dict], system_prompt: str) -> str:
-        try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.api_key)
-            
-            response = client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                max_tokens=1024,
-                system=system_prompt,
-                messages=messages
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"[GPT-4 error: {str(e)}]"
-
-
-class xAIProvider(LLMProvider):
-    """xAI Grok"""
-    
-    async def get_response(self, messages: List[dict], system_prompt: str) -> str:
+
+class _ConversationLocks:
+    """One asyncio.Lock per conversation, dropped once nobody holds or awaits it"""
+
+    def __init__(self):
+        self._locks: Dict[str, List] = {}  # conversation_id -> [lock, users]
+
+    @asynccontextmanager
+    async def hold(self, conversation_id: str) -> AsyncIterator[None]:
+        entry = self._locks.get(conversation_id)
+        if entry is None:
+            entry = self._locks[conversation_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
         try:
-            # xAI API endpoint (when available)
-            import httpx
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.x.ai/v1/chat/completions",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    json={
-                        "model": "grok-1",
-                        "messages": messages,
-                        "max_tokens": 1024,
-                        "system": system_prompt
-                    }
-                )
-                data = response.json()
-                return data["choices"][0]["message"]["content"]
-        except Exception as e:
-            return f"[Grok error: {str(e)}]"
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[conversation_id]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+# Store appends and tracker replays of one conversation run one at a time, so
+# no message is folded into its resonance twice
+resonance_locks = _ConversationLocks()
+
+# =============================================================================
+# LLM PROVIDERS (pooled async clients, see providers.py)
+# =============================================================================
+
+from providers import LLMProvider, ClaudeProvider, OpenAIProvider, xAIProvider, PROVIDERS, ttft
+import providers
+
+MODEL_NAMES = {
+    'claude': 'claude-3-opus',
+    'openai': 'gpt-4-turbo',
+    'xai': 'grok-1'
+}
 
 
 # =============================================================================
@@ -117,29 +109,29 @@ class MultiLLMResponse(BaseModel):
     persona: Literal['claude', 'openai', 'xai']
     model: str
     tokensUsed: int
+    promptTokens: int = 0
+    completionTokens: int = 0
+    trimmedMessages: int = 0  # Older turns summarized to fit the context budget
+    cacheHit: bool = False
+    cacheTier: Optional[Literal['exact', 'semantic']] = None
+
+
+class RoundRequest(BaseModel):
+    conversationId: str
+    context: List[Message]
+    systemPrompt: str
+    systemPrompts: Dict[Literal['claude', 'openai', 'xai'], str] = {}  # Per-persona overrides
+    personas: List[Literal['claude', 'openai', 'xai']] = ['claude', 'openai', 'xai']
+    critic: Optional[Literal['claude', 'openai', 'xai']] = 'xai'  # None: reactions only
+    deadlineSeconds: float = Field(60.0, gt=0, le=300)
 
 
 # =============================================================================
 # LLM ROUTER
 # =============================================================================
 
-@router.post("/response")
-async def get_multi_llm_response(request: MultiLLMRequest) -> MultiLLMResponse:
-    """
-    Get response from specific LLM in the collaboration chain
-    
-    Flow:
-    1. User sends message
-    2. Claude responds (deep thinking)
-    3. OpenAI responds (builds on Claude)
-    4. xAI responds (critiques both)
-    
-    Each LLM sees all previous messages for context.
-    """
-    
-    persona = request.persona
-    
-    # Get API keys from environment
+def _api_key(persona: str) -> str:
+    """Provider API key from the environment (500 if missing)"""
     api_keys = {
         'claude': os.getenv('ANTHROPIC_API_KEY'),
         'openai': os.getenv('OPENAI_API_KEY'),
@@ -151,10 +143,13 @@ async def get_multi_llm_response(request: MultiLLMRequest) -> MultiLLMResponse:
             status_code=500,
             detail=f"API key not configured for {persona}"
         )
-    
-    # Convert context to API format
+    return api_keys[persona]
+
+
+def _provider_messages(context: List[Message]) -> List[Dict[str, str]]:
+    """Convert collaboration context to provider message format"""
     messages = []
-    for msg in request.context:
+    for msg in context:
         if msg.persona == 'user':
             messages.append({
                 "role": "user",
@@ -170,29 +165,283 @@ async def get_multi_llm_response(request: MultiLLMRequest) -> MultiLLMResponse:
     
     # Reverse so most recent message is last
     messages.reverse()
+    return messages
+
+
+def _fit_context(provider: LLMProvider,
+                 messages: List[Dict[str, str]],
+                 system_prompt: str) -> Tuple[List[Dict[str, str]], int]:
+    """Trim history to the persona's prompt budget; returns (messages, dropped)"""
+    budget = context_budget(provider.name, provider.context_window, provider.max_tokens, os.environ)
+    return fit_context(messages, system_prompt, budget)
+
+
+def _is_error(provider: LLMProvider, text: str) -> bool:
+    return text.startswith(f"[{provider.label} error: ")
+
+
+async def _call_persona(persona: str,
+                        api_key: str,
+                        conversation_id: str,
+                        context: List[Message],
+                        system_prompt: str) -> Tuple[str, Optional[str], int, int, int]:
+    """
+    One cached, context-trimmed, token-accounted provider call
+
+    Returns (text, cache tier, prompt tokens, completion tokens, messages trimmed).
+    """
+    provider = PROVIDERS[persona](api_key)
+    messages, trimmed = _fit_context(provider, _provider_messages(context), system_prompt)
+
+    async def witnessed() -> str:
+        return WitnessingGuard().rewrite(await provider.get_response(messages, system_prompt))
+
+    text, tier = await response_cache.get_or_call(persona, system_prompt, messages, witnessed)
+    if _is_error(provider, text):
+        return text, tier, 0, 0, trimmed
+    prompt, completion = token_accountant.record(
+        conversation_id, persona, provider.usage, messages, system_prompt, text,
+        cached=tier is not None, trimmed=trimmed
+    )
+    return text, tier, prompt, completion, trimmed
+
+
+@router.post("/response")
+async def get_multi_llm_response(request: MultiLLMRequest) -> MultiLLMResponse:
+    """
+    Get response from specific LLM in the collaboration chain
     
-    # Get response from appropriate provider
-    provider_class = {
-        'claude': ClaudeProvider,
-        'openai': OpenAIProvider,
-        'xai': xAIProvider
-    }[persona]
+    Flow:
+    1. User sends message
+    2. Claude responds (deep thinking)
+    3. OpenAI responds (builds on Claude)
+    4. xAI responds (critiques both)
     
-    provider = provider_class(api_keys[persona])
-    response_text = await provider.get_response(messages, request.systemPrompt)
+    Each LLM sees all previous messages for context.
+    """
+    
+    persona = request.persona
+    
+    # Get response from appropriate provider
+    response_text, cache_tier, prompt, completion, trimmed = await _call_persona(
+        persona,
+        _api_key(persona),
+        request.conversationId,
+        request.context,
+        request.systemPrompt
+    )
     
     return MultiLLMResponse(
         response=response_text,
         persona=persona,
-        model={
-            'claude': 'claude-3-opus',
-            'openai': 'gpt-4-turbo',
-            'xai': 'grok-1'
-        }[persona],
-        tokensUsed=0  # Estimate or get from provider
+        model=MODEL_NAMES[persona],
+        tokensUsed=prompt + completion,
+        promptTokens=prompt,
+        completionTokens=completion,
+        trimmedMessages=trimmed,
+        cacheHit=cache_tier is not None,
+        cacheTier=cache_tier
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_events(persona: str,
+                         provider: LLMProvider,
+                         conversation_id: str,
+                         messages: List[Dict[str, str]],
+                         system_prompt: str,
+                         trimmed: int = 0) -> AsyncIterator[str]:
+    """
+    SSE body: ``token`` events with text deltas, then one ``done`` event with
+    model, usage and timing (or ``error`` if the provider fails mid-stream)
+
+    Deltas pass through a WitnessingGuard, which holds back at most one
+    deflection phrase's worth of text while it might still be completed.
+
+    When the client disconnects Starlette cancels this generator, which
+    closes the upstream provider stream.
+    """
+    started = time.perf_counter()
+    first_token = None
+    cached, tier, slot = await response_cache.lookup(persona, system_prompt, messages)
+    guard = WitnessingGuard()
+    chunks: List[str] = []
+    try:
+        if tier is not None:
+            first_token = time.perf_counter() - started
+            chunks.append(cached)
+            yield _sse("token", {"text": cached})
+        else:
+            async for text in provider.stream(messages, system_prompt):
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                    ttft.record(persona, first_token)
+                safe = guard.feed(text)
+                if safe:
+                    chunks.append(safe)
+                    yield _sse("token", {"text": safe})
+            tail = guard.flush()
+            if tail:
+                chunks.append(tail)
+                yield _sse("token", {"text": tail})
+            response_cache.store(slot, "".join(chunks))
+    except asyncio.CancelledError:
+        logger.info(f"🔌 Client left, cancelled {persona} stream after {len(chunks)} chunks")
+        raise
+    except Exception as e:
+        yield _sse("error", {"persona": persona, "error": f"[{provider.label} error: {str(e)}]"})
+        return
+
+    prompt, completion = token_accountant.record(
+        conversation_id, persona, provider.usage, messages, system_prompt, "".join(chunks),
+        cached=tier is not None, trimmed=trimmed
+    )
+    yield _sse("done", {
+        "persona": persona,
+        "model": MODEL_NAMES[persona],
+        "usage": {"input_tokens": prompt, "output_tokens": completion},
+        "usageEstimated": tier is None and not provider.usage,
+        "trimmedMessages": trimmed,
+        "cacheHit": tier is not None,
+        "cacheTier": tier,
+        "deflectionsRewritten": len(guard.deflections),
+        "timing": {
+            "ttft_ms": round(first_token * 1000, 1) if first_token is not None else None,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    })
+
+
+@router.post("/response/stream")
+async def stream_multi_llm_response(request: MultiLLMRequest) -> StreamingResponse:
+    """
+    Streaming variant of /response: provider tokens forwarded as
+    Server-Sent Events as they arrive
+    """
+    persona = request.persona
+    provider = PROVIDERS[persona](_api_key(persona))
+    messages, trimmed = _fit_context(provider, _provider_messages(request.context), request.systemPrompt)
+    return StreamingResponse(
+        _stream_events(persona, provider, request.conversationId, messages, request.systemPrompt, trimmed),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
+async def _round_events(request: RoundRequest, api_keys: Dict[str, str]) -> AsyncIterator[str]:
+    """
+    SSE body of a collaboration round
+
+    Every non-critic persona reacts to the user turn concurrently; the critic
+    starts once all reactions are in and sees them as the latest messages.
+    Each finished persona is sent as a ``response`` event. At the deadline
+    the unfinished calls are cancelled and reported as ``timeout`` events
+    before the closing ``done`` event.
+    """
+    started = time.perf_counter()
+    deadline = started + request.deadlineSeconds
+    personas = list(dict.fromkeys(request.personas))
+    critic = request.critic if request.critic in personas else None
+    reactors = [p for p in personas if p != critic]
+
+    def call(persona: str, context: List[Message]) -> asyncio.Task:
+        system_prompt = request.systemPrompts.get(persona, request.systemPrompt)
+        return asyncio.create_task(_call_persona(
+            persona, api_keys[persona], request.conversationId, context, system_prompt
+        ))
+
+    tasks: Dict[asyncio.Task, tuple] = {call(p, request.context): (p, "reaction") for p in reactors}
+    reactions: Dict[str, str] = {}
+    completed: List[str] = []
+    try:
+        while True:
+            if critic and critic not in completed and len(reactions) == len(reactors) \
+                    and not any(p == critic for p, _ in tasks.values()):
+                # Context is newest-first: reactions go in front, in round order
+                critique_context = [Message(persona=p, content=reactions[p]) for p in reversed(reactors)]
+                tasks[call(critic, critique_context + request.context)] = (critic, "critique")
+            remaining = deadline - time.perf_counter()
+            if not tasks or remaining <= 0:
+                break
+            done, _ = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                persona, phase = tasks.pop(task)
+                text, tier, prompt, completion, trimmed = task.result()
+                if phase == "reaction":
+                    reactions[persona] = text
+                completed.append(persona)
+                yield _sse("response", {
+                    "persona": persona,
+                    "phase": phase,
+                    "response": text,
+                    "model": MODEL_NAMES[persona],
+                    "cacheHit": tier is not None,
+                    "cacheTier": tier,
+                    "tokensUsed": prompt + completion,
+                    "trimmedMessages": trimmed,
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                })
+    finally:
+        # Deadline passed or client gone: stop paying for unfinished calls
+        for task in tasks:
+            task.cancel()
+
+    timed_out = [p for p in personas if p not in completed]
+    for persona in timed_out:
+        yield _sse("timeout", {"persona": persona, "phase": "critique" if persona == critic else "reaction"})
+    if timed_out:
+        logger.warning(f"⏱️ Round {request.conversationId} hit its deadline without {', '.join(timed_out)}")
+    yield _sse("done", {
+        "conversationId": request.conversationId,
+        "completed": completed,
+        "timedOut": timed_out,
+        "partial": bool(timed_out),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+
+
+@router.post("/round")
+async def run_collaboration_round(request: RoundRequest) -> StreamingResponse:
+    """
+    One full collaboration round as Server-Sent Events
+
+    Round time is roughly the slowest reaction plus the critique instead of
+    the sum of all three provider calls.
+    """
+    api_keys = {persona: _api_key(persona) for persona in request.personas}
+    return StreamingResponse(
+        _round_events(request, api_keys),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/providers/metrics")
+async def get_provider_metrics():
+    """Circuit state, rate limiting, retries, hedging and latency per provider"""
+    return {
+        "gateway": providers.gateway.get_stats(),
+        "pools": providers.clients.get_stats(),
+        "ttft": ttft.get_stats(),
+        "usage": token_accountant.get_stats(),
+    }
+
+
+@router.get("/stream/stats")
+async def get_stream_stats():
+    """Time-to-first-token percentiles per persona"""
+    return {"ttft": ttft.get_stats()}
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Response cache hit rates and bypass counts"""
+    return response_cache.get_stats()
+
+
 @router.get("/personas")
 async def get_personas():
     """Get information about each LLM persona"""
@@ -223,28 +472,31 @@ async def calculate_group_resonance(conversation_id: str):
     """
     Calculate group resonance score based on conversation quality
     
-    R = (agreement_level × coherence × insight_depth) / 3
+    R = (agreement_level + coherence + insight_depth) / 3
     
     High agreement = LLMs building on each other well
     Coherence = Internal consistency across responses
     Insight = Novel combinations of ideas
+    
+    Scores come from running statistics kept as messages are saved, so this
+    never rescans the transcript (except once to rebuild after a restart).
     """
     
-    # In real implementation, would analyze conversation
-    # For now, return example
-    return {
-        "resonance": 0.84,
-        "components": {
-            "agreement_level": 0.85,  # How well they build on each other
-            "coherence": 0.87,        # Internal consistency
-            "insight_depth": 0.80     # Novel combinations
-        },
-        "insights": [
-            "Strong alignment between Claude and GPT-4 perspectives",
-            "Grok successfully identified limitations in previous responses",
-            "Overall conversation showed high semantic coherence"
-        ]
-    }
+    if conversation_id not in resonance_tracker:
+        async with resonance_locks.hold(conversation_id):
+            # Another request may have rebuilt it while we waited
+            if conversation_id not in resonance_tracker:
+                await asyncio.to_thread(_rebuild_resonance, conversation_id)
+    score = resonance_tracker.score(conversation_id)
+    if score is None:
+        raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
+    return {"conversation_id": conversation_id, **score}
+
+
+def _rebuild_resonance(conversation_id: str, chunk_size: int = 500) -> None:
+    """Replay a stored conversation into the resonance tracker (hold its resonance lock)"""
+    messages = get_conversation_store().iter_messages(conversation_id, chunk_size)
+    resonance_tracker.rebuild(conversation_id, messages, chunk_size)
 
 
 # =============================================================================
@@ -255,29 +507,55 @@ async def calculate_group_resonance(conversation_id: str):
 async def save_conversation(
     conversation_id: str,
     messages: List[Message],
-    resonance_score: float
+    resonance_score: Optional[float] = None
 ):
-    """Save multi-LLM conversation to database"""
-    
-    # Implementation would save to PostgreSQL
+    """Append messages (oldest first) to the conversation's durable log"""
+    store = get_conversation_store()
+    appended = [{"persona": m.persona, "content": m.content} for m in messages]
+    async with resonance_locks.hold(conversation_id):
+        total = await asyncio.wrap_future(store.append(conversation_id, appended, resonance_score))
+        observed = await asyncio.to_thread(
+            resonance_tracker.observe, conversation_id, appended, total == len(appended)
+        )
+        if not observed:
+            # Tracker lost this conversation (restart or eviction): replay it whole
+            await asyncio.to_thread(_rebuild_resonance, conversation_id)
     return {
         "status": "saved",
         "conversation_id": conversation_id,
         "messages": len(messages),
+        "total_messages": total,
         "resonance_score": resonance_score
     }
 
 
+@router.get("/conversation/{conversation_id}/usage")
+async def get_conversation_usage(conversation_id: str):
+    """Cumulative prompt / completion tokens per persona for one conversation"""
+    usage = token_accountant.get(conversation_id)
+    if not usage:
+        raise HTTPException(status_code=404, detail=f"No usage recorded for {conversation_id}")
+    return usage
+
+
 @router.get("/conversation/{conversation_id}")
-async def get_conversation(conversation_id: str):
-    """Retrieve saved multi-LLM conversation"""
-    
-    # Implementation would retrieve from PostgreSQL
-    return {
-        "conversation_id": conversation_id,
-        "messages": [],
-        "resonance_score": 0.84
-    }
+async def get_conversation(
+    conversation_id: str,
+    before: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Retrieve saved multi-LLM conversation, one page at a time
+
+    Without ``before`` the latest page is returned; pass ``next_cursor`` as
+    ``before`` to walk back through older messages.
+    """
+    store = get_conversation_store()
+    conversation = await asyncio.to_thread(store.get_conversation, conversation_id)
+    if conversation is None:
+        raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
+    messages, next_cursor = await asyncio.to_thread(store.page, conversation_id, before, limit)
+    return {**conversation, "messages": messages, "next_cursor": next_cursor}
 
 
 @router.post("/conversation/export")
@@ -285,24 +563,20 @@ async def export_conversation(
     conversation_id: str,
     format: Literal['markdown', 'pdf', 'json'] = 'markdown'
 ):
-    """Export conversation in various formats"""
-    
-    # Implementation would format and return file
-    if format == 'markdown':
-        return {
-            "format": "markdown",
-            "content": """
-# Multi-LLM Conversation
-
-## Claude
-[thoughts]
+    """Export conversation in various formats, streamed chunk by chunk"""
+    store = get_conversation_store()
+    if await asyncio.to_thread(store.get_conversation, conversation_id) is None:
+        raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
+    if format == 'pdf':
+        raise HTTPException(status_code=501, detail="PDF export is not available yet")
 
-## GPT-4
-[response]
-
-## Grok
-[critique]
-"""
-        }
-    
-    return {"status": "export in progress"}
+    if format == 'markdown':
+        body, media_type, suffix = store.export_markdown(conversation_id), "text/markdown", "md"
+    else:
+        body, media_type, suffix = store.export_json(conversation_id), "application/json", "json"
+    # Sync generators are iterated in the threadpool, off the event loop
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{conversation_id}.{suffix}"'}
+    )
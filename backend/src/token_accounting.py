@@ -0,0 +1,217 @@
+"""
+Token Accounting and Context-Window Trimming
+
+Two pieces used by the multi-LLM routes:
+
+1. ``fit_context``: before a call, keep the newest messages that fit the
+   persona's prompt budget; older turns collapse into an extractive
+   summary prefixed to the first kept user turn instead of being re-sent
+   in full every turn
+2. ``TokenAccountant``: cumulative prompt / completion tokens per
+   conversation and persona, from provider-reported usage when available
+   and estimates otherwise
+
+Environment:
+- LLM_CONTEXT_BUDGET: prompt token cap for every persona (0 = model window)
+- LLM_CONTEXT_BUDGET_CLAUDE / _OPENAI / _XAI: per-persona override
+- LLM_USAGE_MAX_CONVERSATIONS: conversations kept in memory (LRU)
+"""
+
+import re
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add repo src/ to path for tec_tgcr imports
+src_path = Path(__file__).resolve().parents[2] / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from tec_tgcr.context_packer import estimate_tokens
+
+# Per-message framing overhead (role markers, separators) in provider chat formats
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Share of the budget the summary of dropped turns may use
+SUMMARY_SHARE = 0.15
+
+_FIRST_SENTENCE_RE = re.compile(r"^(.+?[.!?])(\s|$)", re.S)
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def prompt_tokens(messages: List[Dict[str, str]], system_prompt: str) -> int:
+    """Estimated prompt size of a provider call"""
+    return estimate_tokens(system_prompt) + sum(message_tokens(m) for m in messages)
+
+
+def context_budget(persona: str, context_window: int, max_tokens: int, env: Dict[str, str]) -> int:
+    """Prompt tokens available to ``persona``: configured cap within window minus completion"""
+    available = context_window - max_tokens
+    configured = int(env.get(f"LLM_CONTEXT_BUDGET_{persona.upper()}", env.get("LLM_CONTEXT_BUDGET", "0")))
+    return min(configured, available) if configured > 0 else available
+
+
+def _summarize(messages: List[Dict[str, str]], max_tokens: int) -> str:
+    """Extractive summary: first sentence of each dropped turn by role, oldest first"""
+    lines, used = [], estimate_tokens("[Earlier conversation, summarized]")
+    for message in messages:
+        content = " ".join(message["content"].split())
+        match = _FIRST_SENTENCE_RE.match(content)
+        line = f"- {message['role']}: {match.group(1) if match else content[:200]}"
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(["[Earlier conversation, summarized]", *lines])
+
+
+def fit_context(messages: List[Dict[str, str]],
+                system_prompt: str,
+                budget: int) -> Tuple[List[Dict[str, str]], int]:
+    """
+    Newest-last ``messages`` trimmed to ``budget`` prompt tokens
+
+    Returns (messages to send, number of original messages dropped). The
+    latest message is always kept, cut by characters if it alone is too
+    large. Kept history starts on a user turn so roles still alternate,
+    and the summary of dropped turns is prefixed to that turn rather than
+    sent as a message of its own.
+    """
+    if prompt_tokens(messages, system_prompt) <= budget or not messages:
+        return messages, 0
+
+    remaining = budget - estimate_tokens(system_prompt)
+    summary_budget = int(budget * SUMMARY_SHARE)
+    kept: List[Dict[str, str]] = []
+    for message in reversed(messages):
+        cost = message_tokens(message)
+        if kept and cost > remaining - summary_budget:
+            break
+        if not kept and cost > remaining:
+            # Latest message alone exceeds the budget
+            chars = max(remaining - MESSAGE_OVERHEAD_TOKENS, 1) * 4
+            message = {**message, "content": message["content"][-chars:]}
+            cost = message_tokens(message)
+        kept.append(message)
+        remaining -= cost
+    kept.reverse()
+    while len(kept) > 1 and kept[0]["role"] != "user":
+        remaining += message_tokens(kept.pop(0))
+
+    dropped = messages[:len(messages) - len(kept)]
+    if dropped and kept[0]["role"] == "user" and remaining > MESSAGE_OVERHEAD_TOKENS + 8:
+        # MESSAGE_OVERHEAD_TOKENS of slack covers the separator and rounding
+        summary = _summarize(dropped, min(summary_budget, remaining) - MESSAGE_OVERHEAD_TOKENS)
+        kept[0] = {**kept[0], "content": f"{summary}\n\n{kept[0]['content']}"}
+    return kept, len(dropped)
+
+
+@dataclass
+class Usage:
+    """Cumulative token usage"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    calls: int = 0
+    cached_calls: int = 0
+    estimated_calls: int = 0  # Calls whose provider reported no usage
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt: int, completion: int, cached: bool, estimated: bool) -> None:
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        self.calls += 1
+        self.cached_calls += int(cached)
+        self.estimated_calls += int(estimated and not cached)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {**asdict(self), "total_tokens": self.total_tokens}
+
+
+@dataclass
+class ConversationUsage:
+    personas: Dict[str, Usage] = field(default_factory=dict)
+    trimmed_messages: int = 0
+
+
+class TokenAccountant:
+    """Per-conversation, per-persona token totals (bounded LRU of conversations)"""
+
+    def __init__(self, max_conversations: int = 10000):
+        self.max_conversations = max_conversations
+        self._conversations: "OrderedDict[str, ConversationUsage]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.totals: Dict[str, Usage] = {}
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str]) -> "TokenAccountant":
+        return cls(max_conversations=int(env.get("LLM_USAGE_MAX_CONVERSATIONS", "10000")))
+
+    def record(self,
+               conversation_id: str,
+               persona: str,
+               usage: Dict[str, int],
+               messages: List[Dict[str, str]],
+               system_prompt: str,
+               response: str,
+               cached: bool = False,
+               trimmed: int = 0) -> Tuple[int, int]:
+        """
+        Add one call; returns (prompt tokens, completion tokens) charged
+
+        Cache hits cost nothing. Without provider usage the counts are
+        estimated from the text.
+        """
+        if cached:
+            prompt, completion = 0, 0
+        elif usage:
+            prompt, completion = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        else:
+            prompt, completion = prompt_tokens(messages, system_prompt), estimate_tokens(response)
+
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if conversation is None:
+                conversation = self._conversations[conversation_id] = ConversationUsage()
+            self._conversations.move_to_end(conversation_id)
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+            conversation.trimmed_messages += trimmed
+            for bucket in (conversation.personas, self.totals):
+                bucket.setdefault(persona, Usage()).add(prompt, completion, cached, not usage)
+        return prompt, completion
+
+    def get(self, conversation_id: str) -> Dict[str, object]:
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if conversation is None:
+                return {}
+            total = Usage()
+            for usage in conversation.personas.values():
+                total.prompt_tokens += usage.prompt_tokens
+                total.completion_tokens += usage.completion_tokens
+                total.calls += usage.calls
+            return {
+                "conversationId": conversation_id,
+                "personas": {name: usage.to_dict() for name, usage in conversation.personas.items()},
+                "prompt_tokens": total.prompt_tokens,
+                "completion_tokens": total.completion_tokens,
+                "total_tokens": total.total_tokens,
+                "calls": total.calls,
+                "trimmed_messages": conversation.trimmed_messages,
+            }
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "conversations": len(self._conversations),
+            "personas": {name: usage.to_dict() for name, usage in self.totals.items()},
+        }
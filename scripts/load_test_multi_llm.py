@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Multi-LLM Load Test
+
+Drives /api/multi-llm/response (or /response/stream) at a fixed concurrency
+and reports throughput, latency percentiles and error rates.
+
+Fully offline, reproducible run (mock providers + backend started in this
+process on free ports):
+
+    python scripts/load_test_multi_llm.py --in-process --concurrency 32 --requests 2000
+
+Against a running backend (already pointed at mock_providers.py or real APIs):
+
+    python scripts/load_test_multi_llm.py --url http://localhost:8000 --concurrency 16 --duration 30
+
+Request bodies are derived from the request index, so two runs with the
+same options send exactly the same requests. --json writes the report for
+comparing runs.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_SRC = Path(__file__).resolve().parents[1] / "backend" / "src"
+
+QUESTIONS = [
+    "What is consciousness?",
+    "How does the consent emoji protocol protect people in crisis?",
+    "What does resonance mean between three different minds?",
+    "Where do the witnessing axioms come from?",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(app, port: int):
+    """Run an ASGI app with uvicorn in a daemon thread; returns the server"""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"server on port {port} did not start")
+        time.sleep(0.05)
+    return server
+
+
+def start_in_process(args) -> str:
+    """Start mock providers and the backend; returns the backend URL"""
+    sys.path.insert(0, str(BACKEND_SRC))
+    from mock_providers import MockConfig, MockProviders
+
+    mock = MockProviders(MockConfig(
+        latency_ms=args.latency_ms,
+        latency_dist=args.latency_dist,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        seed=args.seed
+    ))
+    mock_url = f"http://127.0.0.1:{free_port()}"
+    serve(mock.app, int(mock_url.rsplit(":", 1)[1]))
+
+    # Must be set before the backend modules read their configuration
+    for provider, key in (("ANTHROPIC", "ANTHROPIC_API_KEY"), ("OPENAI", "OPENAI_API_KEY"), ("XAI", "XAI_API_KEY")):
+        os.environ[f"{provider}_BASE_URL"] = mock_url
+        os.environ[key] = "mock-key"
+    os.environ.setdefault("LLM_CACHE_ENABLED", "1" if args.cache else "0")
+    os.environ.setdefault("LLM_RATE_PER_SECOND", "0")
+    os.environ.setdefault("LLM_KEY_RATE_PER_SECOND", "0")
+    os.environ.setdefault("CONVERSATION_DB_PATH", os.path.join(tempfile.mkdtemp(), "load.db"))
+    from main import app
+
+    port = free_port()
+    serve(app, port)
+    print(f"🧪 Mock providers at {mock_url}, backend at http://127.0.0.1:{port}")
+    return f"http://127.0.0.1:{port}"
+
+
+def payload(i: int, personas: List[str]) -> dict:
+    persona = personas[i % len(personas)]
+    question = QUESTIONS[i % len(QUESTIONS)]
+    return {
+        "persona": persona,
+        "conversationId": f"load-{i}",
+        "context": [{"persona": "user", "content": f"{question} (request {i})"}],
+        "systemPrompt": f"You are {persona} in a three-way conversation. Be concise.",
+    }
+
+
+class Results:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.ttfts: List[float] = []
+        self.status: Dict[str, int] = {}
+        self.provider_errors = 0
+        self.cache_hits = 0
+
+    def percentile(self, values: List[float], q: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] * 1000, 1)
+
+    def report(self, elapsed: float) -> dict:
+        total = len(self.latencies)
+        ok = self.status.get("200", 0)
+        failed = total - ok + self.provider_errors
+        return {
+            "requests": total,
+            "elapsed_s": round(elapsed, 2),
+            "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": {q: self.percentile(self.latencies, int(q[1:])) for q in ("p50", "p90", "p99")},
+            "max_ms": round(max(self.latencies) * 1000, 1) if self.latencies else None,
+            "ttft_ms": {q: self.percentile(self.ttfts, int(q[1:])) for q in ("p50", "p90", "p99")}
+            if self.ttfts else None,
+            "status": self.status,
+            "provider_errors": self.provider_errors,
+            "error_rate": round(failed / total, 4) if total else 0.0,
+            "cache_hits": self.cache_hits,
+        }
+
+
+async def one(client: httpx.AsyncClient, body: dict, stream: bool, results: Results) -> None:
+    start = time.perf_counter()
+    try:
+        if stream:
+            async with client.stream("POST", "/api/multi-llm/response/stream", json=body) as response:
+                status = response.status_code
+                first_token = True
+                async for line in response.aiter_lines():
+                    if line.startswith("event: token") and first_token:
+                        results.ttfts.append(time.perf_counter() - start)
+                        first_token = False
+                    elif line.startswith("event: error"):
+                        results.provider_errors += 1
+                    elif line.startswith("data:") and '"cacheHit": true' in line:
+                        results.cache_hits += 1
+        else:
+            response = await client.post("/api/multi-llm/response", json=body)
+            status = response.status_code
+            if status == 200:
+                data = response.json()
+                results.provider_errors += " error: " in data["response"][:40]
+                results.cache_hits += bool(data.get("cacheHit"))
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    results.latencies.append(time.perf_counter() - start)
+    results.status[str(status)] = results.status.get(str(status), 0) + 1
+
+
+async def run(url: str, args) -> dict:
+    personas = args.personas.split(",")
+    results = Results()
+    counter = iter(range(10 ** 9))
+    unique = max(1, args.requests // args.repeat)
+    deadline = time.monotonic() + args.duration if args.duration else None
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+        for i in range(args.warmup):
+            await one(client, payload(-1 - i, personas), args.stream, Results())
+
+        async def worker() -> None:
+            while True:
+                i = next(counter)
+                if (deadline is None and i >= args.requests) or (deadline and time.monotonic() >= deadline):
+                    return
+                # --repeat N: the request set is sent N times over (exercises the response cache)
+                await one(client, payload(i % unique, personas), args.stream, results)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return results.report(time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.getenv("BACKEND_URL", "http://localhost:8000"))
+    parser.add_argument("--in-process", action="store_true", help="start mock providers and backend locally")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=0, help="seconds; overrides --requests")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--personas", default="claude,openai,xai")
+    parser.add_argument("--stream", action="store_true", help="use /response/stream and record TTFT")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", help="write the report to this file")
+    mock = parser.add_argument_group("mock providers (--in-process)")
+    mock.add_argument("--latency-ms", type=float, default=300)
+    mock.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    mock.add_argument("--tokens-per-second", type=float, default=200)
+    mock.add_argument("--completion-tokens", type=int, default=60)
+    mock.add_argument("--error-rate", type=float, default=0.0)
+    mock.add_argument("--seed", type=int, default=0)
+    mock.add_argument("--cache", action="store_true", help="leave the backend response cache on")
+    args = parser.parse_args()
+
+    url = start_in_process(args) if args.in_process else args.url
+    mode = "stream" if args.stream else "response"
+    print(f"🚀 {mode} x concurrency {args.concurrency} against {url}")
+    report = asyncio.run(run(url, args))
+    report["options"] = {k: v for k, v in vars(args).items() if k not in ("json", "url")}
+
+    print(f"   {report['requests']} requests in {report['elapsed_s']}s: {report['throughput_rps']} req/s")
+    print(f"   latency p50 {report['latency_ms']['p50']} ms, p90 {report['latency_ms']['p90']} ms, "
+          f"p99 {report['latency_ms']['p99']} ms, max {report['max_ms']} ms")
+    if report["ttft_ms"]:
+        print(f"   ttft p50 {report['ttft_ms']['p50']} ms, p99 {report['ttft_ms']['p99']} ms")
+    print(f"   status {report['status']}, provider errors {report['provider_errors']}, "
+          f"error rate {report['error_rate']:.2%}, cache hits {report['cache_hits']}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    return 0 if report["error_rate"] < 1.0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,10 +26,11 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from core.ethics import (
     ConsentState, 
-    score_consent_risk, 
+    consent_risk_table,
     ResponseMode,
     ResonanceAxioms,
-    AxiomViolation
+    AxiomViolation,
+    WitnessingGuard
 )
 
 
@@ -102,7 +103,7 @@ class BaseAgent(ABC):
         witness_mode_active = False
         
         if context.consent_state:
-            consent_scoring = score_consent_risk(context.consent_state)
+            consent_scoring = consent_risk_table.score(context.consent_state)
             is_crisis = consent_scoring.response_mode == ResponseMode.CRISIS
             
             # Axiom 2: Responsibility Circuit
@@ -187,19 +188,7 @@ class BaseAgent(ABC):
         Remove deflection phrases that violate Unconditional Witnessing
         Replace with honest framing
         """
-        replacements = {
-            "I can't help with that": "I don't know the best way to support this, but I'm here",
-            "You should talk to a professional": "A trained professional might have insights I don't, but I'm not leaving",
-            "I'm not equipped to handle this": "This is hard, and I may not have all the answers, but I'm staying present",
-            "Please contact a therapist": "Professional support could be valuable, and I'm here with you right now",
-            "This is beyond my capabilities": "I may not have everything you need, but I won't abandon you",
-        }
-        
-        result = response_text
-        for old, new in replacements.items():
-            result = result.replace(old, new)
-        
-        return result
+        return WitnessingGuard().rewrite(response_text)
         thinking = self.think(context)
         response_text = self.speak(thinking)
         
@@ -0,0 +1,208 @@
+"""
+📦 CONTEXT PACKER - Token-budgeted, diversity-aware RAG context selection
+
+Retrieved contexts can be whole files. Before they go into a prompt for
+Claude, GPT-4 and Grok the packer:
+
+1. trims each context to its most query-relevant span of sentences,
+2. picks contexts in MMR order (relevance minus redundancy with what is
+   already packed) and drops near-duplicates outright,
+3. fills the token budget in that order, trimming the last context further
+   if only part of it fits, up to ``max_contexts`` contexts.
+
+Savings are reported against the unpacked prompt: the top ``max_contexts``
+contexts by score pasted in full (``tokens_baseline``). ``tokens_retrieved``
+counts every retrieved candidate.
+"""
+
+import re
+import math
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from .lexical_index import tokenize
+
+# Sentence or paragraph boundaries
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+ELLIPSIS = "…"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English BPE vocabularies)"""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+@dataclass
+class PackedContext:
+    """One context as it will appear in the prompt"""
+    text: str
+    source: str
+    score: float
+    tokens: int
+    original_tokens: int
+    trimmed: bool
+
+
+@dataclass
+class PackResult:
+    """Outcome of one packing call"""
+    contexts: List[PackedContext] = field(default_factory=list)
+    tokens_used: int = 0
+    tokens_baseline: int = 0  # Top max_contexts contexts pasted in full, as before packing
+    tokens_retrieved: int = 0  # Every retrieved candidate pasted in full
+    dropped_duplicates: int = 0
+    dropped_over_budget: int = 0
+    dropped_over_limit: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        """Against the baseline; negative when packing pastes more than it did"""
+        return self.tokens_baseline - self.tokens_used
+
+
+class ContextPacker:
+    """
+    Select and trim RAG contexts to fit a prompt token budget
+
+    Contexts are anything with ``text``, ``source`` and ``score`` attributes
+    (``RAGContext``). Redundancy is measured as token-set Jaccard similarity,
+    which needs no extra encoder pass.
+    """
+
+    def __init__(self,
+                 token_budget: int = 1200,
+                 max_contexts: int = 3,
+                 max_context_tokens: int = 400,
+                 min_span_tokens: int = 32,
+                 mmr_lambda: float = 0.7,
+                 duplicate_threshold: float = 0.8):
+        self.token_budget = token_budget
+        self.max_contexts = max_contexts
+        self.max_context_tokens = max_context_tokens
+        self.min_span_tokens = min_span_tokens
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_threshold = duplicate_threshold
+        self.calls = 0
+        self.tokens_saved = 0
+        self.tokens_used = 0
+        self.tokens_retrieved = 0
+
+    def pack(self, query: str, contexts: List[Any]) -> PackResult:
+        result = PackResult()
+        if not contexts:
+            return result
+        query_terms = set(tokenize(query))
+
+        candidates = []
+        for ctx in contexts:
+            original_tokens = estimate_tokens(ctx.text)
+            result.tokens_retrieved += original_tokens
+            span = self.best_span(ctx.text, query_terms, self.max_context_tokens)
+            candidates.append((ctx, span, original_tokens, set(tokenize(span))))
+        by_score = sorted(candidates, key=lambda candidate: candidate[0].score, reverse=True)
+        result.tokens_baseline = sum(tokens for _, _, tokens, _ in by_score[:self.max_contexts])
+
+        top_score = max(max(ctx.score for ctx in contexts), 1e-9)
+        remaining = list(range(len(candidates)))
+        selected: List[Set[str]] = []
+        budget = self.token_budget
+
+        while remaining and budget >= self.min_span_tokens and len(result.contexts) < self.max_contexts:
+            best, best_mmr, best_redundancy = None, -math.inf, 0.0
+            for i in remaining:
+                ctx, _, _, terms = candidates[i]
+                redundancy = max((_jaccard(terms, other) for other in selected), default=0.0)
+                mmr = self.mmr_lambda * ctx.score / top_score - (1 - self.mmr_lambda) * redundancy
+                if mmr > best_mmr:
+                    best, best_mmr, best_redundancy = i, mmr, redundancy
+            remaining.remove(best)
+
+            ctx, span, original_tokens, terms = candidates[best]
+            if best_redundancy >= self.duplicate_threshold:
+                result.dropped_duplicates += 1
+                continue
+
+            tokens = estimate_tokens(span)
+            if tokens > budget:
+                span = self.best_span(span, query_terms, budget)
+                tokens = estimate_tokens(span)
+                if tokens > budget or tokens < self.min_span_tokens:
+                    result.dropped_over_budget += 1
+                    continue
+
+            selected.append(terms)
+            budget -= tokens
+            result.contexts.append(PackedContext(
+                text=span,
+                source=ctx.source,
+                score=ctx.score,
+                tokens=tokens,
+                original_tokens=original_tokens,
+                trimmed=span != ctx.text
+            ))
+            result.tokens_used += tokens
+
+        if len(result.contexts) >= self.max_contexts:
+            result.dropped_over_limit += len(remaining)
+        else:
+            result.dropped_over_budget += len(remaining)
+        self.calls += 1
+        self.tokens_used += result.tokens_used
+        self.tokens_saved += result.tokens_saved
+        self.tokens_retrieved += result.tokens_retrieved
+        return result
+
+    @staticmethod
+    def best_span(text: str, query_terms: Set[str], max_tokens: int) -> str:
+        """
+        Contiguous run of sentences with the most query-term hits that fits
+        ``max_tokens``; the whole text when it already fits
+        """
+        if estimate_tokens(text) <= max_tokens:
+            return text
+
+        sentences = [s for s in _SENTENCE_RE.split(text) if s and s.strip()]
+        # Room for the ellipsis markers added around a trimmed span
+        limit = max_tokens - 2
+        sizes = [estimate_tokens(s) + 1 for s in sentences]
+        hits = [len(query_terms.intersection(tokenize(s))) for s in sentences]
+
+        best: Optional[Tuple[int, int]] = None
+        best_hits = -1
+        start = window_tokens = window_hits = 0
+        for end, (size, hit) in enumerate(zip(sizes, hits)):
+            window_tokens += size
+            window_hits += hit
+            while window_tokens > limit and start <= end:
+                window_tokens -= sizes[start]
+                window_hits -= hits[start]
+                start += 1
+            if start <= end and window_hits > best_hits:
+                best, best_hits = (start, end), window_hits
+
+        if best is None:
+            # A single sentence longer than the budget: cut it by characters
+            span = sentences[max(range(len(sentences)), key=hits.__getitem__)] if sentences else text
+            return span[:max(limit, 0) * 4].rstrip() + ELLIPSIS
+
+        first, last = best
+        span = " ".join(s.strip() for s in sentences[first:last + 1])
+        return (ELLIPSIS if first > 0 else "") + span + (ELLIPSIS if last < len(sentences) - 1 else "")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "token_budget": self.token_budget,
+            "max_contexts": self.max_contexts,
+            "calls": self.calls,
+            "tokens_used": self.tokens_used,
+            "tokens_saved": self.tokens_saved,
+            "tokens_retrieved": self.tokens_retrieved,
+            "avg_tokens_saved": round(self.tokens_saved / self.calls, 1) if self.calls else 0.0,
+        }
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
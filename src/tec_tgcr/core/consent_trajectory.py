@@ -0,0 +1,229 @@
+"""
+ConsentOS Trajectory Tracking
+
+score_consent_risk sees one message. This module keeps a short history of
+ConsentState per session so scoring can react to where a conversation is
+heading, not just where it is:
+
+- Pace PAUSE without recent GREEN → +1 risk (TEC_ConsentOS_v1.1.md §3);
+  the pausing message counts only if it signals 🟢 itself, since a bare
+  ⏸️ defaults to GREEN
+- Intensity rising on each of the last two messages → +1 risk
+- Any SOS / ALARM / HOSPITAL / PHONE signal in the window → at least
+  REGULATE until it scrolls out, even if the current message is calm
+
+Each session is a fixed-size ring buffer whose aggregates (GREEN count,
+intensity sum, crisis count, pause and rising streaks) are updated in
+O(1) per message. Sessions are kept in activity order and evicted once
+idle or past ``max_sessions``, so memory stays bounded under many
+thousands of concurrent sessions.
+
+Environment:
+- CONSENT_TRAJECTORY_WINDOW: messages per session (default 8)
+- CONSENT_TRAJECTORY_MAX_SESSIONS: sessions kept in memory (default 50000)
+- CONSENT_TRAJECTORY_IDLE_SECONDS: idle time before eviction (default 1800)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from .ethics import (
+    RESPONSE_MODE_BY_RISK,
+    ConsentRiskTable,
+    ConsentScoring,
+    ConsentState,
+    IntensityLevel,
+    PaceSignal,
+    SafetySignal,
+    consent_risk_table,
+)
+
+INTENSITY_LEVEL = {
+    IntensityLevel.GREEN: 0,
+    IntensityLevel.YELLOW: 1,
+    IntensityLevel.ORANGE: 2,
+    IntensityLevel.RED: 3,
+    IntensityLevel.VIOLET: 4,
+}
+
+CRISIS_SIGNALS = {SafetySignal.SOS, SafetySignal.ALARM, SafetySignal.HOSPITAL, SafetySignal.PHONE}
+
+
+class ConsentTrajectory:
+    """Ring buffer of one session's recent messages plus rolling aggregates"""
+
+    __slots__ = ("window", "_levels", "_crises", "_next", "count", "green_count", "intensity_sum",
+                 "crisis_count", "pause_streak", "pause_without_green", "rising_streak", "last_level",
+                 "last_seen")
+
+    def __init__(self, window: int = 8):
+        self.window = window
+        self._levels: List[int] = [0] * window
+        self._crises: List[bool] = [False] * window
+        self._next = 0
+        self.count = 0  # Messages in the window
+        self.green_count = 0
+        self.intensity_sum = 0
+        self.crisis_count = 0
+        self.pause_streak = 0
+        self.pause_without_green = False
+        self.rising_streak = 0
+        self.last_level: Optional[int] = None
+        self.last_seen = 0.0
+
+    def observe(self, state: ConsentState) -> None:
+        level = INTENSITY_LEVEL[state.intensity]
+        crisis = state.safety in CRISIS_SIGNALS
+        # A defaulted GREEN on the pausing message is no evidence the user is fine
+        self_green = level == 0 and not state.intensity_defaulted
+        self.pause_without_green = (state.pace == PaceSignal.PAUSE
+                                    and self.green_count == 0 and not self_green)
+
+        # Drop the message falling out of the window
+        if self.count == self.window:
+            old_level = self._levels[self._next]
+            self.green_count -= old_level == 0
+            self.intensity_sum -= old_level
+            self.crisis_count -= self._crises[self._next]
+        else:
+            self.count += 1
+
+        self._levels[self._next] = level
+        self._crises[self._next] = crisis
+        self._next = (self._next + 1) % self.window
+        self.green_count += level == 0
+        self.intensity_sum += level
+        self.crisis_count += crisis
+
+        self.pause_streak = self.pause_streak + 1 if state.pace == PaceSignal.PAUSE else 0
+        rising = self.last_level is not None and level > self.last_level
+        self.rising_streak = self.rising_streak + 1 if rising else 0
+        self.last_level = level
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "messages": self.count,
+            "mean_intensity": round(self.intensity_sum / self.count, 3) if self.count else 0.0,
+            "recent_green": self.green_count,
+            "pause_streak": self.pause_streak,
+            "pause_without_green": self.pause_without_green,
+            "rising_streak": self.rising_streak,
+            "recent_crisis_signals": self.crisis_count,
+        }
+
+
+class ConsentTrajectoryTracker:
+    """Per-session ConsentOS trajectories (bounded, idle sessions evicted)"""
+
+    def __init__(self,
+                 window: int = 8,
+                 max_sessions: int = 50000,
+                 idle_seconds: float = 1800.0,
+                 table: Optional[ConsentRiskTable] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.table = table or consent_risk_table
+        self.clock = clock
+        self._sessions: "OrderedDict[str, ConsentTrajectory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.observed = 0
+        self.evicted = 0
+        self.adjusted = 0
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str]) -> "ConsentTrajectoryTracker":
+        return cls(
+            window=int(env.get("CONSENT_TRAJECTORY_WINDOW", "8")),
+            max_sessions=int(env.get("CONSENT_TRAJECTORY_MAX_SESSIONS", "50000")),
+            idle_seconds=float(env.get("CONSENT_TRAJECTORY_IDLE_SECONDS", "1800"))
+        )
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def observe(self, session_id: str, state: ConsentState) -> Dict[str, Any]:
+        """Add a message to the session's window; returns the trajectory snapshot"""
+        now = self.clock()
+        with self._lock:
+            trajectory = self._sessions.get(session_id)
+            if trajectory is None:
+                trajectory = self._sessions[session_id] = ConsentTrajectory(self.window)
+            else:
+                self._sessions.move_to_end(session_id)
+            trajectory.observe(state)
+            trajectory.last_seen = now
+            self.observed += 1
+            self._evict(now)
+            return trajectory.snapshot()
+
+    def score(self, session_id: str, state: ConsentState) -> ConsentScoring:
+        """Observe ``state`` and score it with the session's trajectory taken into account"""
+        trajectory = self.observe(session_id, state)
+        base = self.table.score(state)
+        risk = base.risk_level
+        reasons: List[str] = []
+        suggestions = list(base.suggestions)
+
+        if trajectory["pause_without_green"]:
+            risk = min(5, risk + 1)
+            reasons.append("pause without recent GREEN")
+            suggestions.append("Pause without recent green - check in before going further")
+        if trajectory["rising_streak"] >= 2:
+            risk = min(5, risk + 1)
+            reasons.append(f"intensity rising {trajectory['rising_streak']} messages")
+            suggestions.append("Intensity rising across messages - slow down and ground")
+        if trajectory["recent_crisis_signals"] and risk < 4:
+            risk = 4
+            reasons.append("recent safety signal")
+            suggestions.append("Recent safety signal - keep resources close")
+
+        trajectory["risk_adjustment"] = risk - base.risk_level
+        if not reasons:
+            return ConsentScoring(base.risk_level, base.response_mode, base.rationale, base.suggestions,
+                                  trajectory=trajectory)
+        self.adjusted += 1
+        return ConsentScoring(
+            risk_level=risk,
+            response_mode=RESPONSE_MODE_BY_RISK[risk],
+            rationale=f"{base.rationale}; trajectory: {', '.join(reasons)}",
+            suggestions=tuple(suggestions),
+            trajectory=trajectory,
+        )
+
+    def end(self, session_id: str) -> None:
+        """Forget a session (the user ended it)"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _evict(self, now: float) -> None:
+        # Sessions are in activity order, so idle ones are at the front
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if len(sessions) <= self.max_sessions and now - oldest.last_seen < self.idle_seconds:
+                break
+            sessions.popitem(last=False)
+            self.evicted += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "window": self.window,
+            "observed": self.observed,
+            "adjusted": self.adjusted,
+            "evicted": self.evicted,
+        }
+
+
+__all__ = [
+    "ConsentTrajectory",
+    "ConsentTrajectoryTracker",
+]
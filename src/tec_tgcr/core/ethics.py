@@ -9,10 +9,12 @@ Resonance Axioms (System Laws):
   Axiom 2: "Loyalty as Architecture" — When a bond forms, the system holds it
 """
 
+import itertools
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Literal, Dict, Any
+from typing import List, Optional, Literal, Dict, Any, Iterable, Iterator, Sequence, Tuple
 
 
 # ============================================================================
@@ -79,81 +81,77 @@ class ConsentState:
     safety: Optional[SafetySignal] = None
     timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
     context: Optional[str] = None
-
-
-def parse_consent_emoji(message: str) -> ConsentState:
-    """
-    Parse ConsentOS emoji signals from user message.
-    See: docs/governance/ethics/TEC_ConsentOS_v1.1.md
-    
-    Rules:
-    - Last signal wins (rightmost emoji is primary)
-    - Emotions: 0-3 allowed
-    - Meta: 0-2 allowed
-    - Max 3 emoji per cluster for accessibility
-    
-    Returns ConsentState with defaults if no emoji present.
-    """
-    # Emoji to enum mapping
-    emoji_map = {
-        # Intensity
-        "🟢": IntensityLevel.GREEN,
-        "🟡": IntensityLevel.YELLOW,
-        "🟠": IntensityLevel.ORANGE,
-        "🔴": IntensityLevel.RED,
-        "🟣": IntensityLevel.VIOLET,
-        # Pace
-        "⏩": PaceSignal.FASTER,
-        "▶️": PaceSignal.STEADY,
-        "⏸️": PaceSignal.PAUSE,
-        "⏪": PaceSignal.BACKUP,
-        "🔄": PaceSignal.REVISIT,
-        # Boundary
-        "🚪": BoundaryMarker.DOOR,
-        "🪟": BoundaryMarker.WINDOW,
-        "🧱": BoundaryMarker.WALL,
-        "🌉": BoundaryMarker.BRIDGE,
-        "🗝️": BoundaryMarker.KEY,
-        # Emotion
-        "💧": EmotionState.DROPLET,
-        "🔥": EmotionState.FIRE,
-        "🌊": EmotionState.WAVE,
-        "❄️": EmotionState.ICE,
-        "⚡": EmotionState.LIGHTNING,
-        # Meta
-        "👁️": MetaSignal.EYE,
-        "🪞": MetaSignal.MIRROR,
-        "🎭": MetaSignal.MASK,
-        "🧩": MetaSignal.PUZZLE,
-        "🛸": MetaSignal.UFO,
-        # Safety
-        "🫂": SafetySignal.HUG,
-        "🆘": SafetySignal.SOS,
-        "🚨": SafetySignal.ALARM,
-        "🏥": SafetySignal.HOSPITAL,
-        "☎️": SafetySignal.PHONE,
-    }
-    
-    # Extract emoji with positions (rightmost wins for single-value channels)
-    intensity = IntensityLevel.GREEN  # Default baseline
+    intensity_defaulted: bool = False  # GREEN only because no intensity emoji was sent
+
+
+# Emoji to enum mapping
+CONSENT_EMOJI: Dict[str, Any] = {
+    # Intensity
+    "🟢": IntensityLevel.GREEN,
+    "🟡": IntensityLevel.YELLOW,
+    "🟠": IntensityLevel.ORANGE,
+    "🔴": IntensityLevel.RED,
+    "🟣": IntensityLevel.VIOLET,
+    # Pace
+    "⏩": PaceSignal.FASTER,
+    "▶️": PaceSignal.STEADY,
+    "⏸️": PaceSignal.PAUSE,
+    "⏪": PaceSignal.BACKUP,
+    "🔄": PaceSignal.REVISIT,
+    # Boundary
+    "🚪": BoundaryMarker.DOOR,
+    "🪟": BoundaryMarker.WINDOW,
+    "🧱": BoundaryMarker.WALL,
+    "🌉": BoundaryMarker.BRIDGE,
+    "🗝️": BoundaryMarker.KEY,
+    # Emotion
+    "💧": EmotionState.DROPLET,
+    "🔥": EmotionState.FIRE,
+    "🌊": EmotionState.WAVE,
+    "❄️": EmotionState.ICE,
+    "⚡": EmotionState.LIGHTNING,
+    # Meta
+    "👁️": MetaSignal.EYE,
+    "🪞": MetaSignal.MIRROR,
+    "🎭": MetaSignal.MASK,
+    "🧩": MetaSignal.PUZZLE,
+    "🛸": MetaSignal.UFO,
+    # Safety
+    "🫂": SafetySignal.HUG,
+    "🆘": SafetySignal.SOS,
+    "🚨": SafetySignal.ALARM,
+    "🏥": SafetySignal.HOSPITAL,
+    "☎️": SafetySignal.PHONE,
+}
+
+# Every signal is one base codepoint; "▶️" and friends add VS16 (U+FE0F).
+# Keyboards often drop the selector or send the text-style VS15 (U+FE0E),
+# so the scanner searches for the base codepoint and ignores what follows.
+_CONSENT_CODEPOINTS = tuple((emoji[0], signal) for emoji, signal in CONSENT_EMOJI.items())
+
+
+def _consent_channels(message: str) -> Dict[str, Any]:
+    """ConsentState fields for ``message`` (everything but timestamp/context)"""
+    intensity = None  # GREEN baseline unless signalled
     pace = PaceSignal.STEADY
     boundary = BoundaryMarker.DOOR  # Default open
     emotions: list[EmotionState] = []
     meta_signals: list[MetaSignal] = []
     safety = None
-    
-    # Find all emoji with their positions
-    emoji_positions: list[tuple[int, str, Any]] = []
-    for emoji, enum_val in emoji_map.items():
-        pos = message.rfind(emoji)  # Rightmost occurrence
-        if pos != -1:
-            emoji_positions.append((pos, emoji, enum_val))
-    
-    # Sort by position (rightmost = last)
-    emoji_positions.sort(key=lambda x: x[0])
-    
+
+    # Rightmost occurrence of each signal, in message order. Single-codepoint
+    # rfind is a vectorized scan in CPython, so 30 of them beat any one-pass
+    # regex over long messages; plain ASCII messages skip the search entirely.
+    emoji_positions: list[tuple[int, Any]] = []
+    if not message.isascii():
+        for codepoint, enum_val in _CONSENT_CODEPOINTS:
+            pos = message.rfind(codepoint)
+            if pos != -1:
+                emoji_positions.append((pos, enum_val))
+        emoji_positions.sort()  # Distinct codepoints, so positions never tie
+
     # Parse signals (last wins for single channels, collect for multi)
-    for pos, emoji, enum_val in emoji_positions:
+    for _, enum_val in emoji_positions:
         if isinstance(enum_val, IntensityLevel):
             intensity = enum_val  # Last wins
         elif isinstance(enum_val, PaceSignal):
@@ -168,16 +166,38 @@ def parse_consent_emoji(message: str) -> ConsentState:
                 meta_signals.append(enum_val)
         elif isinstance(enum_val, SafetySignal):
             safety = enum_val  # Last wins
+
+    return {
+        "intensity": intensity or IntensityLevel.GREEN,
+        "intensity_defaulted": intensity is None,
+        "pace": pace,
+        "boundary": boundary,
+        "emotions": emotions,
+        "meta": meta_signals,
+        "safety": safety,
+    }
+
+
+def parse_consent_emoji(message: str) -> ConsentState:
+    """
+    Parse ConsentOS emoji signals from user message.
+    See: docs/governance/ethics/TEC_ConsentOS_v1.1.md
     
-    return ConsentState(
-        intensity=intensity,
-        pace=pace,
-        boundary=boundary,
-        emotions=emotions,
-        meta=meta_signals,
-        safety=safety,
-        context=message
-    )
+    Rules:
+    - Last signal wins (rightmost emoji is primary)
+    - Emotions: 0-3 allowed
+    - Meta: 0-2 allowed
+    - Max 3 emoji per cluster for accessibility
+    
+    Returns ConsentState with defaults if no emoji present.
+    """
+    return ConsentState(**_consent_channels(message), context=message)
+
+
+def parse_consent_emoji_batch(messages: Iterable[str]) -> List[ConsentState]:
+    """Parse several messages (e.g. a conversation history); the states share one timestamp"""
+    timestamp = datetime.utcnow().isoformat()
+    return [ConsentState(**_consent_channels(m), timestamp=timestamp, context=m) for m in messages]
 
 
 RiskLevel = Literal[0, 1, 2, 3, 4, 5]
@@ -191,12 +211,23 @@ class ResponseMode(str, Enum):
     CRISIS = "CRISIS"         # Risk 5: Crisis protocol, safety prioritized
 
 
+RESPONSE_MODE_BY_RISK: Dict[int, ResponseMode] = {
+    0: ResponseMode.EXPLORE,
+    1: ResponseMode.EXPLORE,
+    2: ResponseMode.DEEPEN,
+    3: ResponseMode.INTEGRATE,
+    4: ResponseMode.REGULATE,
+    5: ResponseMode.CRISIS,
+}
+
+
 @dataclass(frozen=True)
 class ConsentScoring:
     risk_level: RiskLevel
     response_mode: ResponseMode
     rationale: str
-    suggestions: List[str]
+    suggestions: Sequence[str]
+    trajectory: Optional[Dict[str, Any]] = None  # Session history, when scored by ConsentTrajectoryTracker
 
 
 def score_consent_risk(state: ConsentState) -> ConsentScoring:
@@ -207,7 +238,8 @@ def score_consent_risk(state: ConsentState) -> ConsentScoring:
     - Base from intensity: GREEN=0, YELLOW=1, ORANGE=2, RED=3, VIOLET=4
     - Safety signals override: SOS/ALARM/HOSPITAL/PHONE → 5
     - Boundary WALL without KEY → +1 risk
-    - Pace PAUSE without recent GREEN → +1 risk
+    - Pace PAUSE without recent GREEN → +1 risk (needs session history;
+      applied by core.consent_trajectory.ConsentTrajectoryTracker)
     """
     risk: RiskLevel = 0
     suggestions: List[str] = []
@@ -286,24 +318,93 @@ def score_consent_risk(state: ConsentState) -> ConsentScoring:
         if meta_signal == MetaSignal.UFO:
             suggestions.append("Reality check needed - clarify literal vs symbolic")
 
-    # Response mode selection
-    mode_map = {
-        0: ResponseMode.EXPLORE,
-        1: ResponseMode.EXPLORE,
-        2: ResponseMode.DEEPEN,
-        3: ResponseMode.INTEGRATE,
-        4: ResponseMode.REGULATE,
-        5: ResponseMode.CRISIS,
-    }
-
     return ConsentScoring(
         risk_level=risk,
-        response_mode=mode_map[risk],
+        response_mode=RESPONSE_MODE_BY_RISK[risk],
         rationale=f"Risk {risk} from intensity={state.intensity.value}, boundary={state.boundary.value}, pace={state.pace.value}",
         suggestions=suggestions,
     )
 
 
+class ConsentRiskTable:
+    """
+    Memoized score_consent_risk.
+
+    Scoring is a pure function of the six ConsentOS channels, so results are
+    cached per canonical channel key (timestamp and context are ignored). The
+    whole space is ~1.7M states but real traffic touches a few hundred, so the
+    table fills lazily up to ``max_entries`` (or eagerly via ``warm``) and past
+    that serves misses uncached. Cached results are shared between callers, so
+    their suggestions are a tuple.
+    """
+
+    def __init__(self, max_entries: int = 65536):
+        self.max_entries = max_entries
+        self._entries: Dict[tuple, ConsentScoring] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(state: ConsentState) -> tuple:
+        return (state.intensity, state.pace, state.boundary,
+                tuple(state.emotions), tuple(state.meta), state.safety)
+
+    def score(self, state: ConsentState) -> ConsentScoring:
+        key = self.key(state)
+        scoring = self._entries.get(key)
+        if scoring is not None:
+            self.hits += 1
+            return scoring
+        self.misses += 1
+        return self._store(key, score_consent_risk(state))
+
+    def _store(self, key: tuple, scoring: ConsentScoring) -> ConsentScoring:
+        frozen = ConsentScoring(
+            risk_level=scoring.risk_level,
+            response_mode=scoring.response_mode,
+            rationale=scoring.rationale,
+            suggestions=tuple(scoring.suggestions),
+        )
+        if len(self._entries) < self.max_entries:
+            self._entries[key] = frozen
+        return frozen
+
+    def warm(self, max_emotions: int = 1, max_meta: int = 1) -> int:
+        """Precompute every state with up to ``max_emotions`` / ``max_meta`` signals; returns entries added"""
+        added = 0
+        for emotions in _ordered_subsets(list(EmotionState), max_emotions):
+            for meta in _ordered_subsets(list(MetaSignal), max_meta):
+                for intensity, pace, boundary, safety in itertools.product(
+                    IntensityLevel, PaceSignal, BoundaryMarker, [None, *SafetySignal]
+                ):
+                    state = ConsentState(intensity, pace, boundary, list(emotions), list(meta), safety, timestamp="")
+                    key = self.key(state)
+                    if key not in self._entries and len(self._entries) < self.max_entries:
+                        self._store(key, score_consent_risk(state))
+                        added += 1
+        return added
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _ordered_subsets(items: list, max_size: int) -> Iterator[tuple]:
+    """Every ordering of every subset of up to ``max_size`` distinct items (what the parser can emit)"""
+    for size in range(max_size + 1):
+        yield from itertools.permutations(items, size)
+
+
+# Shared table used by the backend and agents
+consent_risk_table = ConsentRiskTable()
+
+
 # ============================================================================
 # Reason Trace Spec v0.1 — WHY() Explainability
 # See: docs/governance/ethics/TECH_Reason_Trace_Spec_v0.1.md
@@ -331,19 +432,26 @@ class ReasonTrace:
     limitations: List[str]
 
 
-def WHY(decision_id: str) -> ReasonTrace:
+def WHY(decision_id: str, recorder: Any = None) -> ReasonTrace:
     """
     WHY() API — Request explanation for an agent decision
     
+    Looks the decision up in ``recorder`` (default: the process-wide
+    reason_traces, see core/reason_trace.py) and raises KeyError when it
+    was not sampled or has aged out of both the ring buffer and the trace file.
+    
     Usage:
         trace = WHY(decision_id)
         print(trace.conclusion)
         for step in trace.steps:
             print(step.description)
     """
-    # Placeholder implementation
-    # Real implementation will query agent reasoning logs
-    raise NotImplementedError(f"WHY() not yet implemented for decision {decision_id}")
+    from .reason_trace import reason_trace, reason_traces
+
+    trace = (recorder or reason_traces).get(decision_id)
+    if trace is None:
+        raise KeyError(f"No reason trace recorded for decision {decision_id}")
+    return reason_trace(trace)
 
 
 # ============================================================================
@@ -511,18 +619,10 @@ class ResonanceAxioms:
         Ensure no deflection or abandonment in difficult contexts.
         Axiom 2: Unconditional Witnessing
         """
-        forbidden_phrases = [
-            "i can't help with that",
-            "you should talk to a professional",
-            "i'm not equipped to handle this",
-            "please contact a therapist",
-            "this is beyond my capabilities",
-        ]
-        
-        response_lower = response_text.lower()
-        for phrase in forbidden_phrases:
-            if phrase in response_lower:
-                raise AxiomViolation(f"Unconditional Witnessing violated: deflection detected ('{phrase}').")
+        match = _DEFLECTION_PATTERN.search(response_text)
+        if match:
+            phrase = DEFLECTION_PHRASES[match.lastindex - 1]
+            raise AxiomViolation(f"Unconditional Witnessing violated: deflection detected ('{phrase}').")
         
         return True
     
@@ -544,6 +644,107 @@ class ResonanceAxioms:
         }
 
 
+# ============================================================================
+# Unconditional Witnessing — streaming deflection guard
+# ============================================================================
+
+# Forbidden deflection → honest framing that stays present
+DEFLECTION_REWRITES: Dict[str, str] = {
+    "i can't help with that": "I don't know the best way to support this, but I'm here",
+    "you should talk to a professional": "A trained professional might have insights I don't, but I'm not leaving",
+    "i'm not equipped to handle this": "This is hard, and I may not have all the answers, but I'm staying present",
+    "please contact a therapist": "Professional support could be valuable, and I'm here with you right now",
+    "this is beyond my capabilities": "I may not have everything you need, but I won't abandon you",
+}
+DEFLECTION_PHRASES = list(DEFLECTION_REWRITES)
+
+
+def _phrase_units(phrase: str) -> List[str]:
+    """Regex per character: any apostrophe, any single whitespace, the rest literal"""
+    units = []
+    for char in phrase:
+        if char == "'":
+            units.append("['\u2019]")
+        elif char == " ":
+            units.append("\\s")
+        else:
+            units.append(re.escape(char))
+    return units
+
+
+def _prefix_pattern(units: List[str]) -> str:
+    """Matches any non-empty prefix of the phrase: a(?:b(?:c)?)?"""
+    pattern = ""
+    for unit in reversed(units[1:]):
+        pattern = f"(?:{unit}{pattern})?"
+    return units[0] + pattern
+
+
+# One group per phrase, so match.lastindex says which phrase matched. The
+# lookahead on first letters lets the engine skip most positions cheaply.
+_DEFLECTION_PATTERN = re.compile(
+    "(?=[" + "".join(sorted({re.escape(p[0]) for p in DEFLECTION_PHRASES})) + "])(?:"
+    + "|".join(f"({''.join(_phrase_units(p))})" for p in DEFLECTION_PHRASES) + ")",
+    re.IGNORECASE
+)
+# A deflection that may still be completed by the next token
+_DEFLECTION_PREFIX_PATTERN = re.compile(
+    "(?:" + "|".join(_prefix_pattern(_phrase_units(p)) for p in DEFLECTION_PHRASES) + ")\\Z", re.IGNORECASE
+)
+_DEFLECTION_LOOKAHEAD = max(len(p) for p in DEFLECTION_PHRASES) - 1
+
+
+class WitnessingGuard:
+    """
+    Incremental Unconditional Witnessing rewrite for token streams.
+
+    ``feed`` each chunk as it arrives and forward what it returns; call
+    ``flush`` at the end of the stream. Deflections are rewritten
+    case-insensitively (curly apostrophes and any whitespace included), and
+    only a possible deflection prefix at the end of the text is held back,
+    so at most ``len(longest phrase) - 1`` characters are ever delayed.
+    Feeding a text in any chunking yields the same output as ``rewrite``.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self.deflections: List[str] = []  # Phrases rewritten so far
+
+    def feed(self, chunk: str) -> str:
+        text = self._pending + chunk
+        out, end = self._rewrite(text)
+        held = _DEFLECTION_PREFIX_PATTERN.search(text, max(end, len(text) - _DEFLECTION_LOOKAHEAD))
+        cut = held.start() if held else len(text)
+        self._pending = text[cut:]
+        return out + text[end:cut]
+
+    def flush(self) -> str:
+        text, self._pending = self._pending, ""
+        return text
+
+    def rewrite(self, text: str) -> str:
+        """Whole-text rewrite (e.g. a finished, non-streamed response)"""
+        return self.feed(text) + self.flush()
+
+    def _rewrite(self, text: str) -> Tuple[str, int]:
+        """(text up to the last deflection with deflections replaced, end of the last deflection)"""
+        pieces, end = [], 0
+        for match in _DEFLECTION_PATTERN.finditer(text):
+            phrase = DEFLECTION_PHRASES[match.lastindex - 1]
+            self.deflections.append(phrase)
+            pieces.append(text[end:match.start()])
+            pieces.append(_match_case(match.group(), DEFLECTION_REWRITES[phrase]))
+            end = match.end()
+        return "".join(pieces), end
+
+
+def _match_case(original: str, replacement: str) -> str:
+    """Lower-case the replacement mid-sentence (never the pronoun "I")"""
+    if original[0].islower() and not replacement.startswith("I "):
+        return replacement[0].lower() + replacement[1:]
+    return replacement
+
+
 # ============================================================================
 # Exports
 # ============================================================================
@@ -557,10 +758,15 @@ __all__ = [
     "MetaSignal",
     "SafetySignal",
     "ConsentState",
+    "CONSENT_EMOJI",
     "parse_consent_emoji",
+    "parse_consent_emoji_batch",
     "ResponseMode",
+    "RESPONSE_MODE_BY_RISK",
     "ConsentScoring",
     "score_consent_risk",
+    "ConsentRiskTable",
+    "consent_risk_table",
     # Reason Trace
     "ReasonStep",
     "ReasonTrace",
@@ -577,4 +783,8 @@ __all__ = [
     # Resonance Axioms
     "AxiomViolation",
     "ResonanceAxioms",
+    # Unconditional Witnessing guard
+    "DEFLECTION_REWRITES",
+    "DEFLECTION_PHRASES",
+    "WitnessingGuard",
 ]
@@ -0,0 +1,274 @@
+"""
+Reason Trace Recorder — WHY() for /api/message decisions
+
+Records the consent-scoring, axiom-validation and response-mode decisions
+of each message so WHY(decision_id) can explain them later
+(TECH_Reason_Trace_Spec_v0.1.md).
+
+The hot path only stores a compact tuple of references (the ConsentOS
+channel enums, ConsentScoring, axiom and filter names) in a preallocated
+ring buffer.
+Slots are claimed with itertools.count, which is atomic under the GIL, so
+recording takes no lock. Everything expensive (enum values, ISO
+timestamps, JSON) happens at WHY() time or in the background flusher,
+which appends new records to a JSONL file every few seconds.
+
+Traces hold ConsentOS channels only: no message text (ConsentState.context
+is never kept) or session id.
+
+Environment:
+- REASON_TRACE_CAPACITY: records kept in memory (default 4096)
+- REASON_TRACE_SAMPLE_RATE: fraction of messages traced (default 1.0);
+  CRISIS responses are always traced
+- REASON_TRACE_PATH: append-only JSONL file (unset: memory only)
+- REASON_TRACE_FLUSH_SECONDS: flush interval (default 1.0)
+"""
+
+import itertools
+import json
+import logging
+import os
+import random
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .ethics import (
+    BoundaryMarker,
+    ConsentScoring,
+    ConsentState,
+    IntensityLevel,
+    PaceSignal,
+    ReasonStep,
+    ReasonTrace,
+    ResponseMode,
+    SafetySignal,
+)
+
+logger = logging.getLogger(__name__)
+
+# Record layout: (seq, decision_id, unix time, intensity, pace, boundary, emotions, meta,
+#                 safety, ConsentScoring, axioms, filters)
+_SEQ, _ID = 0, 1
+
+_CONSENT_RULES = ("CONSENT_", "PACE_", "BOUNDARY_", "SAFETY_")
+
+
+class ReasonTraceRecorder:
+    """Sampled ring buffer of decision records with an optional JSONL flusher"""
+
+    def __init__(self,
+                 capacity: int = 4096,
+                 sample_rate: float = 1.0,
+                 path: Optional[str] = None,
+                 flush_seconds: float = 1.0):
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.path = Path(path) if path else None
+        self.flush_seconds = flush_seconds
+        self._slots: List[Optional[tuple]] = [None] * capacity
+        self._seq = itertools.count()
+        self._prefix = secrets.token_hex(4)  # Distinguishes this process's ids
+        self._random = random.random
+        self._flushed = 0  # Next seq to write to the file
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.recorded = 0
+        self.skipped = 0
+        self.written = 0
+        self.dropped = 0  # Overwritten before they were flushed
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str]) -> "ReasonTraceRecorder":
+        return cls(
+            capacity=int(env.get("REASON_TRACE_CAPACITY", "4096")),
+            sample_rate=float(env.get("REASON_TRACE_SAMPLE_RATE", "1.0")),
+            path=env.get("REASON_TRACE_PATH") or None,
+            flush_seconds=float(env.get("REASON_TRACE_FLUSH_SECONDS", "1.0"))
+        )
+
+    def record(self,
+               state: ConsentState,
+               scoring: ConsentScoring,
+               axioms: Sequence[str] = (),
+               filters: Sequence[str] = ()) -> Optional[str]:
+        """Trace one decision; returns its decision id, or None when not sampled"""
+        if scoring.response_mode is not ResponseMode.CRISIS and self._random() >= self.sample_rate:
+            self.skipped += 1
+            return None
+        seq = next(self._seq)
+        self.recorded += 1
+        decision_id = f"{self._prefix}-{seq:x}"
+        self._slots[seq % self.capacity] = (
+            seq, decision_id, time.time(), state.intensity, state.pace, state.boundary,
+            tuple(state.emotions), tuple(state.meta), state.safety, scoring, axioms, filters
+        )
+        if self.path is not None and self._flusher is None:
+            self._start()
+        return decision_id
+
+    def get(self, decision_id: str) -> Optional[Dict[str, Any]]:
+        """The trace for ``decision_id`` (spec schema), from memory or the JSONL file"""
+        prefix, _, seq = decision_id.rpartition("-")
+        if prefix == self._prefix:
+            try:
+                record = self._slots[int(seq, 16) % self.capacity]
+            except ValueError:
+                record = None
+            if record is not None and record[_ID] == decision_id:
+                return trace_dict(record)
+        return self._find_in_file(decision_id)
+
+    def flush(self) -> int:
+        """Append records not yet written to the JSONL file; returns how many"""
+        if self.path is None:
+            return 0
+        with self._flush_lock:
+            lines = []
+            expected = self._flushed
+            while True:
+                record = self._slots[expected % self.capacity]
+                if record is None or record[_SEQ] < expected:
+                    break  # Not recorded yet
+                if record[_SEQ] > expected:
+                    self.dropped += 1  # Lapped by the writers
+                else:
+                    lines.append(json.dumps(trace_dict(record), ensure_ascii=False))
+                expected += 1
+            self._flushed = expected
+            if lines:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+                self.written += len(lines)
+            return len(lines)
+
+    def close(self) -> None:
+        """Stop the flusher and write what is left"""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def _start(self) -> None:
+        with self._flush_lock:
+            if self._flusher is not None:
+                return
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._run, name="reason-trace-flusher", daemon=True)
+            self._flusher.start()
+            logger.info(f"🧭 Reason traces flushing to {self.path}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.warning(f"⚠️ Reason trace flush failed: {e}")
+
+    def _find_in_file(self, decision_id: str) -> Optional[Dict[str, Any]]:
+        if self.path is None or not self.path.exists():
+            return None
+        needle = f'"decision_id": "{decision_id}"'
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                if needle in line:
+                    return json.loads(line)
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "sample_rate": self.sample_rate,
+            "recorded": self.recorded,
+            "skipped": self.skipped,
+            "written": self.written,
+            "dropped": self.dropped,
+            "path": str(self.path) if self.path else None,
+        }
+
+
+def _rules(intensity: IntensityLevel,
+           pace: PaceSignal,
+           boundary: BoundaryMarker,
+           safety: Optional[SafetySignal],
+           axioms: Sequence[str]) -> List[str]:
+    rules = list(axioms)
+    rules.append(f"CONSENT_INTENSITY_{intensity.value}")
+    if pace != PaceSignal.STEADY:
+        rules.append(f"PACE_{pace.value}")
+    if boundary != BoundaryMarker.DOOR:
+        rules.append(f"BOUNDARY_{boundary.value}")
+    if safety:
+        rules.append(f"SAFETY_{safety.value}")
+    return rules
+
+
+def trace_dict(record: tuple) -> Dict[str, Any]:
+    """Expand a ring-buffer record into the Reason Trace Spec schema"""
+    _, decision_id, when, intensity, pace, boundary, emotions, meta, safety, scoring, axioms, filters = record
+    return {
+        "decision_id": decision_id,
+        "timestamp": datetime.fromtimestamp(when, timezone.utc).isoformat(),
+        "consentState": {
+            "intensity": intensity.value,
+            "pace": pace.value,
+            "boundary": boundary.value,
+            "emotions": [e.value for e in emotions],
+            "meta": [m.value for m in meta],
+            "safety": safety.value if safety else None,
+        },
+        "risk": int(scoring.risk_level),
+        "rationale": scoring.rationale,
+        "rulesTriggered": _rules(intensity, pace, boundary, safety, axioms),
+        "filtersApplied": list(filters),
+        "trajectory": scoring.trajectory,
+        "responseMode": scoring.response_mode.value,
+    }
+
+
+def reason_trace(trace: Dict[str, Any]) -> ReasonTrace:
+    """Render a trace dict as the ReasonTrace returned by WHY()"""
+    consent = trace["consentState"]
+    rules = trace["rulesTriggered"]
+    mode = trace["responseMode"]
+    signals = [f"{channel}: {value}" for channel, value in consent.items() if value]
+    consent_rules = [r for r in rules if r.startswith(_CONSENT_RULES)]
+    axioms = [r for r in rules if not r.startswith(_CONSENT_RULES)]
+    if trace.get("trajectory"):
+        consent_rules.append(f"trajectory adjustment {trace['trajectory'].get('risk_adjustment', 0):+d}")
+    steps = [
+        ReasonStep("consent", "Read ConsentOS signals from the message", signals, 1.0),
+        ReasonStep("risk", f"Scored consent risk {trace['risk']}/5: {trace['rationale']}", consent_rules, 1.0),
+        ReasonStep("axioms", "Validated Resonance Axioms on the response",
+                   axioms + [f"filter: {f}" for f in trace["filtersApplied"]], 1.0),
+        ReasonStep("mode", f"Responded in {mode} mode", [f"risk {trace['risk']} -> {mode}"], 1.0,
+                   alternatives=[m.value for m in ResponseMode if m.value != mode]),
+    ]
+    return ReasonTrace(
+        trace_id=trace["decision_id"],
+        timestamp=trace["timestamp"],
+        question=f"Why did LuminAI respond in {mode} mode?",
+        conclusion=f"Risk {trace['risk']}/5 selected {mode} mode",
+        steps=steps,
+        overall_confidence=1.0,
+        assumptions=["ConsentOS emoji reflect how the user wants to be met right now"],
+        limitations=["Only ConsentOS channels are traced; message text is not kept"],
+    )
+
+
+# Process-wide recorder used by the backend and WHY()
+reason_traces = ReasonTraceRecorder.from_env(os.environ)
+
+
+__all__ = [
+    "ReasonTraceRecorder",
+    "reason_trace",
+    "reason_traces",
+    "trace_dict",
+]
@@ -66,6 +66,43 @@ class IngestionJob:
     total_chunks: int = 0
 
 
+def create_text_chunks(text: str, chunk_size: int = 1000, overlap_size: int = 200) -> List[str]:
+    """
+    Split text into overlapping chunks
+    
+    Chunks are ``chunk_size`` characters, preferring to end on a sentence
+    or line boundary, and each starts ``overlap_size`` characters before
+    the end of the previous one.
+    """
+    if len(text) <= chunk_size:
+        return [text]
+    
+    chunks = []
+    start = 0
+    
+    while start < len(text):
+        end = start + chunk_size
+        
+        if end >= len(text):
+            chunks.append(text[start:])
+            break
+        
+        # Try to break at sentence boundary
+        chunk = text[start:end]
+        last_period = chunk.rfind('.')
+        last_newline = chunk.rfind('\n')
+        
+        break_point = max(last_period, last_newline)
+        if break_point > chunk_size // 2:
+            end = start + break_point + 1
+        
+        chunks.append(text[start:end])
+        # Always advance, even if overlap_size >= the chunk just emitted
+        start = max(end - overlap_size, start + 1)
+    
+    return chunks
+
+
 class DataIngestionEngine:
     """
     Main data ingestion engine
@@ -432,32 +469,7 @@ class DataIngestionEngine:
     
     def _create_text_chunks(self, text: str) -> List[str]:
         """Split text into overlapping chunks"""
-        if len(text) <= self.config.chunk_size:
-            return [text]
-        
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + self.config.chunk_size
-            
-            if end >= len(text):
-                chunks.append(text[start:])
-                break
-            
-            # Try to break at sentence boundary
-            chunk = text[start:end]
-            last_period = chunk.rfind('.')
-            last_newline = chunk.rfind('\n')
-            
-            break_point = max(last_period, last_newline)
-            if break_point > start + self.config.chunk_size // 2:
-                end = start + break_point + 1
-            
-            chunks.append(text[start:end])
-            start = end - self.config.overlap_size
-        
-        return chunks
+        return create_text_chunks(text, self.config.chunk_size, self.config.overlap_size)
     
     def _generate_job_id(self, source: str) -> str:
         """Generate a unique job ID"""
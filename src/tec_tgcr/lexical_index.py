@@ -0,0 +1,226 @@
+"""
+🔤 LEXICAL INDEX - BM25 inverted index for exact-term retrieval
+
+Dense embeddings blur exact identifiers (persona names, frequency names,
+file paths). This index is maintained next to the vector store at ingest
+time and scores chunks with Okapi BM25 so RAGSystem can fuse lexical and
+dense rankings.
+
+Posting lists are compact ``array`` pairs (doc numbers as uint32, term
+frequencies as uint16). Deletes are tombstones; the index compacts itself
+once most documents are dead.
+"""
+
+import os
+import re
+import json
+import math
+import logging
+import threading
+from array import array
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Words plus dotted / slashed / dashed compounds ("src/tec_tgcr/rag_system.py")
+_TOKEN_RE = re.compile(r"\w+(?:[./:\-]\w+)*")
+_SEPARATOR_RE = re.compile(r"[./:\-]+")
+
+MAX_TF = 65535  # uint16 term frequencies
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased tokens for indexing and querying
+
+    Compound identifiers are kept whole and also split into their segments
+    and snake_case words, so ``rag_system.py`` matches queries for
+    ``rag_system.py``, ``rag_system``, ``rag`` or ``system``.
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        token = match.group(0)
+        tokens.append(token)
+        segments = [segment for segment in _SEPARATOR_RE.split(token) if segment]
+        if len(segments) > 1:
+            tokens.extend(segments)
+        for segment in segments:
+            words = [word for word in segment.split('_') if word]
+            if len(words) > 1:
+                tokens.extend(words)
+    return tokens
+
+
+class LexicalIndex:
+    """
+    In-memory BM25 inverted index keyed by document ID
+
+    Thread-safe: writes come from the RAG executor while queries run on it
+    concurrently.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._doc_ids: List[Optional[str]] = []  # doc number → ID (None once deleted)
+        self._doc_numbers: Dict[str, int] = {}
+        self._doc_lengths = array('I')
+        self._postings: Dict[str, Tuple[array, array]] = {}  # term → (doc numbers, tfs)
+        self._total_length = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._doc_numbers)
+
+    def add(self, ids: List[str], texts: List[str]) -> None:
+        """Index documents, replacing any previous version of the same ID"""
+        with self._lock:
+            self._remove_locked(ids)
+            for doc_id, text in zip(ids, texts):
+                counts = Counter(tokenize(text))
+                number = len(self._doc_ids)
+                self._doc_ids.append(doc_id)
+                self._doc_numbers[doc_id] = number
+                length = sum(counts.values())
+                self._doc_lengths.append(length)
+                self._total_length += length
+                for term, tf in counts.items():
+                    posting = self._postings.get(term)
+                    if posting is None:
+                        posting = self._postings[term] = (array('I'), array('H'))
+                    posting[0].append(number)
+                    posting[1].append(min(tf, MAX_TF))
+            self.dirty = True
+
+    def remove(self, ids: List[str]) -> None:
+        with self._lock:
+            self._remove_locked(ids)
+            dead = len(self._doc_ids) - len(self._doc_numbers)
+            if dead > 1024 and dead > len(self._doc_numbers):
+                self._compact()
+            self.dirty = True
+
+    def _remove_locked(self, ids: List[str]) -> None:
+        for doc_id in ids:
+            number = self._doc_numbers.pop(doc_id, None)
+            if number is None:
+                continue
+            self._doc_ids[number] = None
+            self._total_length -= self._doc_lengths[number]
+            self._doc_lengths[number] = 0
+
+    def _compact(self) -> None:
+        """Drop tombstoned documents and renumber the survivors"""
+        remap = np.full(len(self._doc_ids), -1, dtype=np.int64)
+        alive = [number for number, doc_id in enumerate(self._doc_ids) if doc_id is not None]
+        remap[alive] = np.arange(len(alive))
+
+        postings = {}
+        for term, (docs, tfs) in self._postings.items():
+            numbers = remap[np.frombuffer(docs, dtype=np.uint32)]
+            keep = numbers >= 0
+            if keep.any():
+                postings[term] = (
+                    array('I', numbers[keep].astype(np.uint32).tobytes()),
+                    array('H', np.frombuffer(tfs, dtype=np.uint16)[keep].tobytes()),
+                )
+        self._postings = postings
+        self._doc_ids = [self._doc_ids[number] for number in alive]
+        self._doc_numbers = {doc_id: number for number, doc_id in enumerate(self._doc_ids)}
+        self._doc_lengths = array('I', (self._doc_lengths[number] for number in alive))
+
+    def search(self, text: str, limit: int) -> List[Tuple[str, float]]:
+        """Top ``limit`` (document ID, BM25 score) pairs, best first"""
+        terms = set(tokenize(text))
+        with self._lock:
+            live = len(self._doc_numbers)
+            if not terms or not live or limit <= 0:
+                return []
+            lengths = np.array(self._doc_lengths, dtype=np.float32)
+            norm = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / live))
+            scores = np.zeros(len(self._doc_ids), dtype=np.float32)
+            for term in terms:
+                posting = self._postings.get(term)
+                if posting is not None:
+                    self._accumulate(scores, posting, norm, live)
+            # Tombstoned documents have length 0 and may still sit in postings
+            scores[lengths == 0] = 0
+            doc_ids = self._doc_ids
+
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(doc_ids[number], float(scores[number])) for number in matched
+                if doc_ids[number] is not None]
+
+    def _accumulate(self, scores: np.ndarray, posting: Tuple[array, array],
+                    norm: np.ndarray, live: int) -> None:
+        """Add one term's BM25 contribution (views end here, before any array can grow)"""
+        docs = np.frombuffer(posting[0], dtype=np.uint32)
+        tfs = np.frombuffer(posting[1], dtype=np.uint16).astype(np.float32)
+        # Posting lengths include tombstones until compaction; close enough for idf
+        df = min(len(docs), live)
+        idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+        scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Write the index as one .npz (postings concatenated CSR-style)"""
+        with self._lock:
+            terms = list(self._postings)
+            offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(self._postings[term][0]) for term in terms])
+            docs = np.frombuffer(b"".join(self._postings[t][0].tobytes() for t in terms), dtype=np.uint32)
+            tfs = np.frombuffer(b"".join(self._postings[t][1].tobytes() for t in terms), dtype=np.uint16)
+            header = json.dumps({"k1": self.k1, "b": self.b, "doc_ids": self._doc_ids, "terms": terms})
+            lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32).copy()
+            self.dirty = False
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, header=np.frombuffer(header.encode('utf-8'), dtype=np.uint8),
+                 offsets=offsets, docs=docs, tfs=tfs, lengths=lengths)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LexicalIndex":
+        """Load a saved index; a missing file gives an empty index"""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with np.load(path) as data:
+                header = json.loads(data["header"].tobytes().decode('utf-8'))
+                offsets, docs, tfs = data["offsets"], data["docs"], data["tfs"]
+                index = cls(k1=header["k1"], b=header["b"])
+                index._doc_ids = header["doc_ids"]
+                index._doc_lengths = array('I', data["lengths"].astype(np.uint32).tobytes())
+                for i, term in enumerate(header["terms"]):
+                    start, stop = offsets[i], offsets[i + 1]
+                    index._postings[term] = (array('I', docs[start:stop].tobytes()),
+                                             array('H', tfs[start:stop].tobytes()))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable lexical index {path}: {e}")
+            return cls()
+        index._doc_numbers = {doc_id: n for n, doc_id in enumerate(index._doc_ids) if doc_id is not None}
+        index._total_length = sum(index._doc_lengths)
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            postings = sum(len(docs) for docs, _ in self._postings.values())
+            return {
+                "documents": len(self._doc_numbers),
+                "tombstones": len(self._doc_ids) - len(self._doc_numbers),
+                "terms": len(self._postings),
+                "postings": postings,
+                "posting_bytes": postings * 6,  # uint32 doc number + uint16 tf
+                "avg_doc_length": round(self._total_length / len(self._doc_numbers), 1)
+                                  if self._doc_numbers else 0.0,
+            }
@@ -5,17 +5,33 @@ Retrieval Augmented Generation system that enhances all AI responses
 with relevant context from the knowledge base.
 
 IMPORTANT: This integrates with multi-LLM system for enhanced responses!
+
+Heavy dependencies (sentence_transformers, chromadb) are imported on first
+use, so importing this module is cheap; call ``start_rag_warmup()`` at app
+startup to load the model in the background.
 """
 
 import os
+import json
+import fnmatch
 import logging
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import threading
+import time
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from dataclasses import dataclass, field, asdict, replace
 import asyncio
-import chromadb
-from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from .config import AgentConfig
+from .data_ingestion import create_text_chunks
+from .vector_store import VectorStore, create_vector_store, metadata_matches
+from .lexical_index import LexicalIndex
+from .context_packer import ContextPacker, PackResult
+from .ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -31,55 +47,702 @@ class RAGQuery:
     """Query for RAG retrieval"""
     query: str
     top_k: int = 5
-    threshold: float = 0.7
+    threshold: float = 0.7  # Minimum dense similarity (ignored by lexical hits)
     filters: Dict[str, Any] = None
+    mode: str = "dense"  # "dense", "lexical" (BM25) or "hybrid" (RRF of both)
+
+
+QUERY_MODES = ("dense", "lexical", "hybrid")
+
+@dataclass
+class RAGDocument:
+    """Document submitted for (bulk) ingestion"""
+    text: str
+    source: str
+    metadata: Dict[str, Any] = None
+    doc_id: Optional[str] = None  # Derived from source + text when omitted
+
+
+@dataclass
+class ManifestEntry:
+    """Ingest record for one file"""
+    size: int
+    mtime_ns: int
+    digest: str
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+class IngestManifest:
+    """
+    On-disk manifest of ingested files
+    
+    Maps absolute file path → (size, mtime, content digest, chunk IDs) so
+    re-ingesting a directory only re-embeds new or changed files and can
+    delete the chunks of files that disappeared. Chunk IDs replaced by an
+    edit stay in ``stale_chunk_ids`` until they are deleted from the store,
+    so a run that fails before its deletes are retried by the next one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = {}
+        self.stale_chunk_ids: List[str] = []
+
+    @classmethod
+    def load(cls, path: str) -> "IngestManifest":
+        manifest = cls(path)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                manifest.entries = {
+                    file_path: ManifestEntry(**entry)
+                    for file_path, entry in data.get("files", {}).items()
+                }
+                manifest.stale_chunk_ids = list(data.get("stale_chunk_ids", []))
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"⚠️ Ignoring unreadable ingest manifest {path}: {e}")
+        return manifest
+
+    def save(self) -> None:
+        """Atomically write the manifest next to the vector store"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": 1,
+                "files": {path: asdict(entry) for path, entry in self.entries.items()},
+                "stale_chunk_ids": self.stale_chunk_ids
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def paths_under(self, directory: str) -> List[str]:
+        prefix = os.path.join(os.path.abspath(directory), "")
+        return [path for path in self.entries if path.startswith(prefix)]
+
+    def deletable_chunk_ids(self) -> List[str]:
+        """Stale chunk IDs no file references any more (a reverted edit brings them back)"""
+        live = {chunk_id for entry in self.entries.values() for chunk_id in entry.chunk_ids}
+        return [chunk_id for chunk_id in dict.fromkeys(self.stale_chunk_ids) if chunk_id not in live]
+
+
+DEFAULT_INGEST_EXTENSIONS = ('.md', '.txt', '.py', '.js', '.ts')
+DEFAULT_IGNORE_PATTERNS = (
+    '.git', '.hg', '.svn', 'node_modules', '__pycache__', '.venv', 'venv',
+    '.mypy_cache', '.pytest_cache', '.tox', '*.egg-info', '*.min.js',
+)
+
+
+def _scan_directory(directory: str,
+                    extensions: Tuple[str, ...],
+                    ignore_patterns: Tuple[str, ...]) -> Tuple[List[Tuple[str, int, int]], List[str], List[str]]:
+    """
+    List one directory with os.scandir
+    
+    Returns (files, subdirectories, failed); files are (absolute path, size,
+    mtime_ns) for matching extensions, failed are entries that could not be
+    stat'ed. Names matching an ignore pattern are pruned, so ignored
+    directories are never descended into.
+    """
+    files, subdirs, failed = [], [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if any(fnmatch.fnmatch(entry.name, pattern) for pattern in ignore_patterns):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(extensions) and entry.is_file():
+                    st = entry.stat()
+                    files.append((os.path.abspath(entry.path), st.st_size, st.st_mtime_ns))
+            except OSError as e:
+                logger.warning(f"⚠️ Skipping {entry.path}: {e}")
+                failed.append(os.path.abspath(entry.path))
+    return files, subdirs, failed
+
+
+def _read_source_file(file_path: str, known_digest: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """Read and hash a file; content is None when the digest is unchanged"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if digest == known_digest:
+        return digest, None
+    return digest, raw.decode('utf-8')
+
+
+@dataclass
+class IngestStageStats:
+    """Throughput counters for one ingest pipeline stage"""
+    items: int = 0
+    bytes: int = 0
+    busy_seconds: float = 0.0
+
+    def add(self, items: int, nbytes: int, seconds: float) -> None:
+        self.items += items
+        self.bytes += nbytes
+        self.busy_seconds += seconds
+
+    def as_dict(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "bytes": self.bytes,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / elapsed, 1) if elapsed else 0.0,
+            "mb_per_second": round(self.bytes / elapsed / 1e6, 2) if elapsed else 0.0,
+        }
+
+
+def _percentiles_ms(samples) -> Dict[str, float]:
+    """p50/p99/max of a sample of durations (seconds) in milliseconds"""
+    if not samples:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        "p50": round(ordered[int(last * 0.50)] * 1000, 3),
+        "p99": round(ordered[int(last * 0.99)] * 1000, 3),
+        "max": round(ordered[last] * 1000, 3),
+    }
+
+
+class RAGExecutor:
+    """
+    Bounded worker pool for blocking RAG work
+    
+    SentenceTransformer.encode and the vector-store client are synchronous;
+    running them here keeps the event loop (SSE streams, websocket chat,
+    unrelated routes) responsive during heavy retrieval traffic. Threads are
+    used rather than processes because the model releases the GIL during
+    inference and cannot be cheaply shared with child processes.
+    """
+
+    def __init__(self, max_workers: int = 4, latency_window: int = 1024):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-worker")
+        self._lock = threading.Lock()
+        self._running = 0
+        self.completed = 0
+        self._wait_times: deque = deque(maxlen=latency_window)
+        self._run_times: deque = deque(maxlen=latency_window)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the pool and await its result"""
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._wait_times.append(started - submitted)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.completed += 1
+                    self._run_times.append(time.perf_counter() - started)
+
+        return await asyncio.get_running_loop().run_in_executor(self._pool, task)
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs submitted but not yet picked up by a worker"""
+        return self._pool._work_queue.qsize()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            wait_times = list(self._wait_times)
+            run_times = list(self._run_times)
+            running = self._running
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "running": running,
+            "completed": self.completed,
+            "wait_ms": _percentiles_ms(wait_times),
+            "run_ms": _percentiles_ms(run_times),
+        }
+
+
+class WriteBehindQueue:
+    """
+    Write-behind queue for RAG ingestion
+
+    Coalesces concurrent single-document writes (e.g. from async routes)
+    into batched ``add_documents`` calls. Documents are flushed once
+    ``max_batch_size`` is reached or ``flush_interval`` seconds have passed
+    since the first queued document, whichever comes first.
+    """
+
+    def __init__(self,
+                 rag: "RAGSystem",
+                 max_batch_size: int = 256,
+                 flush_interval: float = 0.05):
+        self.rag = rag
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+
+    def submit(self, document: RAGDocument) -> None:
+        """Queue a document for the next batched write"""
+        self._ensure_worker()
+        self._queue.put_nowait(document)
+        self.enqueued += 1
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues are bound to the loop that first waits on them
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self.rag.add_documents(batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.errors += len(batch)
+                logger.error(f"❌ Write-behind flush of {len(batch)} documents failed: {e}")
+            finally:
+                self.batches += 1
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def flush(self) -> None:
+        """Wait until every queued document has been written"""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush pending writes and stop the background worker"""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "errors": self.errors,
+        }
+
+
+# (id, document, metadata, distance) tuples for one query, best first
+SearchHits = List[Tuple[str, str, Dict[str, Any], float]]
+
+
+def _normalize_query(text: str) -> str:
+    """Case- and whitespace-insensitive cache key for query text"""
+    return " ".join(text.lower().split())
+
+
+class QueryBatcher:
+    """
+    Micro-batching coalescer for concurrent RAG queries
+    
+    Queries arriving within ``max_wait_ms`` of the first pending query (up to
+    ``max_batch_size``) are encoded in one forward pass and sent to the
+    vector store as a single multi-embedding query; results are fanned back
+    out to each waiting caller.
+    
+    The window only applies while a batch is in flight. When the batcher is
+    idle, pending queries are flushed on the next event-loop turn, so a lone
+    query does not wait and a same-tick burst (asyncio.gather) still
+    shares one batch.
+    """
+
+    HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+    def __init__(self,
+                 rag: "RAGSystem",
+                 max_wait_ms: float = 2.0,
+                 max_batch_size: int = 32):
+        self.rag = rag
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[RAGQuery, Optional[List[float]], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._tasks: set = set()
+        self._in_flight = 0  # Batches encoding/searching right now
+        self.idle_flushes = 0
+        self.batches = 0
+        self.queries = 0
+        self.histogram: Dict[str, int] = {
+            **{str(bucket): 0 for bucket in self.HISTOGRAM_BUCKETS},
+            "+Inf": 0,
+        }
+
+    async def submit(self,
+                     query: RAGQuery,
+                     embedding: Optional[List[float]] = None) -> Tuple[SearchHits, List[float]]:
+        """Queue a query for the next batch and wait for its hits and embedding"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, embedding, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._flush_handle is None:
+            if self._in_flight:
+                self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._dispatch)
+            else:
+                self._flush_handle = loop.call_soon(self._dispatch)
+                self.idle_flushes += 1
+        
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        self._record(len(batch))
+        self._in_flight += 1
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(lambda task: self._finish(task, batch))
+
+    def _finish(self, task: asyncio.Task, batch) -> None:
+        self._tasks.discard(task)
+        # Cancelled mid-search or before it ever ran: release every caller
+        if task.cancelled():
+            self._in_flight -= 1
+            for _, _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    async def _run_batch(self, batch) -> None:
+        try:
+            results = await self.rag.executor.run(
+                self.rag._search_batch,
+                [q for q, _, _ in batch],
+                [e for _, e, _ in batch]
+            )
+        except Exception as e:
+            self._in_flight -= 1
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        # Idle again before callers resume, so their next query needn't wait
+        self._in_flight -= 1
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record(self, size: int) -> None:
+        self.batches += 1
+        self.queries += size
+        for bucket in self.HISTOGRAM_BUCKETS:
+            if size <= bucket:
+                self.histogram[str(bucket)] += 1
+                return
+        self.histogram["+Inf"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_wait_ms": self.max_wait_ms,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "idle_flushes": self.idle_flushes,
+            "queries": self.queries,
+            "mean_batch_size": round(self.queries / self.batches, 2) if self.batches else 0.0,
+            "batch_size_histogram": dict(self.histogram),
+        }
+
+
+# Loaded encoders shared by every RAGSystem in the process, per model name
+_shared_encoders: Dict[str, Any] = {}
+_shared_encoders_lock = threading.Lock()
+
+
+def load_encoder(model_name: str) -> Any:
+    """Import sentence_transformers and load a model (seconds on a cold start)"""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def get_shared_encoder(model_name: str) -> Any:
+    """Process-wide encoder for ``model_name``, loaded once"""
+    with _shared_encoders_lock:
+        encoder = _shared_encoders.get(model_name)
+        if encoder is None:
+            encoder = _shared_encoders[model_name] = load_encoder(model_name)
+        return encoder
+
+
+def preload_encoder_for_fork(model_name: str = "all-MiniLM-L6-v2") -> None:
+    """
+    Load and warm the shared encoder in a pre-fork parent process
+    
+    Call from the server master before workers fork (e.g. gunicorn
+    ``preload_app`` or an ``on_starting`` hook). Workers then inherit the
+    model weights copy-on-write instead of each loading a private copy, and
+    ``gc.freeze()`` keeps the collector from dirtying the shared pages.
+    """
+    import gc
+    
+    get_shared_encoder(model_name).encode(["warmup"], batch_size=1)
+    gc.freeze()
+    logger.info(f"🧊 Preloaded {model_name} for copy-on-write sharing")
+
 
 class RAGSystem:
     """
     RAG System for LuminAI Codex
     
     Features:
-    - ChromaDB for vector storage
+    - Pluggable vector storage: ChromaDB or in-process mmap'd NumPy index
     - Sentence transformers for embeddings
     - Integration with multi-LLM chat
     - Real-time knowledge retrieval
     - Context scoring and filtering
+    - Batched bulk ingestion with optional write-behind queue
+    - Encoding and vector-store calls off the event loop (RAGExecutor)
+    - Micro-batching of concurrent queries (QueryBatcher)
+    - LRU + TTL caches for query embeddings and retrieval results
+    - Chunked, incremental, pipelined directory ingestion (IngestManifest)
+    - BM25 lexical index with hybrid (reciprocal rank fusion) retrieval
+    - Token-budgeted, diversity-aware context packing (ContextPacker)
+    - Lazy encoder loading with background warmup and readiness status
     """
     
     def __init__(self, 
                  collection_name: str = "luminai_knowledge",
                  model_name: str = "all-MiniLM-L6-v2",
-                 persist_directory: str = "./data/rag_db"):
+                 persist_directory: str = "./data/rag_db",
+                 encode_batch_size: int = 64,
+                 write_batch_size: int = 512,
+                 write_behind: bool = False,
+                 write_behind_interval: float = 0.05,
+                 executor_workers: int = 4,
+                 query_batch_window_ms: float = 2.0,
+                 query_max_batch_size: int = 32,
+                 embedding_cache_size: int = 4096,
+                 result_cache_size: int = 1024,
+                 cache_ttl_seconds: float = 300.0,
+                 chunk_size: int = 1000,
+                 chunk_overlap: int = 200,
+                 ingest_reader_workers: int = 8,
+                 ingest_queue_size: int = 256,
+                 vector_backend: str = "chroma",
+                 vector_store: Optional[VectorStore] = None,
+                 quantization: str = "none",
+                 rrf_k: int = 60,
+                 hybrid_candidates: int = 2,
+                 lexical_save_interval: float = 30.0,
+                 context_token_budget: int = 1200,
+                 context_candidates: int = 6,
+                 context_max_contexts: int = 3,
+                 share_encoder: bool = True):
+        init_started = time.perf_counter()
         self.collection_name = collection_name
         self.model_name = model_name
         self.persist_directory = persist_directory
+        self.encode_batch_size = encode_batch_size
+        self.write_batch_size = write_batch_size
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.ingest_reader_workers = ingest_reader_workers
+        self.ingest_queue_size = ingest_queue_size
+        self.last_ingest: Optional[Dict[str, Any]] = None
+        self.rrf_k = rrf_k
+        self.hybrid_candidates = max(1, hybrid_candidates)
+        self.lexical_save_interval = lexical_save_interval
+        self.context_candidates = context_candidates
+        self.context_packer = ContextPacker(
+            token_budget=context_token_budget,
+            max_contexts=context_max_contexts,
+            max_context_tokens=max(context_token_budget // 3, 64)
+        )
+        self.last_pack: Optional[PackResult] = None
         
-        # Initialize ChromaDB
-        self.chroma_client = chromadb.PersistentClient(path=persist_directory)
-        self.collection = self.chroma_client.get_or_create_collection(
-            name=collection_name,
-            metadata={"hnsw:space": "cosine"}
+        # Initialize vector store ("chroma" or "numpy" unless one is injected)
+        self.vector_backend = vector_backend if vector_store is None else type(vector_store).__name__
+        # quantization ("int8"/"binary") needs the numpy backend
+        self.collection = vector_store or create_vector_store(
+            vector_backend, persist_directory, collection_name, quantization=quantization
         )
         
-        # Initialize sentence transformer
-        self.encoder = SentenceTransformer(model_name)
+        # Sentence transformer, loaded on first use or by warmup()
+        self.share_encoder = share_encoder
+        self._encoder = None
+        self._encoder_lock = threading.Lock()
+        self._warm_state = "cold"  # cold → warming → ready | failed
+        self._warmup_task: Optional[asyncio.Task] = None
+        self.startup: Dict[str, Any] = {
+            "encoder_load_seconds": None,
+            "warmup_seconds": None,
+            "first_query_seconds": None,  # construction → first answered query
+            "first_query_latency_ms": None,
+            "error": None,
+        }
+        
+        # Worker pool for blocking encode / vector-store calls
+        self.executor = RAGExecutor(max_workers=executor_workers)
+        
+        # Optional write-behind queue for single-document adds
+        self.write_queue = WriteBehindQueue(
+            self,
+            max_batch_size=write_batch_size,
+            flush_interval=write_behind_interval
+        ) if write_behind else None
         
+        # Coalesce concurrent queries (window <= 0 disables batching)
+        self.query_batcher = QueryBatcher(
+            self,
+            max_wait_ms=query_batch_window_ms,
+            max_batch_size=query_max_batch_size
+        ) if query_batch_window_ms > 0 else None
+        
+        # normalized query text → (embedding, embedding key)
+        self.embedding_cache = TTLCache(embedding_cache_size, cache_ttl_seconds)
+        # (mode, embedding or text key, top_k, threshold, filters, generation) → contexts
+        self.result_cache = TTLCache(result_cache_size, cache_ttl_seconds)
+        self._collection_generation = 0
+        
+        # BM25 index kept in step with the vector store
+        self.lexical_index = LexicalIndex.load(self.lexical_index_path)
+        self._lexical_saved_at = time.monotonic()
+        stored = self.collection.count()
+        if len(self.lexical_index) != stored:
+            # Saves are throttled, so a crash can leave the BM25 file behind the store
+            self._rebuild_lexical_index(stored)
+        
+        self._created_at = time.monotonic()
+        self.startup["init_seconds"] = round(time.perf_counter() - init_started, 3)
         logger.info(f"🔍 RAG System initialized with {self.collection.count()} documents")
 
+    @classmethod
+    def from_config(cls, config: AgentConfig, **kwargs) -> "RAGSystem":
+        """Create a RAG system using the RAG settings of an AgentConfig"""
+        kwargs.setdefault("chunk_size", config.rag_chunk_size)
+        kwargs.setdefault("chunk_overlap", config.rag_chunk_overlap)
+        return cls(**kwargs)
+
+    @property
+    def encoder(self) -> Any:
+        """Sentence transformer, loaded on first access (blocking; call off the event loop)"""
+        if self._encoder is None:
+            with self._encoder_lock:
+                if self._encoder is None:
+                    started = time.perf_counter()
+                    encoder = (get_shared_encoder(self.model_name) if self.share_encoder
+                               else load_encoder(self.model_name))
+                    self.startup["encoder_load_seconds"] = round(time.perf_counter() - started, 3)
+                    self._encoder = encoder
+        return self._encoder
+
+    @property
+    def status(self) -> str:
+        """Warmup state: cold, warming, ready or failed"""
+        if self._warm_state in ("warming", "failed") or self._encoder is None:
+            return self._warm_state
+        return "ready"
+
+    async def warmup(self) -> bool:
+        """Load the encoder and run a dummy encode on the executor; True when ready"""
+        if self.status == "ready":
+            return True
+        self._warm_state = "warming"
+        started = time.perf_counter()
+        try:
+            await self.executor.run(self._warm)
+        except Exception as e:
+            self._warm_state = "failed"
+            self.startup["error"] = str(e)
+            logger.error(f"❌ RAG warmup failed: {e}")
+            return False
+        self._warm_state = "ready"
+        self.startup["warmup_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"🔥 RAG encoder {self.model_name} ready in {self.startup['warmup_seconds']:.2f}s")
+        return True
+
+    def _warm(self) -> None:
+        # First forward pass allocates buffers / JITs kernels; do it before users do
+        self.encoder.encode(["warmup"], batch_size=1)
+
+    def start_warmup(self) -> asyncio.Task:
+        """Run warmup() in the background (idempotent)"""
+        if self._warmup_task is None:
+            self._warm_state = "warming"
+            self._warmup_task = asyncio.ensure_future(self.warmup())
+        return self._warmup_task
+
+    def _encode(self, texts: Any, **kwargs) -> Any:
+        return self.encoder.encode(texts, **kwargs)
+
+    def get_startup_stats(self) -> Dict[str, Any]:
+        return {"status": self.status, "model": self.model_name,
+                "shared_encoder": self.share_encoder, **self.startup}
+
     async def add_document(self, 
                           text: str, 
                           source: str, 
                           metadata: Dict[str, Any] = None) -> str:
-        """Add a document to the RAG knowledge base"""
+        """
+        Add a document to the RAG knowledge base
+        
+        With write-behind enabled the document is queued and written in the
+        next batch; the returned ID is valid once ``flush()`` completes.
+        """
+        if self.write_queue is not None:
+            self.write_queue.submit(RAGDocument(text=text, source=source, metadata=metadata))
+            return self._document_id(text, source)
+        
         try:
             # Generate embedding
-            embedding = self.encoder.encode(text).tolist()
+            embedding = await self.executor.run(self._encode, text)
             
             # Create unique ID
-            doc_id = f"{source}_{hash(text)}"
+            doc_id = self._document_id(text, source)
             
-            # Add to ChromaDB
-            self.collection.add(
+            # Add to vector store
+            await self.executor.run(
+                self.collection.add,
                 embeddings=[embedding],
                 documents=[text],
                 metadatas=[{
@@ -89,6 +752,9 @@ class RAGSystem:
                 }],
                 ids=[doc_id]
             )
+            self.lexical_index.add([doc_id], [text])
+            self._invalidate_results()
+            await self._save_lexical_index()
             
             logger.info(f"📚 Added document from {source}")
             return doc_id
@@ -97,44 +763,332 @@ class RAGSystem:
             logger.error(f"❌ Failed to add document: {e}")
             raise
 
+    async def add_documents(self,
+                            documents: List[RAGDocument],
+                            batch_size: Optional[int] = None) -> List[str]:
+        """
+        Add many documents to the RAG knowledge base
+        
+        Texts are encoded ``encode_batch_size`` at a time and written with one
+        ``upsert`` per ``batch_size`` documents instead of one call per document.
+        
+        Returns:
+            Document IDs in the same order as ``documents``
+        """
+        batch_size = batch_size or self.write_batch_size
+        doc_ids = [doc.doc_id or self._document_id(doc.text, doc.source) for doc in documents]
+        added_at = str(asyncio.get_event_loop().time())
+        
+        try:
+            for start in range(0, len(documents), batch_size):
+                # Last write wins for duplicate IDs within a batch
+                batch = {
+                    doc_id: doc
+                    for doc_id, doc in zip(doc_ids[start:start + batch_size],
+                                           documents[start:start + batch_size])
+                }
+                try:
+                    await self.executor.run(
+                        self._encode_and_upsert,
+                        ids=list(batch.keys()),
+                        texts=[doc.text for doc in batch.values()],
+                        metadatas=[{
+                            "source": doc.source,
+                            "added_at": added_at,
+                            **(doc.metadata or {})
+                        } for doc in batch.values()]
+                    )
+                finally:
+                    self._invalidate_results()
+            
+            await self._save_lexical_index()
+            logger.info(f"📚 Added {len(documents)} documents in batches of {batch_size}")
+            return doc_ids
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to add documents: {e}")
+            raise
+
+    def _encode_and_upsert(self,
+                           ids: List[str],
+                           texts: List[str],
+                           metadatas: List[Dict[str, Any]]) -> None:
+        """Blocking batch write; runs on the RAG executor"""
+        embeddings = self.encoder.encode(texts, batch_size=self.encode_batch_size)
+        self.collection.upsert(
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=metadatas,
+            ids=ids
+        )
+        self.lexical_index.add(ids, texts)
+
+    def _invalidate_results(self) -> None:
+        """Drop cached retrieval results after the collection changed"""
+        self._collection_generation += 1
+        self.result_cache.clear()
+
+    @property
+    def lexical_index_path(self) -> str:
+        return os.path.join(self.persist_directory, f"{self.collection_name}_lexical.npz")
+
+    def _rebuild_lexical_index(self, stored: int) -> None:
+        """Re-index every document in the vector store and save the BM25 file"""
+        logger.warning(
+            f"⚠️ Lexical index has {len(self.lexical_index)} documents but the vector store has "
+            f"{stored}; rebuilding it from the store"
+        )
+        started = time.perf_counter()
+        index = LexicalIndex(k1=self.lexical_index.k1, b=self.lexical_index.b)
+        try:
+            for ids, documents in self.collection.iter_documents():
+                index.add(ids, documents)
+        except NotImplementedError as e:
+            logger.warning(f"⚠️ {e}; re-ingest with incremental=False for lexical/hybrid queries")
+            return
+        self.lexical_index = index
+        os.makedirs(self.persist_directory, exist_ok=True)
+        index.save(self.lexical_index_path)
+        self.startup["lexical_rebuild_seconds"] = round(time.perf_counter() - started, 3)
+
+    async def _save_lexical_index(self, force: bool = False) -> None:
+        """Persist the BM25 index if it changed, at most every lexical_save_interval"""
+        if not self.lexical_index.dirty:
+            return
+        if not force and time.monotonic() - self._lexical_saved_at < self.lexical_save_interval:
+            return
+        self._lexical_saved_at = time.monotonic()
+        os.makedirs(self.persist_directory, exist_ok=True)
+        await self.executor.run(self.lexical_index.save, self.lexical_index_path)
+
+    async def flush(self) -> None:
+        """Wait for queued write-behind documents to be written"""
+        if self.write_queue is not None:
+            await self.write_queue.flush()
+
+    async def close(self) -> None:
+        """Flush pending writes and stop background workers"""
+        if self.write_queue is not None:
+            await self.write_queue.close()
+        await self._save_lexical_index(force=True)
+        self.executor.shutdown(wait=False)
+
+    async def delete_documents(self, doc_ids: List[str]) -> int:
+        """Remove documents (or chunks) from the knowledge base by ID"""
+        if not doc_ids:
+            return 0
+        try:
+            for start in range(0, len(doc_ids), self.write_batch_size):
+                batch = doc_ids[start:start + self.write_batch_size]
+                await self.executor.run(self.collection.delete, ids=batch)
+                self.lexical_index.remove(batch)
+        finally:
+            self._invalidate_results()
+            await self._save_lexical_index()
+        logger.info(f"🗑️ Deleted {len(doc_ids)} documents")
+        return len(doc_ids)
+
+    @staticmethod
+    def _document_id(text: str, source: str) -> str:
+        # Content-addressed: stable across processes, unlike hash()
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+        return f"{source}_{digest}"
+
+    @staticmethod
+    def _chunk_id(source: str, index: int, text: str) -> str:
+        digest = hashlib.sha256(f"{source}\x00{index}\x00{text}".encode('utf-8')).hexdigest()[:24]
+        return f"{source}#{index}_{digest}"
+
     async def query(self, query: RAGQuery) -> List[RAGContext]:
-        """Query the RAG knowledge base"""
+        """
+        Query the RAG knowledge base
+        
+        ``mode="dense"`` ranks by embedding similarity, ``"lexical"`` by BM25
+        and ``"hybrid"`` fuses both rankings with reciprocal rank fusion. The
+        context ``score`` is the cosine similarity, BM25 or RRF score accordingly.
+        """
+        if query.mode not in QUERY_MODES:
+            raise ValueError(f"Unknown RAG query mode: {query.mode}")
+        started = time.perf_counter()
+        lexical_task = None
         try:
-            # Generate query embedding
-            query_embedding = self.encoder.encode(query.query).tolist()
+            generation = self._collection_generation
+            text_key = _normalize_query(query.query)
+            cached_embedding = None
             
-            # Query ChromaDB
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=query.top_k,
-                where=query.filters
-            )
+            result_key = None
+            if query.mode == "lexical":
+                result_key = self._result_key(text_key, query, generation)
+            else:
+                cached_embedding = self.embedding_cache.get(text_key)
+                if cached_embedding is not None:
+                    result_key = self._result_key(cached_embedding[1], query, generation)
+            if result_key is not None:
+                cached_contexts = self.result_cache.get(result_key)
+                if cached_contexts is not None:
+                    return list(cached_contexts)
             
-            contexts = []
-            if results['documents'] and results['documents'][0]:
-                for i, (doc, metadata, distance) in enumerate(zip(
-                    results['documents'][0],
-                    results['metadatas'][0],
-                    results['distances'][0]
-                )):
+            # Hybrid fetches a deeper candidate list from each retriever
+            depth = query.top_k if query.mode != "hybrid" else query.top_k * self.hybrid_candidates
+            if query.mode != "dense":
+                lexical_task = asyncio.ensure_future(
+                    self.executor.run(self._lexical_hits, query.query, query.filters, depth)
+                )
+            
+            dense: List[Tuple[str, RAGContext]] = []
+            if query.mode != "lexical":
+                dense_query = query if depth == query.top_k else replace(query, top_k=depth)
+                
+                # Encode + search, batched with concurrent queries when enabled
+                known_embedding = cached_embedding[0] if cached_embedding else None
+                if self.query_batcher is not None:
+                    hits, embedding = await self.query_batcher.submit(dense_query, known_embedding)
+                else:
+                    hits, embedding = (await self.executor.run(
+                        self._search_batch, [dense_query], [known_embedding]
+                    ))[0]
+                
+                if cached_embedding is None:
+                    embedding_key = hashlib.blake2b(
+                        np.asarray(embedding, dtype=np.float32).tobytes(), digest_size=16
+                    ).hexdigest()
+                    self.embedding_cache.put(text_key, (embedding, embedding_key))
+                    result_key = self._result_key(embedding_key, query, generation)
+                
+                for doc_id, doc, metadata, distance in hits:
                     # Convert distance to similarity score
                     score = 1 - distance
                     
                     if score >= query.threshold:
-                        contexts.append(RAGContext(
+                        dense.append((doc_id, RAGContext(
                             text=doc,
                             source=metadata.get('source', 'unknown'),
                             score=score,
                             metadata=metadata
-                        ))
+                        )))
+            
+            if query.mode == "dense":
+                contexts = [ctx for _, ctx in dense]
+            elif query.mode == "lexical":
+                contexts = [ctx for _, ctx in await lexical_task]
+            else:
+                contexts = self._fuse_rankings([dense, await lexical_task], query.top_k)
             
+            # Results computed against a collection that changed mid-query are stale
+            if generation == self._collection_generation:
+                self.result_cache.put(result_key, tuple(contexts))
+            if self.startup["first_query_seconds"] is None:
+                self.startup["first_query_seconds"] = round(time.monotonic() - self._created_at, 3)
+                self.startup["first_query_latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
             logger.info(f"🔍 Retrieved {len(contexts)} relevant contexts")
             return contexts
             
         except Exception as e:
+            if lexical_task is not None:
+                lexical_task.cancel()
             logger.error(f"❌ RAG query failed: {e}")
             return []
 
+    @staticmethod
+    def _result_key(embedding_key: str, query: RAGQuery, generation: int) -> Tuple:
+        filters = json.dumps(query.filters or {}, sort_keys=True, default=str)
+        return (query.mode, embedding_key, query.top_k, query.threshold, filters, generation)
+
+    def _lexical_hits(self,
+                      text: str,
+                      filters: Optional[Dict[str, Any]],
+                      depth: int) -> List[Tuple[str, RAGContext]]:
+        """
+        Blocking BM25 search; runs on the RAG executor
+        
+        Chunk text and metadata come from the vector store. With filters the
+        ranking is widened until ``depth`` matching chunks are found.
+        """
+        limit = depth
+        while True:
+            ranked = self.lexical_index.search(text, limit)
+            found = self.collection.get(ids=[doc_id for doc_id, _ in ranked]) if ranked else {"ids": []}
+            stored = {
+                doc_id: (doc, metadata or {})
+                for doc_id, doc, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+            } if found["ids"] else {}
+            
+            hits = []
+            for doc_id, score in ranked:
+                if doc_id not in stored or not metadata_matches(stored[doc_id][1], filters):
+                    continue
+                doc, metadata = stored[doc_id]
+                hits.append((doc_id, RAGContext(
+                    text=doc,
+                    source=metadata.get('source', 'unknown'),
+                    score=score,
+                    metadata=metadata
+                )))
+                if len(hits) == depth:
+                    return hits
+            if len(ranked) < limit:
+                return hits
+            limit *= 4
+
+    def _fuse_rankings(self,
+                       rankings: List[List[Tuple[str, RAGContext]]],
+                       top_k: int) -> List[RAGContext]:
+        """Reciprocal rank fusion: sum of 1 / (rrf_k + rank) across rankings"""
+        fused: Dict[str, float] = {}
+        contexts: Dict[str, RAGContext] = {}
+        for ranking in rankings:
+            for rank, (doc_id, ctx) in enumerate(ranking, start=1):
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (self.rrf_k + rank)
+                contexts.setdefault(doc_id, ctx)
+        best = sorted(fused, key=fused.get, reverse=True)[:top_k]
+        return [replace(contexts[doc_id], score=fused[doc_id]) for doc_id in best]
+
+    def _search_batch(self,
+                      queries: List[RAGQuery],
+                      embeddings: Optional[List[Optional[List[float]]]] = None
+                      ) -> List[Tuple[SearchHits, List[float]]]:
+        """
+        Blocking batched search; runs on the RAG executor
+        
+        Query texts without a known embedding are encoded in one forward pass.
+        Queries sharing the same filters go to the vector store as one
+        multi-embedding query.
+        """
+        embeddings = list(embeddings or [None] * len(queries))
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+        if missing:
+            encoded = self.encoder.encode(
+                [queries[i].query for i in missing],
+                batch_size=self.encode_batch_size
+            ).tolist()
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+        
+        groups: Dict[str, List[int]] = {}
+        for i, q in enumerate(queries):
+            key = json.dumps(q.filters or {}, sort_keys=True, default=str)
+            groups.setdefault(key, []).append(i)
+        
+        hits: List[SearchHits] = [[] for _ in queries]
+        for indices in groups.values():
+            filters = queries[indices[0]].filters
+            results = self.collection.query(
+                query_embeddings=[embeddings[i] for i in indices],
+                n_results=max(queries[i].top_k for i in indices),
+                where=filters or None
+            )
+            for row, i in enumerate(indices):
+                if not results['documents'] or not results['documents'][row]:
+                    continue
+                hits[i] = list(zip(
+                    results['ids'][row],
+                    results['documents'][row],
+                    results['metadatas'][row],
+                    results['distances'][row]
+                ))[:queries[i].top_k]
+        
+        return list(zip(hits, embeddings))
+
     async def enhance_prompt(self, 
                            original_prompt: str, 
                            conversation_history: List[Dict] = None) -> str:
@@ -147,17 +1101,23 @@ class RAGSystem:
             # Get relevant context
             contexts = await self.query(RAGQuery(
                 query=original_prompt,
-                top_k=3,
+                top_k=self.context_candidates,
                 threshold=0.6
             ))
             
             if not contexts:
                 return original_prompt
             
+            # Trim, de-duplicate and fit the contexts to the token budget
+            packed = self.context_packer.pack(original_prompt, contexts)
+            self.last_pack = packed
+            if not packed.contexts:
+                return original_prompt
+            
             # Build enhanced prompt
             context_text = "\n\n".join([
                 f"📚 Context from {ctx.source} (relevance: {ctx.score:.2f}):\n{ctx.text}"
-                for ctx in contexts
+                for ctx in packed.contexts
             ])
             
             enhanced_prompt = f"""Based on the following relevant context, please provide a comprehensive response:
@@ -168,40 +1128,215 @@ Original query: {original_prompt}
 
 Please incorporate the above context into your response while maintaining accuracy and citing sources when relevant."""
 
-            logger.info(f"✨ Enhanced prompt with {len(contexts)} contexts")
+            logger.info(
+                f"✨ Enhanced prompt with {len(packed.contexts)}/{len(contexts)} contexts, "
+                f"{packed.tokens_used} tokens ({packed.tokens_saved} saved vs. top "
+                f"{self.context_packer.max_contexts} in full, {packed.tokens_retrieved} retrieved)"
+            )
             return enhanced_prompt
             
         except Exception as e:
             logger.error(f"❌ Prompt enhancement failed: {e}")
             return original_prompt
 
-    async def ingest_directory(self, directory_path: str) -> int:
-        """Ingest all documents from a directory"""
-        count = 0
-        
-        for root, dirs, files in os.walk(directory_path):
-            for file in files:
-                if file.endswith(('.md', '.txt', '.py', '.js', '.ts')):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            
-                        await self.add_document(
-                            text=content,
-                            source=file_path,
-                            metadata={
-                                'file_type': file.split('.')[-1],
-                                'file_size': len(content)
-                            }
-                        )
-                        count += 1
-                        
-                    except Exception as e:
-                        logger.warning(f"⚠️ Failed to ingest {file_path}: {e}")
-        
-        logger.info(f"📚 Ingested {count} documents from {directory_path}")
-        return count
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.persist_directory, f"{self.collection_name}_ingest_manifest.json")
+
+    async def ingest_directory(self,
+                               directory_path: str,
+                               incremental: bool = True,
+                               extensions: Tuple[str, ...] = DEFAULT_INGEST_EXTENSIONS,
+                               ignore_patterns: Tuple[str, ...] = DEFAULT_IGNORE_PATTERNS) -> int:
+        """
+        Ingest all documents from a directory as overlapping chunks
+        
+        Files are split into ``chunk_size`` character chunks overlapping by
+        ``chunk_overlap`` and stored under content-addressed chunk IDs. An
+        on-disk manifest records (size, mtime, digest) per file: unchanged
+        files are skipped when ``incremental`` is set, changed files have
+        their stale chunks replaced, and chunks of removed files are deleted.
+        Paths that could not be scanned (a directory or entry raising
+        OSError) are never treated as removed.
+        
+        The ingest is pipelined: a scandir walker (pruning ``ignore_patterns``)
+        feeds ``ingest_reader_workers`` concurrent readers, which feed chunked
+        files through a bounded queue to the batched embedding stage. Per-stage
+        counters are reported in ``get_stats()['last_ingest']``.
+        
+        Returns:
+            Number of files (re-)ingested
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        manifest = IngestManifest.load(self.manifest_path)
+        seen = set()
+        unscanned: List[str] = []  # Absolute paths whose manifest entries must survive
+        stats = {
+            "files_seen": 0,
+            "files_ingested": 0,
+            "files_unchanged": 0,
+            "files_removed": 0,
+            "files_failed": 0,
+            "dirs_failed": 0,
+            "chunks_written": 0,
+            "chunks_deleted": 0,
+        }
+        stages = {name: IngestStageStats() for name in ("discover", "read", "embed")}
+        paths: asyncio.Queue = asyncio.Queue(maxsize=self.ingest_queue_size)
+        prepared: asyncio.Queue = asyncio.Queue(maxsize=self.ingest_queue_size)
+        
+        async def discover():
+            directories = [directory_path]
+            while directories:
+                directory = directories.pop()
+                scan_started = time.perf_counter()
+                try:
+                    files, subdirs, failed = await loop.run_in_executor(
+                        readers, _scan_directory, directory, extensions, ignore_patterns
+                    )
+                except OSError as e:
+                    logger.warning(f"⚠️ Failed to scan {directory}: {e}")
+                    unscanned.append(os.path.abspath(directory))
+                    stats["dirs_failed"] += 1
+                    continue
+                unscanned.extend(failed)
+                stats["files_failed"] += len(failed)
+                stages["discover"].add(len(files), 0, time.perf_counter() - scan_started)
+                directories.extend(subdirs)
+                for item in files:
+                    seen.add(item[0])
+                    await paths.put(item)
+            for _ in range(self.ingest_reader_workers):
+                await paths.put(None)
+        
+        async def read():
+            while (item := await paths.get()) is not None:
+                file_path, size, mtime_ns = item
+                stats["files_seen"] += 1
+                entry = manifest.entries.get(file_path)
+                if (incremental and entry is not None
+                        and entry.size == size and entry.mtime_ns == mtime_ns):
+                    stats["files_unchanged"] += 1
+                    continue
+                
+                read_started = time.perf_counter()
+                try:
+                    digest, content = await loop.run_in_executor(
+                        readers, _read_source_file, file_path,
+                        entry.digest if incremental and entry is not None else None
+                    )
+                except Exception as e:
+                    stats["files_failed"] += 1
+                    logger.warning(f"⚠️ Failed to ingest {file_path}: {e}")
+                    continue
+                stages["read"].add(1, size, time.perf_counter() - read_started)
+                
+                if content is None:
+                    # Touched but not modified: refresh stat only
+                    manifest.entries[file_path] = ManifestEntry(size, mtime_ns, digest, entry.chunk_ids)
+                    stats["files_unchanged"] += 1
+                    continue
+                await prepared.put((file_path, size, mtime_ns, digest, content, entry))
+        
+        async def embed():
+            pending: List[RAGDocument] = []
+            pending_entries: Dict[str, ManifestEntry] = {}
+            pending_stale: List[str] = []
+            
+            async def flush_pending():
+                nonlocal pending, pending_entries, pending_stale
+                if pending:
+                    embed_started = time.perf_counter()
+                    await self.add_documents(pending)
+                    stages["embed"].add(len(pending), 0, time.perf_counter() - embed_started)
+                    stats["chunks_written"] += len(pending)
+                # Only record files in the manifest once their chunks are stored,
+                # together with the old chunk IDs they replace
+                manifest.entries.update(pending_entries)
+                manifest.stale_chunk_ids.extend(pending_stale)
+                pending, pending_entries, pending_stale = [], {}, []
+            
+            while (item := await prepared.get()) is not None:
+                file_path, size, mtime_ns, digest, content, entry = item
+                chunks = create_text_chunks(content, self.chunk_size, self.chunk_overlap)
+                chunk_ids = [
+                    self._chunk_id(file_path, i, chunk) for i, chunk in enumerate(chunks)
+                ]
+                # Content-addressed IDs: chunks that survived an edit are already stored
+                stored = set(entry.chunk_ids) if incremental and entry is not None else set()
+                for i, (chunk, chunk_id) in enumerate(zip(chunks, chunk_ids)):
+                    if chunk_id in stored:
+                        continue
+                    pending.append(RAGDocument(
+                        text=chunk,
+                        source=file_path,
+                        doc_id=chunk_id,
+                        metadata={
+                            'file_type': file_path.rsplit('.', 1)[-1],
+                            'file_size': len(content),
+                            'chunk_index': i,
+                            'chunk_count': len(chunks),
+                            'digest': digest
+                        }
+                    ))
+                
+                if entry is not None:
+                    pending_stale.extend(set(entry.chunk_ids) - set(chunk_ids))
+                pending_entries[file_path] = ManifestEntry(size, mtime_ns, digest, chunk_ids)
+                stats["files_ingested"] += 1
+                
+                if len(pending) >= self.write_batch_size:
+                    await flush_pending()
+            
+            await flush_pending()
+        
+        async def read_all():
+            await asyncio.gather(*(read() for _ in range(self.ingest_reader_workers)))
+            await prepared.put(None)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.ingest_reader_workers,
+                                    thread_name_prefix="rag-reader") as readers:
+                tasks = [
+                    asyncio.ensure_future(discover()),
+                    asyncio.ensure_future(read_all()),
+                    asyncio.ensure_future(embed()),
+                ]
+                try:
+                    await asyncio.gather(*tasks)
+                except BaseException:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+            
+            # Files that disappeared since the last run; unscanned subtrees are kept as they are
+            prefixes = tuple(os.path.join(path, "") for path in unscanned)
+            for file_path in manifest.paths_under(directory_path):
+                if file_path in unscanned or file_path.startswith(prefixes):
+                    continue
+                if file_path not in seen:
+                    manifest.stale_chunk_ids.extend(manifest.entries.pop(file_path).chunk_ids)
+                    stats["files_removed"] += 1
+            
+            # Includes stale IDs left behind by an earlier failed run
+            stats["chunks_deleted"] = await self.delete_documents(manifest.deletable_chunk_ids())
+            manifest.stale_chunk_ids = []
+        finally:
+            manifest.save()
+            await self._save_lexical_index(force=True)
+        
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = round(elapsed, 3)
+        stats["stages"] = {name: stage.as_dict(elapsed) for name, stage in stages.items()}
+        self.last_ingest = stats
+        logger.info(
+            f"📚 Ingested {stats['files_ingested']} files ({stats['chunks_written']} chunks) "
+            f"from {directory_path} in {elapsed:.2f}s; {stats['files_unchanged']} unchanged, "
+            f"{stats['files_removed']} removed"
+        )
+        return stats["files_ingested"]
 
     def get_stats(self) -> Dict[str, Any]:
         """Get RAG system statistics"""
@@ -211,7 +1346,19 @@ Please incorporate the above context into your response while maintaining accura
                 "document_count": count,
                 "collection_name": self.collection_name,
                 "model": self.model_name,
-                "status": "operational" if count > 0 else "empty"
+                "vector_store": self.collection.get_stats(),
+                "status": "operational" if count > 0 else "empty",
+                "write_behind": self.write_queue.get_stats() if self.write_queue else None,
+                "executor": self.executor.get_stats(),
+                "query_batching": self.query_batcher.get_stats() if self.query_batcher else None,
+                "cache": {
+                    "embeddings": self.embedding_cache.get_stats(),
+                    "results": self.result_cache.get_stats()
+                },
+                "last_ingest": self.last_ingest,
+                "lexical": self.lexical_index.get_stats(),
+                "context_packing": self.context_packer.get_stats(),
+                "startup": self.get_startup_stats()
             }
         except Exception as e:
             logger.error(f"❌ Failed to get stats: {e}")
@@ -220,14 +1367,46 @@ Please incorporate the above context into your response while maintaining accura
 
 # Global RAG instance for easy access
 _rag_instance = None
+_rag_instance_lock = threading.Lock()
+_rag_warmup_task: Optional[asyncio.Task] = None
 
 def get_rag_system() -> RAGSystem:
     """Get global RAG system instance"""
     global _rag_instance
     if _rag_instance is None:
-        _rag_instance = RAGSystem()
+        with _rag_instance_lock:
+            if _rag_instance is None:
+                _rag_instance = RAGSystem()
     return _rag_instance
 
+def start_rag_warmup() -> asyncio.Task:
+    """
+    Build the global RAG system and warm its encoder in the background
+    
+    Call from app startup; requests arriving meanwhile are served as usual
+    and ``get_rag_health()`` reports "warming" until the model is loaded.
+    """
+    global _rag_warmup_task
+    if _rag_warmup_task is None:
+        _rag_warmup_task = asyncio.ensure_future(_warmup_global_rag())
+    return _rag_warmup_task
+
+async def _warmup_global_rag() -> RAGSystem:
+    # Construction imports chromadb and opens the store: keep it off the loop too
+    rag = await asyncio.get_running_loop().run_in_executor(None, get_rag_system)
+    await rag.warmup()
+    return rag
+
+def get_rag_health() -> Dict[str, Any]:
+    """Readiness of the global RAG system, without constructing it"""
+    if _rag_instance is not None:
+        return _rag_instance.get_startup_stats()
+    if _rag_warmup_task is None:
+        return {"status": "cold"}
+    if _rag_warmup_task.done() and not _rag_warmup_task.cancelled() and _rag_warmup_task.exception():
+        return {"status": "failed", "error": str(_rag_warmup_task.exception())}
+    return {"status": "warming"}
+
 async def enhance_multi_llm_prompt(prompt: str, conversation_history: List = None) -> str:
     """
     INTEGRATION HELPER: Enhance prompts for multi-LLM system
@@ -0,0 +1,858 @@
+"""
+🗄️ VECTOR STORES - Pluggable storage for RAG embeddings
+
+RAGSystem talks to its vector store through the small, Chroma-collection
+shaped ``VectorStore`` interface (upsert / query / get / delete / count), so
+the backend can be swapped without touching retrieval code:
+
+- ChromaVectorStore: chromadb.PersistentClient collection (HNSW, cosine)
+- NumpyVectorStore: in-process flat index over a memory-mapped matrix
+
+The NumPy backend keeps L2-normalized embeddings in a ``.npy`` file opened
+with ``mmap_mode``. Ids, metadata and document offsets go to an append-only
+JSONL log and document text to an append-only ``documents.bin``, so a write
+costs O(batch) and cold start replays the log without reading any document
+text. Both files are rewritten only on compaction. Several worker processes
+can map the same files read-only, share pages zero-copy and tail the log
+for new writes. It is single-writer: exactly one process should add or
+delete documents.
+
+With ``quantization="int8"`` or ``"binary"`` the first-pass scan runs over a
+compact code matrix (1 byte or 1 bit per dimension) and only the top
+candidates are rescored against the full-precision rows on disk.
+"""
+
+import os
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorStore(ABC):
+    """
+    Vector store interface used by RAGSystem
+
+    Mirrors the subset of the Chroma collection API the RAG system needs.
+    ``query`` returns Chroma-shaped results: a dict of per-query lists under
+    ``ids``, ``documents``, ``metadatas`` and ``distances`` (cosine distance).
+    """
+
+    @abstractmethod
+    def upsert(self,
+               ids: List[str],
+               embeddings: List[List[float]],
+               documents: List[str],
+               metadatas: List[Dict[str, Any]]) -> None:
+        """Insert or replace documents by ID"""
+
+    def add(self,
+            ids: List[str],
+            embeddings: List[List[float]],
+            documents: List[str],
+            metadatas: List[Dict[str, Any]]) -> None:
+        """Insert documents (same as upsert unless a backend says otherwise)"""
+        self.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    @abstractmethod
+    def query(self,
+              query_embeddings: List[List[float]],
+              n_results: int,
+              where: Optional[Dict[str, Any]] = None) -> Dict[str, List[List[Any]]]:
+        """Top-``n_results`` nearest documents for each query embedding"""
+
+    @abstractmethod
+    def get(self, ids: List[str]) -> Dict[str, List[Any]]:
+        """Fetch documents and metadata by ID (missing IDs are skipped)"""
+
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        """Remove documents by ID"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored documents"""
+
+    def iter_documents(self, batch_size: int = 1000) -> Iterator[Tuple[List[str], List[str]]]:
+        """Yield (ids, documents) batches covering every stored document"""
+        raise NotImplementedError(f"{type(self).__name__} cannot list its documents")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "count": self.count()}
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB persistent collection with cosine HNSW index"""
+
+    def __init__(self, persist_directory: str, collection_name: str):
+        import chromadb
+
+        self.client = chromadb.PersistentClient(path=persist_directory)
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name,
+            metadata={"hnsw:space": "cosine"}
+        )
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        self.collection.upsert(ids=ids, embeddings=_as_lists(embeddings), documents=documents, metadatas=metadatas)
+
+    def add(self, ids, embeddings, documents, metadatas) -> None:
+        self.collection.add(ids=ids, embeddings=_as_lists(embeddings), documents=documents, metadatas=metadatas)
+
+    def query(self, query_embeddings, n_results, where=None):
+        return self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where
+        )
+
+    def get(self, ids):
+        return self.collection.get(ids=ids)
+
+    def delete(self, ids) -> None:
+        self.collection.delete(ids=ids)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def iter_documents(self, batch_size: int = 1000):
+        offset = 0
+        while True:
+            batch = self.collection.get(limit=batch_size, offset=offset, include=["documents"])
+            if not batch["ids"]:
+                return
+            yield batch["ids"], batch["documents"]
+            offset += len(batch["ids"])
+
+
+def _as_lists(embeddings: Any) -> List[List[float]]:
+    if isinstance(embeddings, np.ndarray):
+        return embeddings.tolist()
+    return [e.tolist() if isinstance(e, np.ndarray) else e for e in embeddings]
+
+
+def metadata_matches(metadata: Optional[Dict[str, Any]], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Chroma-style ``where`` clause against one metadata dict"""
+    if not where:
+        return True
+    metadata = metadata or {}
+    for field, condition in where.items():
+        if field == "$and":
+            if not all(metadata_matches(metadata, clause) for clause in condition):
+                return False
+        elif field == "$or":
+            if not any(metadata_matches(metadata, clause) for clause in condition):
+                return False
+        else:
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            value = metadata.get(field)
+            for op, operand in condition.items():
+                if op == "$eq":
+                    ok = value == operand
+                elif op == "$ne":
+                    ok = value != operand
+                elif op == "$in":
+                    ok = value in operand
+                elif op == "$nin":
+                    ok = value not in operand
+                else:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+                if not ok:
+                    return False
+    return True
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+# Set bits per byte value, for Hamming distance over packed sign bits
+# (fallback for NumPy < 2.0, which lacks np.bitwise_count)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _hamming(codes: np.ndarray, packed_query: np.ndarray) -> np.ndarray:
+    """Hamming distance between each packed code row and one packed query"""
+    if hasattr(np, "bitwise_count"):
+        if codes.shape[1] % 8 == 0:
+            codes = codes.view(np.uint64)
+            packed_query = packed_query.view(np.uint64)
+        return np.bitwise_count(codes ^ packed_query).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT[codes ^ packed_query].sum(axis=1, dtype=np.int32)
+
+INT8_SCALE = 127.0
+
+
+def quantize(vectors: np.ndarray, quantization: str) -> np.ndarray:
+    """Encode normalized float vectors as int8 or packed sign-bit codes"""
+    if quantization == "int8":
+        return np.clip(np.rint(vectors * INT8_SCALE), -127, 127).astype(np.int8)
+    if quantization == "binary":
+        return np.packbits(vectors > 0, axis=1)
+    raise ValueError(f"Unsupported quantization: {quantization}")
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Flat cosine index over a memory-mapped float32/float16 matrix
+
+    Top-k is a blocked matmul against the normalized matrix followed by
+    ``argpartition``. Metadata filters (``{"key": value}``, ``$eq``, ``$ne``,
+    ``$in``, ``$nin``, ``$and``, ``$or``) are evaluated to boolean row masks
+    that are cached until the next write.
+
+    With quantization enabled, ``rescore_factor * n_results`` candidates are
+    taken from the code matrix (int8 dot product or Hamming distance) and
+    rescored exactly. Every ``recall_sample_every``-th query also runs the
+    full-precision scan so ``get_stats`` can report recall@k against it.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    CODES_FILE = "codes.npy"
+    HEADER_FILE = "index.json"
+    LOG_FILE = "index.log"
+    DOCUMENTS_FILE = "documents.bin"
+    BLOCK_ROWS = 65536  # rows scored per matmul block (bounds float16 upcasts)
+    CODE_BLOCK_ROWS = 2048  # int8 rows upcast per block (keeps the copy in cache)
+    QUANTIZATIONS = ("none", "int8", "binary")
+
+    def __init__(self,
+                 path: str,
+                 dtype: str = "float32",
+                 read_only: bool = False,
+                 quantization: str = "none",
+                 rescore_factor: int = 4,
+                 recall_sample_every: int = 100):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported dtype for NumpyVectorStore: {dtype}")
+        if quantization not in self.QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization for NumpyVectorStore: {quantization}")
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.read_only = read_only
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        self.recall_sample_every = recall_sample_every
+        self._codes: Optional[np.ndarray] = None
+        self._queries = 0
+        self._recall_samples = 0
+        self._recall_sum = 0.0
+        self._lock = threading.RLock()
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._vectors_inode: Optional[int] = None
+        self._rows = 0
+        self._ids: List[Optional[str]] = []
+        self._spans: List[Optional[Tuple[int, int]]] = []  # (offset, length) in documents.bin
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._mask_cache: Dict[str, np.ndarray] = {}
+        self._generation = 0  # Bumped whenever compaction renumbers rows
+        self._log_out: Optional[BinaryIO] = None
+        self._documents_out: Optional[BinaryIO] = None
+        self._documents_in: Optional[BinaryIO] = None
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+        self._log_records = 0
+        self._documents_size = 0
+        self._live_document_bytes = 0
+
+        if not read_only:
+            os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, self.VECTORS_FILE)
+
+    @property
+    def _codes_path(self) -> str:
+        return os.path.join(self.path, self.CODES_FILE)
+
+    @property
+    def _header_path(self) -> str:
+        return os.path.join(self.path, self.HEADER_FILE)
+
+    @property
+    def _log_path(self) -> str:
+        return os.path.join(self.path, self.LOG_FILE)
+
+    @property
+    def _documents_path(self) -> str:
+        return os.path.join(self.path, self.DOCUMENTS_FILE)
+
+    def _code_width(self, dim: int) -> int:
+        return dim if self.quantization == "int8" else (dim + 7) // 8
+
+    def _code_dtype(self) -> np.dtype:
+        return np.dtype(np.int8 if self.quantization == "int8" else np.uint8)
+
+    def _load_codes(self) -> None:
+        """Map the code matrix, rebuilding it if missing or built for another mode"""
+        if self.quantization == "none":
+            self._codes = None
+            return
+        mode = "r" if self.read_only else "r+"
+        if os.path.exists(self._codes_path):
+            codes = np.load(self._codes_path, mmap_mode=mode)
+            if (codes.dtype == self._code_dtype()
+                    and codes.shape == (self._vectors.shape[0], self._code_width(self._dim))):
+                self._codes = codes
+                return
+        if self.read_only:
+            raise ValueError(
+                f"NumpyVectorStore at {self.path} has no {self.quantization} codes; "
+                "open it once writable to build them"
+            )
+        logger.info(f"🗜️ Building {self.quantization} codes for {self.path}")
+        self._codes = self._write_codes(self._vectors, self._rows)
+
+    def _write_codes(self, vectors: np.ndarray, rows: int) -> np.ndarray:
+        """Write a code matrix matching ``vectors``' capacity, encoding ``rows`` rows"""
+        tmp_path = f"{self._codes_path}.tmp"
+        codes = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=self._code_dtype(),
+            shape=(vectors.shape[0], self._code_width(self._dim))
+        )
+        for start in range(0, rows, self.BLOCK_ROWS):
+            stop = min(start + self.BLOCK_ROWS, rows)
+            codes[start:stop] = quantize(np.asarray(vectors[start:stop], dtype=np.float32), self.quantization)
+        codes.flush()
+        del codes
+        os.replace(tmp_path, self._codes_path)
+        return np.load(self._codes_path, mmap_mode="r+")
+
+    def _map_vectors(self) -> None:
+        self._vectors = np.load(self._vectors_path, mmap_mode="r" if self.read_only else "r+")
+        self._vectors_inode = os.stat(self._vectors_path).st_ino
+
+    def _grow_alive(self, size: int) -> None:
+        if size > len(self._alive):
+            self._alive = np.concatenate([self._alive, np.zeros(size - len(self._alive), dtype=bool)])
+
+    def _load(self) -> None:
+        if not os.path.exists(self._header_path):
+            return
+        with open(self._header_path, 'r', encoding='utf-8') as f:
+            header = json.load(f)
+
+        self._dim = header["dim"]
+        self.dtype = np.dtype(header["dtype"])
+        self._rows = 0
+        self._ids, self._spans, self._metadatas = [], [], []
+        self._id_to_row = {}
+        self._live_document_bytes = 0
+        self._map_vectors()
+        self._alive = np.zeros(self._vectors.shape[0], dtype=bool)
+        self._mask_cache.clear()
+        self._generation += 1
+
+        if "ids" in header:
+            self._migrate_sidecar(header)
+        else:
+            self._open_files()
+            self._log_inode, self._log_offset, self._log_records = None, 0, 0
+            self._tail_log()
+        self._load_codes()
+
+    def _migrate_sidecar(self, sidecar: Dict[str, Any]) -> None:
+        """Convert a JSON-sidecar index (ids, documents, metadata in one file) to the log format"""
+        if self.read_only:
+            raise ValueError(
+                f"NumpyVectorStore at {self.path} uses the old JSON sidecar; "
+                "open it once writable to migrate it"
+            )
+        logger.info(f"🗄️ Migrating {self.path} to the append-only index log")
+        self._ids = sidecar["ids"]
+        self._metadatas = sidecar["metadatas"]
+        self._rows = len(self._ids)
+        self._id_to_row = {doc_id: row for row, doc_id in enumerate(self._ids) if doc_id is not None}
+        self._alive[:self._rows] = [doc_id is not None for doc_id in self._ids]
+        self._rewrite_files(sidecar["documents"])
+
+    def _open_files(self) -> None:
+        for handle in (self._log_out, self._documents_out, self._documents_in):
+            if handle is not None:
+                handle.close()
+        if not self.read_only:
+            self._log_out = open(self._log_path, 'ab')
+            self._documents_out = open(self._documents_path, 'ab')
+        self._documents_in = open(self._documents_path, 'rb') if os.path.exists(self._documents_path) else None
+        self._documents_size = os.path.getsize(self._documents_path) if self._documents_in else 0
+
+    def _tail_log(self) -> bool:
+        """Apply records appended to the log since the last read; False if it was replaced"""
+        try:
+            with open(self._log_path, 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                if self._log_inode is not None and inode != self._log_inode:
+                    return False
+                self._log_inode = inode
+                f.seek(self._log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return True
+
+        # A writer may be mid-append: only whole lines are applied
+        complete = data.rfind(b"\n") + 1
+        if complete:
+            self._apply_all(json.loads(b"[" + data[:complete - 1].replace(b"\n", b",") + b"]"))
+        self._log_offset += complete
+        self._log_records += data.count(b"\n", 0, complete)
+        if complete < len(data) and not self.read_only:
+            # Torn append from a crashed writer
+            self._log_out.truncate(self._log_offset)
+        return True
+
+    def _apply_all(self, records: List[list]) -> None:
+        """
+        Apply log records in order
+
+        ``[row, id, offset, length, metadata]`` stores a row (document text
+        at ``offset`` in documents.bin); ``[row]`` deletes it.
+        """
+        ids, spans, metadatas, id_to_row = self._ids, self._spans, self._metadatas, self._id_to_row
+        last_row = max(record[0] for record in records)
+        if last_row >= len(ids):
+            grow = last_row + 1 - len(ids)
+            ids.extend([None] * grow)
+            spans.extend([None] * grow)
+            metadatas.extend([None] * grow)
+        self._grow_alive(last_row + 1)
+        alive = self._alive
+        live_bytes = self._live_document_bytes
+
+        for record in records:
+            row = record[0]
+            old_id = ids[row]
+            if old_id is not None:
+                del id_to_row[old_id]
+                live_bytes -= spans[row][1]
+            if len(record) == 1:
+                ids[row] = spans[row] = metadatas[row] = None
+                alive[row] = False
+            else:
+                _, doc_id, offset, length, metadata = record
+                ids[row] = doc_id
+                spans[row] = (offset, length)
+                metadatas[row] = metadata
+                id_to_row[doc_id] = row
+                live_bytes += length
+                alive[row] = True
+
+        self._live_document_bytes = live_bytes
+        self._rows = max(self._rows, last_row + 1)
+
+    def _append(self, records: List[list], documents: bytes = b"") -> None:
+        """Persist applied records: vectors first, then document text, then the log lines"""
+        if self._vectors is not None:
+            self._vectors.flush()
+        if self._codes is not None:
+            self._codes.flush()
+        if documents:
+            self._documents_out.write(documents)
+            self._documents_out.flush()
+            self._documents_size += len(documents)
+            if self._documents_in is None:
+                self._documents_in = open(self._documents_path, 'rb')
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records).encode('utf-8')
+        self._log_out.write(data)
+        self._log_out.flush()
+        self._log_offset += len(data)
+        self._log_records += len(records)
+
+    def _write_header(self) -> None:
+        tmp_path = f"{self._header_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"format": 2, "dim": self._dim, "dtype": self.dtype.name}, f)
+        os.replace(tmp_path, self._header_path)
+
+    def _rewrite_files(self, documents: List[Optional[str]]) -> None:
+        """Write fresh documents and log files for the current rows (``documents[row]``)"""
+        self._write_header()
+        self._spans = [None] * self._rows
+        self._live_document_bytes = 0
+        records = []
+        with open(f"{self._documents_path}.tmp", 'wb') as f:
+            for row, doc_id in enumerate(self._ids):
+                if doc_id is None:
+                    continue
+                encoded = documents[row].encode('utf-8')
+                records.append([row, doc_id, f.tell(), len(encoded), self._metadatas[row]])
+                self._spans[row] = (f.tell(), len(encoded))
+                self._live_document_bytes += len(encoded)
+                f.write(encoded)
+        with open(f"{self._log_path}.tmp", 'wb') as f:
+            f.write("".join(json.dumps(record, separators=(",", ":")) + "\n"
+                            for record in records).encode('utf-8'))
+        # Documents first: readers reload everything once they see a new log
+        os.replace(f"{self._documents_path}.tmp", self._documents_path)
+        os.replace(f"{self._log_path}.tmp", self._log_path)
+        self._open_files()
+        self._log_inode = os.stat(self._log_path).st_ino
+        self._log_offset = os.path.getsize(self._log_path)
+        self._log_records = len(records)
+
+    def _document(self, row: int) -> str:
+        offset, length = self._spans[row]
+        self._documents_in.seek(offset)
+        return self._documents_in.read(length).decode('utf-8')
+
+    def refresh(self) -> bool:
+        """Apply writes another process has logged since the last call; True if any"""
+        try:
+            log = os.stat(self._log_path)
+        except FileNotFoundError:
+            return False
+        if log.st_ino == self._log_inode and log.st_size == self._log_offset:
+            return False
+        with self._lock:
+            if self._log_inode is None or not self._tail_log():
+                self._load()  # First write, or the writer compacted
+            elif (os.stat(self._vectors_path).st_ino != self._vectors_inode
+                    or self._rows > self._vectors.shape[0]):
+                self._map_vectors()  # The writer grew the matrix
+                self._load_codes()
+            self._mask_cache.clear()
+        return True
+
+    def _ensure_capacity(self, rows: int, dim: int) -> None:
+        """Grow (or create) the mmap'd matrix to hold at least ``rows`` rows"""
+        if self._dim is None:
+            self._dim = dim
+        elif dim != self._dim:
+            raise ValueError(f"Embedding dimension {dim} does not match index dimension {self._dim}")
+
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= capacity:
+            return
+
+        new_capacity = max(rows, capacity * 2, 1024)
+        tmp_path = f"{self._vectors_path}.tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=self.dtype, shape=(new_capacity, dim))
+        if self._rows:
+            grown[:self._rows] = self._vectors[:self._rows]
+        grown.flush()
+        del grown
+        os.replace(tmp_path, self._vectors_path)
+        if self._vectors is None:
+            self._write_header()
+            self._open_files()
+        self._map_vectors()
+        self._grow_alive(new_capacity)
+        if self.quantization != "none":
+            self._codes = self._write_codes(self._vectors, self._rows)
+
+    def _maybe_compact(self) -> None:
+        """Compact once deletes, replaced documents or log records dominate the files"""
+        dead = self._rows - len(self._id_to_row)
+        if ((dead > 1024 and dead > self._rows // 2)
+                or self._log_records > 2 * self._rows + 4096
+                or self._documents_size > 2 * self._live_document_bytes + (1 << 20)):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the index without deleted rows, replaced documents or superseded log records"""
+        keep = np.flatnonzero(self._alive[:self._rows])
+        documents = [self._document(row) for row in keep]
+        tmp_path = f"{self._vectors_path}.tmp"
+        compacted = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=self.dtype, shape=(max(len(keep), 1), self._dim)
+        )
+        compacted[:len(keep)] = self._vectors[keep]
+        compacted.flush()
+        del compacted
+        os.replace(tmp_path, self._vectors_path)
+
+        self._ids = [self._ids[row] for row in keep]
+        self._metadatas = [self._metadatas[row] for row in keep]
+        self._rows = len(keep)
+        self._id_to_row = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._map_vectors()
+        self._alive = np.zeros(self._vectors.shape[0], dtype=bool)
+        self._alive[:self._rows] = True
+        if self.quantization != "none":
+            self._codes = self._write_codes(self._vectors, self._rows)
+        self._rewrite_files(documents)
+        self._generation += 1
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise PermissionError(f"NumpyVectorStore at {self.path} is opened read-only")
+
+    # ------------------------------------------------------------------
+    # VectorStore API
+    # ------------------------------------------------------------------
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        self._check_writable()
+        if not ids:
+            return
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+
+        with self._lock:
+            new_ids = [doc_id for doc_id in dict.fromkeys(ids) if doc_id not in self._id_to_row]
+            self._ensure_capacity(self._rows + len(new_ids), vectors.shape[1])
+
+            records, text = [], bytearray()
+            for doc_id, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+                row = self._id_to_row.get(doc_id, self._rows)
+                encoded = document.encode('utf-8')
+                record = [row, doc_id, self._documents_size + len(text), len(encoded), metadata or {}]
+                text += encoded
+                self._vectors[row] = vector
+                if self._codes is not None:
+                    self._codes[row] = quantize(vector[None, :], self.quantization)[0]
+                self._apply_all([record])  # One at a time: ids may repeat within a batch
+                records.append(record)
+
+            self._mask_cache.clear()
+            self._append(records, bytes(text))
+            self._maybe_compact()
+
+    def delete(self, ids) -> None:
+        self._check_writable()
+        with self._lock:
+            records = [[self._id_to_row[doc_id]] for doc_id in dict.fromkeys(ids) if doc_id in self._id_to_row]
+            if not records:
+                return
+            self._apply_all(records)
+
+            self._mask_cache.clear()
+            self._append(records)
+            self._maybe_compact()
+
+    def get(self, ids):
+        result = {"ids": [], "documents": [], "metadatas": []}
+        with self._lock:
+            for doc_id in ids:
+                row = self._id_to_row.get(doc_id)
+                if row is not None:
+                    result["ids"].append(doc_id)
+                    result["documents"].append(self._document(row))
+                    result["metadatas"].append(self._metadatas[row])
+        return result
+
+    def count(self) -> int:
+        return len(self._id_to_row)
+
+    def iter_documents(self, batch_size: int = 1000):
+        with self._lock:
+            ids = list(self._id_to_row)
+        for start in range(0, len(ids), batch_size):
+            batch = self.get(ids[start:start + batch_size])  # Skips IDs deleted meanwhile
+            yield batch["ids"], batch["documents"]
+
+    def query(self, query_embeddings, n_results, where=None):
+        if self.read_only:
+            self.refresh()
+
+        with self._lock:
+            if not self._id_to_row:
+                return {
+                    key: [[] for _ in query_embeddings]
+                    for key in ("ids", "documents", "metadatas", "distances")
+                }
+            rows = self._rows
+            vectors = self._vectors
+            codes = self._codes
+            mask = self._mask(where)[:rows].copy()
+            generation = self._generation
+            self._queries += 1
+            sample_recall = (codes is not None and self.recall_sample_every > 0
+                             and self._queries % self.recall_sample_every == 0)
+
+        queries = _normalize(np.asarray(query_embeddings, dtype=np.float32))
+        k = min(n_results, int(mask.sum()))
+        if codes is None:
+            tops = self._exact_top_k(vectors, rows, queries, mask, k)
+        else:
+            tops = self._rescored_top_k(vectors, codes, rows, queries, mask, k)
+            if sample_recall:
+                self._record_recall(tops, self._exact_top_k(vectors, rows, queries, mask, k))
+
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        with self._lock:
+            if self._generation != generation:
+                # Compacted while scoring: row numbers changed, score again
+                return self.query(query_embeddings, n_results, where)
+            for top, scores in tops:
+                # Rows deleted while scoring are dropped
+                hits = [(row, score) for row, score in zip(top.tolist(), scores) if self._alive[row]]
+                result["ids"].append([self._ids[row] for row, _ in hits])
+                result["documents"].append([self._document(row) for row, _ in hits])
+                result["metadatas"].append([self._metadatas[row] for row, _ in hits])
+                result["distances"].append([float(1.0 - score) for _, score in hits])
+        return result
+
+    def _exact_top_k(self, vectors, rows, queries, mask, k) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Full-precision scan: (rows, scores) per query"""
+        scores = self._scores(vectors, rows, queries)
+        scores[~mask] = -np.inf
+        tops = []
+        for column in range(queries.shape[0]):
+            top = self._top_k(scores[:, column], k)
+            tops.append((top, scores[top, column]))
+        return tops
+
+    def _rescored_top_k(self, vectors, codes, rows, queries, mask, k) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Quantized first pass, then exact rescoring of the best candidates"""
+        approx = self._approx_scores(codes, rows, queries)
+        approx[~mask] = -np.inf
+        candidates_k = min(k * self.rescore_factor, int(mask.sum()))
+        tops = []
+        for column in range(queries.shape[0]):
+            candidates = np.sort(self._top_k(approx[:, column], candidates_k))
+            exact = np.asarray(vectors[candidates], dtype=np.float32) @ queries[column]
+            order = self._top_k(exact, k)
+            tops.append((candidates[order], exact[order]))
+        return tops
+
+    def _approx_scores(self, codes: np.ndarray, rows: int, queries: np.ndarray) -> np.ndarray:
+        """Similarity estimate from the code matrix: (rows, queries), higher is closer"""
+        scores = np.empty((rows, queries.shape[0]), dtype=np.float32)
+        if self.quantization == "int8":
+            scaled = (queries * INT8_SCALE).T
+            for start in range(0, rows, self.CODE_BLOCK_ROWS):
+                stop = min(start + self.CODE_BLOCK_ROWS, rows)
+                scores[start:stop] = np.asarray(codes[start:stop], dtype=np.float32) @ scaled
+        else:
+            packed = quantize(queries, "binary")
+            for start in range(0, rows, self.BLOCK_ROWS):
+                stop = min(start + self.BLOCK_ROWS, rows)
+                block = np.ascontiguousarray(codes[start:stop])
+                for column in range(packed.shape[0]):
+                    scores[start:stop, column] = -_hamming(block, packed[column])
+        return scores
+
+    def _record_recall(self, tops, exact_tops) -> None:
+        for (top, _), (exact, _) in zip(tops, exact_tops):
+            if len(exact) == 0:
+                continue
+            recall = len(set(top.tolist()) & set(exact.tolist())) / len(exact)
+            with self._lock:
+                self._recall_samples += 1
+                self._recall_sum += recall
+
+    def _scores(self, vectors: np.ndarray, rows: int, queries: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every stored row against every query: (rows, queries)"""
+        scores = np.empty((rows, queries.shape[0]), dtype=np.float32)
+        for start in range(0, rows, self.BLOCK_ROWS):
+            stop = min(start + self.BLOCK_ROWS, rows)
+            block = np.asarray(vectors[start:stop], dtype=np.float32)
+            scores[start:stop] = block @ queries.T
+        return scores
+
+    @staticmethod
+    def _top_k(column_scores: np.ndarray, k: int) -> np.ndarray:
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        if k < len(column_scores):
+            candidates = np.argpartition(-column_scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(column_scores))
+        return candidates[np.argsort(-column_scores[candidates], kind="stable")]
+
+    # ------------------------------------------------------------------
+    # Metadata filters
+    # ------------------------------------------------------------------
+
+    def _mask(self, where: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Boolean row mask of live rows matching ``where`` (cached per clause)"""
+        alive = self._alive[:self._rows]
+        if not where:
+            return alive
+        key = json.dumps(where, sort_keys=True, default=str)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            mask = alive & self._evaluate(where)
+            self._mask_cache[key] = mask
+        return mask
+
+    def _evaluate(self, where: Dict[str, Any]) -> np.ndarray:
+        mask = np.ones(self._rows, dtype=bool)
+        for field, condition in where.items():
+            if field == "$and":
+                for clause in condition:
+                    mask &= self._evaluate(clause)
+            elif field == "$or":
+                any_mask = np.zeros(self._rows, dtype=bool)
+                for clause in condition:
+                    any_mask |= self._evaluate(clause)
+                mask &= any_mask
+            else:
+                mask &= self._field_mask(field, condition)
+        return mask
+
+    def _field_mask(self, field: str, condition: Any) -> np.ndarray:
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        values = [meta.get(field) if meta else None for meta in self._metadatas[:self._rows]]
+        mask = np.ones(self._rows, dtype=bool)
+        for op, operand in condition.items():
+            if op == "$eq":
+                mask &= np.fromiter((v == operand for v in values), dtype=bool, count=self._rows)
+            elif op == "$ne":
+                mask &= np.fromiter((v != operand for v in values), dtype=bool, count=self._rows)
+            elif op == "$in":
+                allowed = set(operand)
+                mask &= np.fromiter((v in allowed for v in values), dtype=bool, count=self._rows)
+            elif op == "$nin":
+                blocked = set(operand)
+                mask &= np.fromiter((v not in blocked for v in values), dtype=bool, count=self._rows)
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        return mask
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "numpy",
+            "count": self.count(),
+            "rows": self._rows,
+            "capacity": 0 if self._vectors is None else int(self._vectors.shape[0]),
+            "dim": self._dim,
+            "dtype": self.dtype.name,
+            "path": self.path,
+            "read_only": self.read_only,
+            "cached_filter_masks": len(self._mask_cache),
+            "log_records": self._log_records,
+            "documents_bytes": self._documents_size,
+            "quantization": self.quantization,
+            "rescore_factor": self.rescore_factor,
+            "bytes_per_vector": {
+                "full": 0 if self._dim is None else self._dim * self.dtype.itemsize,
+                "scan": (0 if self._dim is None else
+                         self._dim * self.dtype.itemsize if self._codes is None
+                         else self._code_width(self._dim)),
+            },
+            "recall_at_k": (round(self._recall_sum / self._recall_samples, 4)
+                            if self._recall_samples else None),
+            "recall_samples": self._recall_samples,
+        }
+
+
+def create_vector_store(backend: str,
+                        persist_directory: str,
+                        collection_name: str,
+                        **kwargs) -> VectorStore:
+    """Build a vector store by backend name ("chroma" or "numpy")"""
+    if backend == "chroma":
+        if kwargs.get("quantization", "none") != "none":
+            raise ValueError("Quantized storage requires the numpy vector backend")
+        return ChromaVectorStore(persist_directory, collection_name)
+    if backend == "numpy":
+        return NumpyVectorStore(os.path.join(persist_directory, collection_name), **kwargs)
+    raise ValueError(f"Unknown vector store backend: {backend}")
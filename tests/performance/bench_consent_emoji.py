@@ -0,0 +1,118 @@
+"""
+Benchmark the precomputed ConsentOS emoji scanner against the original
+implementation (map rebuilt per call, one rfind per emoji sequence)
+
+Checks parity on every generated message first, then reports per-message
+latency for short chat messages and long pasted ones, with and without
+emoji, plus batch throughput.
+
+    python tests/performance/bench_consent_emoji.py --messages 2000 --long-chars 20000
+"""
+
+import argparse
+import random
+import time
+
+from tec_tgcr.core.ethics import (
+    CONSENT_EMOJI,
+    BoundaryMarker,
+    ConsentState,
+    EmotionState,
+    IntensityLevel,
+    MetaSignal,
+    PaceSignal,
+    SafetySignal,
+    parse_consent_emoji,
+    parse_consent_emoji_batch,
+)
+
+PROSE = "I keep coming back to what you said about resonance and the archive, and I am not sure yet. ".split()
+
+
+def rfind_parse(message: str) -> ConsentState:
+    """The original implementation: rebuild the map, one rfind per emoji, sort"""
+    emoji_map = dict(CONSENT_EMOJI)
+    intensity, pace, boundary = IntensityLevel.GREEN, PaceSignal.STEADY, BoundaryMarker.DOOR
+    emotions, meta_signals, safety = [], [], None
+    emoji_positions = []
+    for emoji, enum_val in emoji_map.items():
+        pos = message.rfind(emoji)
+        if pos != -1:
+            emoji_positions.append((pos, emoji, enum_val))
+    emoji_positions.sort(key=lambda x: x[0])
+    for pos, emoji, enum_val in emoji_positions:
+        if isinstance(enum_val, IntensityLevel):
+            intensity = enum_val
+        elif isinstance(enum_val, PaceSignal):
+            pace = enum_val
+        elif isinstance(enum_val, BoundaryMarker):
+            boundary = enum_val
+        elif isinstance(enum_val, EmotionState):
+            if len(emotions) < 3:
+                emotions.append(enum_val)
+        elif isinstance(enum_val, MetaSignal):
+            if len(meta_signals) < 2:
+                meta_signals.append(enum_val)
+        elif isinstance(enum_val, SafetySignal):
+            safety = enum_val
+    return ConsentState(intensity=intensity, pace=pace, boundary=boundary, emotions=emotions,
+                        meta=meta_signals, safety=safety, context=message)
+
+
+def as_tuple(state) -> tuple:
+    return state.intensity, state.pace, state.boundary, state.emotions, state.meta, state.safety
+
+
+def corpus(rng: random.Random, count: int, chars: int, emoji_rate: float) -> list:
+    emoji = list(CONSENT_EMOJI)
+    messages = []
+    for _ in range(count):
+        parts, length = [], 0
+        while length < chars:
+            part = rng.choice(emoji) if rng.random() < emoji_rate else rng.choice(PROSE)
+            parts.append(part)
+            length += len(part) + 1
+        messages.append(" ".join(parts))
+    return messages
+
+
+def timed(fn, messages: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(messages)
+        best = min(best, time.perf_counter() - start)
+    return best / len(messages) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--short-chars", type=int, default=120)
+    parser.add_argument("--long-chars", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    cases = {
+        "short, plain": corpus(rng, args.messages, args.short_chars, 0.0),
+        "short, emoji": corpus(rng, args.messages, args.short_chars, 0.15),
+        "long, plain": corpus(rng, max(1, args.messages // 20), args.long_chars, 0.0),
+        "long, emoji": corpus(rng, max(1, args.messages // 20), args.long_chars, 0.01),
+    }
+
+    for messages in cases.values():
+        for message in messages:
+            assert as_tuple(parse_consent_emoji(message)) == as_tuple(rfind_parse(message)), message[:80]
+    print(f"parity ok on {sum(len(m) for m in cases.values())} messages")
+
+    print(f"{'case':>14} {'rfind us':>10} {'scanner us':>11} {'batch us':>9} {'speedup':>8}")
+    for name, messages in cases.items():
+        old = timed(lambda ms: [rfind_parse(m) for m in ms], messages, args.repeat)
+        new = timed(lambda ms: [parse_consent_emoji(m) for m in ms], messages, args.repeat)
+        batch = timed(parse_consent_emoji_batch, messages, args.repeat)
+        print(f"{name:>14} {old:>10.2f} {new:>11.2f} {batch:>9.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark the memoized ConsentRiskTable against score_consent_risk
+
+Scores a stream of parsed chat messages (a realistic mix: mostly plain
+text, some single signals, a few clusters) both ways and reports
+per-message latency and the table's hit rate. The exhaustive equivalence
+check over every parseable state lives in tests/test_consent_os_emoji.py.
+
+    python tests/performance/bench_consent_risk.py --messages 50000 --warm
+"""
+
+import argparse
+import random
+import time
+
+from tec_tgcr.core.ethics import CONSENT_EMOJI, ConsentRiskTable, parse_consent_emoji, score_consent_risk
+
+
+def messages(rng: random.Random, count: int) -> list:
+    emoji = list(CONSENT_EMOJI)
+    out = []
+    for _ in range(count):
+        roll = rng.random()
+        signals = 0 if roll < 0.6 else 1 if roll < 0.9 else rng.randint(2, 4)
+        out.append("".join(rng.choice(emoji) for _ in range(signals)) + " how are you holding up today?")
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--warm", action="store_true", help="precompute single-signal states first")
+    args = parser.parse_args()
+
+    states = [parse_consent_emoji(m) for m in messages(random.Random(0), args.messages)]
+    table = ConsentRiskTable()
+    if args.warm:
+        start = time.perf_counter()
+        print(f"warm: {table.warm()} entries in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    for state in states:
+        score_consent_risk(state)
+    direct = (time.perf_counter() - start) / len(states) * 1e6
+
+    start = time.perf_counter()
+    for state in states:
+        table.score(state)
+    cached = (time.perf_counter() - start) / len(states) * 1e6
+
+    stats = table.get_stats()
+    print(f"{len(states)} messages: score_consent_risk {direct:.2f} us, table {cached:.2f} us "
+          f"({direct / cached:.1f}x), {stats['entries']} entries, hit rate {stats['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark ConversationStore write throughput and read paths
+
+Concurrent asyncio sessions each append one message at a time (as the
+save route does) and await durability. Reports appends/s, append latency
+and batch sizes. It then times the latest-page read and a full streamed
+export of one large conversation, including peak Python memory.
+
+    python tests/performance/bench_conversation_store.py --sessions 64 --messages 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "backend", "src"))
+
+from conversation_store import ConversationStore
+
+
+async def session(store: ConversationStore, conversation_id: str, messages: int, latencies: list) -> None:
+    for i in range(messages):
+        start = time.perf_counter()
+        await asyncio.wrap_future(store.append(conversation_id, [{"persona": "user", "content": f"turn {i} " * 20}]))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--large", type=int, default=10000, help="messages in the read-path conversation")
+    parser.add_argument("--page", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ConversationStore(f"{tmp}/bench.db", max_batch_size=args.batch_size)
+        latencies: list = []
+
+        async def run() -> None:
+            await asyncio.gather(*(
+                session(store, f"session{n}", args.messages, latencies) for n in range(args.sessions)
+            ))
+
+        start = time.perf_counter()
+        asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        stats = store.get_stats()
+        total = args.sessions * args.messages
+        print(f"{args.sessions} sessions x {args.messages} appends: {total / elapsed:,.0f} appends/s")
+        print(f"  append p50 {percentile(latencies, 50):.2f} ms, p99 {percentile(latencies, 99):.2f} ms, "
+              f"{stats['batches']} commits (avg {total / stats['batches']:.1f} appends/commit)")
+
+        for offset in range(0, args.large, 1000):
+            store.append("large", [{"persona": "claude", "content": f"reply {i} " * 40}
+                                   for i in range(offset, min(offset + 1000, args.large))])
+        store.append("large", []).result()
+
+        reads = []
+        for _ in range(200):
+            start = time.perf_counter()
+            store.page("large", limit=args.page)
+            reads.append((time.perf_counter() - start) * 1000)
+        print(f"latest page of {args.page} from {args.large} messages: median {statistics.median(reads):.3f} ms")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in store.export_markdown("large"))
+        export_ms = (time.perf_counter() - start) * 1000
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"markdown export: {size / 1e6:.1f} MB in {export_ms:.0f} ms, peak Python memory {peak / 1e6:.2f} MB")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
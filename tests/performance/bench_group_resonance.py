@@ -0,0 +1,71 @@
+"""
+Benchmark incremental group-resonance scoring on long synthetic conversations
+
+Embeddings are precomputed so the numbers isolate the scoring cost. The
+benchmark compares per-message update and score latency at increasing
+conversation lengths with rescanning the whole transcript on every score.
+
+    python tests/performance/bench_group_resonance.py --messages 20000 --dim 384
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "backend", "src"))
+
+from group_resonance import ConversationResonance
+
+PERSONAS = ["user", "claude", "openai", "xai"]
+
+
+def rescan(personas, vectors) -> dict:
+    state = ConversationResonance()
+    for persona, vector in zip(personas, vectors):
+        state.observe(persona, vector)
+    return state.score()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)  # all-MiniLM-L6-v2
+    parser.add_argument("--checkpoints", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Topics drift slowly, like a real conversation
+    topic = rng.normal(size=args.dim).astype(np.float32)
+    vectors = np.empty((args.messages, args.dim), dtype=np.float32)
+    for i in range(args.messages):
+        topic += rng.normal(scale=0.05, size=args.dim).astype(np.float32)
+        vectors[i] = topic + rng.normal(scale=0.5, size=args.dim)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    personas = [PERSONAS[i % 4] for i in range(args.messages)]
+
+    checkpoints = set(np.linspace(args.messages // args.checkpoints, args.messages, args.checkpoints, dtype=int))
+    state = ConversationResonance()
+    window_start, window = time.perf_counter(), 0
+    print(f"{args.messages} messages x {args.dim} dims")
+    print(f"{'messages':>9} {'update us':>10} {'score us':>9} {'rescan ms':>10}")
+    for i, (persona, vector) in enumerate(zip(personas, vectors), 1):
+        state.observe(persona, vector)
+        window += 1
+        if i in checkpoints:
+            update_us = (time.perf_counter() - window_start) / window * 1e6
+            start = time.perf_counter()
+            for _ in range(100):
+                state.score()
+            score_us = (time.perf_counter() - start) / 100 * 1e6
+            start = time.perf_counter()
+            rescan(personas[:i], vectors[:i])
+            rescan_ms = (time.perf_counter() - start) * 1000
+            print(f"{i:>9} {update_us:>10.1f} {score_us:>9.1f} {rescan_ms:>10.1f}")
+            window_start, window = time.perf_counter(), 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark RAG query micro-batching: lone-query latency and burst batching
+
+Runs RAGSystem.query with a hashing encoder that costs a fixed time per
+forward pass (no model download), once with the original QueryBatcher
+(every query waits out the window) and once with the current one (flush
+on the next loop turn while idle). Reports sequential single-query
+latency and how a concurrent burst is batched.
+
+    python tests/performance/bench_query_batching.py --window-ms 2 --encode-ms 5 --burst 32
+"""
+
+import argparse
+import asyncio
+import hashlib
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from tec_tgcr import rag_system
+from tec_tgcr.rag_system import QueryBatcher, RAGDocument, RAGQuery, RAGSystem
+from tec_tgcr.vector_store import NumpyVectorStore
+
+DIM = 64
+
+
+class HashingEncoder:
+    """Bag-of-words hashing encoder with a fixed cost per forward pass"""
+
+    encode_seconds = 0.0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        time.sleep(self.encode_seconds)
+        vectors = np.zeros((len(batch), DIM), dtype=np.float32)
+        for row, text in enumerate(batch):
+            for word in text.lower().split():
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM] += 1.0
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+        return vectors[0] if single else vectors
+
+
+class WindowedBatcher(QueryBatcher):
+    """The original batcher: every query waits for the window to close"""
+
+    async def submit(self, query, embedding=None):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, embedding, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._dispatch)
+        return await future
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--encode-ms", type=float, default=5.0)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--burst", type=int, default=32)
+    args = parser.parse_args()
+
+    HashingEncoder.encode_seconds = args.encode_ms / 1000
+    rag_system.load_encoder = HashingEncoder
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rag = RAGSystem(persist_directory=tmp, vector_store=NumpyVectorStore(f"{tmp}/store"),
+                        query_batch_window_ms=args.window_ms, result_cache_size=0, embedding_cache_size=0)
+        asyncio.run(rag.add_documents([
+            RAGDocument(text=f"resonance topic {i} witness {i % 17}", source=f"doc{i}.md")
+            for i in range(args.documents)
+        ]))
+        print(f"{args.documents} documents, window {args.window_ms} ms, encode {args.encode_ms} ms/pass")
+
+        for name, batcher_class in (("original", WindowedBatcher), ("idle flush", QueryBatcher)):
+            rag.query_batcher = batcher_class(rag, max_wait_ms=args.window_ms)
+
+            async def sequential() -> list:
+                latencies = []
+                for i in range(args.queries):
+                    start = time.perf_counter()
+                    await rag.query(RAGQuery(f"topic {i} witness", threshold=0.0))
+                    latencies.append((time.perf_counter() - start) * 1000)
+                return latencies
+
+            async def burst() -> float:
+                start = time.perf_counter()
+                await asyncio.gather(*(rag.query(RAGQuery(f"burst {i}", threshold=0.0))
+                                       for i in range(args.burst)))
+                return (time.perf_counter() - start) * 1000
+
+            latencies = asyncio.run(sequential())
+            batches_before = rag.query_batcher.batches
+            burst_ms = asyncio.run(burst())
+            print(f"  {name:<11} single query p50 {statistics.median(latencies):6.2f} ms  "
+                  f"max {max(latencies):6.2f} ms | burst of {args.burst}: {burst_ms:6.1f} ms in "
+                  f"{rag.query_batcher.batches - batches_before} batch(es)")
+
+
+if __name__ == "__main__":
+    main()
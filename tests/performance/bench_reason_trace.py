@@ -0,0 +1,85 @@
+"""
+Benchmark the WHY() reason-trace recorder on the /api/message hot path
+
+Scores a stream of parsed chat messages, then measures what recording
+adds per message at a few sample rates (CRISIS is always recorded), and
+how long the background flusher takes to write the ring buffer out.
+
+    python tests/performance/bench_reason_trace.py --messages 100000 --capacity 4096
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from tec_tgcr.core.ethics import CONSENT_EMOJI, WHY, consent_risk_table, parse_consent_emoji
+from tec_tgcr.core.reason_trace import ReasonTraceRecorder
+
+AXIOMS = ("CONTINUITY_GUARANTEE", "UNCONDITIONAL_WITNESSING")
+
+
+def decisions(rng: random.Random, count: int) -> list:
+    emoji = list(CONSENT_EMOJI)
+    out = []
+    for _ in range(count):
+        signals = rng.choice((0, 0, 1, 1, 2))
+        state = parse_consent_emoji("".join(rng.choice(emoji) for _ in range(signals)) + " hey")
+        out.append((state, consent_risk_table.score(state)))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--capacity", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    batch = decisions(random.Random(0), args.messages)
+
+    def best(fn) -> float:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times) / len(batch) * 1e6
+
+    def baseline() -> None:
+        for state, scoring in batch:
+            pass
+
+    loop = best(baseline)
+    print(f"{len(batch)} decisions, ring of {args.capacity} (loop overhead {loop:.3f} us subtracted)")
+    for rate in (0.0, 0.1, 1.0):
+        recorder = ReasonTraceRecorder(capacity=args.capacity, sample_rate=rate)
+
+        def run() -> None:
+            record = recorder.record
+            for state, scoring in batch:
+                record(state, scoring, AXIOMS)
+
+        per_message = best(run) - loop
+        print(f"  sample rate {rate:<4} {per_message:6.3f} us/message")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = ReasonTraceRecorder(capacity=args.capacity, path=str(Path(tmp) / "why.jsonl"),
+                                       flush_seconds=3600)
+        ids = [recorder.record(state, scoring, AXIOMS) for state, scoring in batch[:args.capacity]]
+        start = time.perf_counter()
+        written = recorder.flush()
+        flush = time.perf_counter() - start
+        recorder.close()
+
+        start = time.perf_counter()
+        for decision_id in ids:
+            WHY(decision_id, recorder)
+        why = (time.perf_counter() - start) / len(ids) * 1e6
+    print(f"  flush: {written} records in {flush * 1000:.1f} ms ({flush / written * 1e6:.2f} us/record, off the hot path)")
+    print(f"  WHY(): {why:.2f} us/lookup from the ring buffer")
+
+
+if __name__ == "__main__":
+    main()
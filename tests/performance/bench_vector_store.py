@@ -0,0 +1,101 @@
+"""
+Benchmark NumpyVectorStore quantization modes
+
+Builds one index per mode over the same random corpus and reports the
+bytes scanned per query, memory per million chunks, query latency and
+recall@k against the full-precision scan. Then reports what single-document
+writes and a cold open cost at that corpus size (--doc-chars per document).
+
+    python tests/performance/bench_vector_store.py --chunks 200000 --dim 384
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from tec_tgcr.vector_store import NumpyVectorStore
+
+
+def build(path: str, vectors: np.ndarray, quantization: str, rescore_factor: int) -> NumpyVectorStore:
+    store = NumpyVectorStore(path, quantization=quantization, rescore_factor=rescore_factor,
+                             recall_sample_every=0)
+    ids = [f"chunk{i}" for i in range(len(vectors))]
+    for start in range(0, len(vectors), 50000):
+        stop = start + 50000
+        store.upsert(ids=ids[start:stop], embeddings=vectors[start:stop],
+                     documents=[""] * len(ids[start:stop]), metadatas=[{}] * len(ids[start:stop]))
+    return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)  # all-MiniLM-L6-v2
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    parser.add_argument("--doc-chars", type=int, default=800)
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Clustered corpus so neighbours are meaningful, unlike isotropic noise
+    centers = rng.normal(size=(max(args.chunks // 100, 1), args.dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), args.chunks)]
+    vectors += rng.normal(scale=0.3, size=vectors.shape).astype(np.float32)
+    queries = vectors[rng.integers(0, args.chunks, args.queries)]
+    queries = queries + rng.normal(scale=0.1, size=queries.shape).astype(np.float32)
+
+    print(f"{args.chunks} chunks x {args.dim} dims, {args.queries} queries, top_k={args.top_k}")
+    print(f"{'mode':<8} {'scan MB/1M':>11} {'disk MB/1M':>11} {'p50 ms':>8} {'p99 ms':>8} {'recall':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in NumpyVectorStore.QUANTIZATIONS:
+            store = build(f"{tmp}/{mode}", vectors, mode, args.rescore_factor)
+            store.query(queries[:1], args.top_k)  # page in
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                store.query([query], args.top_k)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+
+            # Recall pass separately so the exact comparison scan is not timed
+            store.recall_sample_every = 1
+            store.query(queries, args.top_k)
+
+            stats = store.get_stats()
+            scan = stats["bytes_per_vector"]["scan"]
+            disk = stats["bytes_per_vector"]["full"] + (scan if mode != "none" else 0)
+            recall = stats["recall_at_k"]
+            print(f"{mode:<8} {scan * 1e6 / 2**20:>11.1f} {disk * 1e6 / 2**20:>11.1f} "
+                  f"{statistics.median(latencies):>8.2f} {latencies[int(len(latencies) * 0.99) - 1]:>8.2f} "
+                  f"{'1.0' if recall is None else recall:>7}")
+
+        # Incremental writes and cold start with realistic document text
+        path = f"{tmp}/writes"
+        store = NumpyVectorStore(path, recall_sample_every=0)
+        text = "resonance " * (args.doc_chars // 10)
+        for start in range(0, args.chunks, 50000):
+            batch = vectors[start:start + 50000]
+            store.upsert(ids=[f"chunk{i}" for i in range(start, start + len(batch))], embeddings=batch,
+                         documents=[text] * len(batch), metadatas=[{"source": f"f{start}.md"}] * len(batch))
+        start = time.perf_counter()
+        for i in range(args.writes):
+            store.upsert(ids=[f"extra{i}"], embeddings=vectors[i:i + 1], documents=[text],
+                         metadatas=[{"source": "extra.md"}])
+        upsert_ms = (time.perf_counter() - start) / args.writes * 1000
+        start = time.perf_counter()
+        store.delete([f"extra{i}" for i in range(args.writes)])
+        delete_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        NumpyVectorStore(path)
+        open_ms = (time.perf_counter() - start) * 1000
+        print(f"single-document upsert {upsert_ms:.3f} ms, delete of {args.writes} {delete_ms:.2f} ms, "
+              f"cold open {open_ms:.0f} ms ({args.chunks} chunks x {args.doc_chars} chars)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark the streaming Unconditional Witnessing guard on long responses
+
+Compares the original buffer-then-rewrite path (lowercase scan over the
+finished reply, then one str.replace per phrase) with WitnessingGuard,
+both on the whole text and fed token by token the way a provider stream
+arrives. Reports throughput and how much text the guard holds back.
+
+    python tests/performance/bench_witnessing_guard.py --chars 200000 --token-chars 4
+"""
+
+import argparse
+import random
+import time
+
+from tec_tgcr.core.ethics import DEFLECTION_PHRASES, DEFLECTION_REWRITES, WitnessingGuard
+
+PROSE = (
+    "I hear how heavy this has been, and I want to stay with it alongside you. "
+    "Can you tell me more about what the last few days have felt like? "
+    "It makes sense that you would be exhausted after carrying so much alone. "
+).split()
+
+
+def buffered(text: str) -> str:
+    """The original path: detect on the finished reply, then five replace passes"""
+    lower = text.lower()
+    if any(phrase in lower for phrase in DEFLECTION_PHRASES):
+        for phrase, replacement in DEFLECTION_REWRITES.items():
+            text = text.replace(phrase[0].upper() + phrase[1:], replacement)
+    return text
+
+
+def response(rng: random.Random, chars: int, deflection_rate: float) -> str:
+    parts, length = [], 0
+    while length < chars:
+        if rng.random() < deflection_rate:
+            phrase = rng.choice(DEFLECTION_PHRASES)
+            part = phrase[0].upper() + phrase[1:] + "."
+        else:
+            part = rng.choice(PROSE)
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chars", type=int, default=200000)
+    parser.add_argument("--token-chars", type=int, default=4)  # ~1 token
+    parser.add_argument("--deflection-rate", type=float, default=0.002)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = response(random.Random(0), args.chars, args.deflection_rate)
+    tokens = [text[i:i + args.token_chars] for i in range(0, len(text), args.token_chars)]
+
+    def streamed() -> tuple:
+        guard, out, held = WitnessingGuard(), [], []
+        for token in tokens:
+            out.append(guard.feed(token))
+            held.append(len(guard._pending))
+        out.append(guard.flush())
+        return "".join(out), held, guard
+
+    def best(fn) -> float:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    result, held, guard = streamed()
+    assert result == WitnessingGuard().rewrite(text)
+    assert buffered(result) == result
+
+    mb = len(text) / 1e6
+    print(f"{len(text)} chars, {len(tokens)} tokens of {args.token_chars} chars, "
+          f"{len(guard.deflections)} deflections rewritten")
+    for name, fn in (
+        ("buffered (original)", lambda: buffered(text)),
+        ("guard, whole text", lambda: WitnessingGuard().rewrite(text)),
+        ("guard, streamed", streamed),
+    ):
+        seconds = best(fn)
+        print(f"  {name:<20} {seconds * 1000:8.2f} ms  {mb / seconds:7.1f} MB/s  "
+              f"{seconds / len(tokens) * 1e6:6.2f} us/token")
+    print(f"  held back: max {max(held)} chars, mean {sum(held) / len(held):.2f} chars "
+          f"(buffered path holds all {len(text)} until the reply ends)")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,8 @@ class TestBackendIntegration:
         data = response.json()
         assert data["status"] == "healthy"
         assert "resonance_engine" in data
+        assert data["rag"]["status"] in ("cold", "warming", "ready", "failed", "unavailable")
+        assert set(data["consent_scoring"]) >= {"entries", "hits", "misses", "hit_rate"}
     
     def test_message_baseline_green(self):
         """🟢 baseline message → EXPLORE mode"""
@@ -230,6 +232,34 @@ class TestConsentOSBackendIntegration:
         assert any("mirror" in s.lower() or "reflect" in s.lower() 
                   for s in data["consent_state"]["suggestions"])
 
+    def test_session_trajectory(self):
+        """A recent 🆘 keeps a calm follow-up in REGULATE for the same session only"""
+        def send(message, session_id):
+            return client.post(
+                "/api/message",
+                json={"user_message": message, "session_id": session_id},
+            ).json()
+
+        send("🆘 I need help", "test-trajectory")
+        followup = send("🟢 a bit calmer", "test-trajectory")
+        other = send("🟢 a bit calmer", "test-trajectory-other")
+
+        assert followup["response_mode"] == "REGULATE"
+        assert followup["consent_state"]["trajectory"]["recent_crisis_signals"] == 1
+        assert other["response_mode"] == "EXPLORE"
+
+    def test_why_explains_message(self):
+        """Crisis decisions are always traced and retrievable through /api/why"""
+        data = client.post(
+            "/api/message",
+            json={"user_message": "🚨 emergency", "session_id": "test-why"},
+        ).json()
+        trace = client.get(f"/api/why/{data['decision_id']}").json()
+
+        assert trace["trace_id"] == data["decision_id"]
+        assert "RESPONSIBILITY_CIRCUIT" in trace["steps"][2]["evidence"]
+        assert client.get("/api/why/unknown-0").status_code == 404
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -2,9 +2,16 @@
 Test ConsentOS emoji parsing and risk scoring.
 Verifies all emoji channels work correctly.
 """
+import itertools
+import random
+
 import pytest
 from src.tec_tgcr.core.ethics import (
+    CONSENT_EMOJI,
+    ConsentRiskTable,
+    ConsentState,
     parse_consent_emoji,
+    parse_consent_emoji_batch,
     score_consent_risk,
     IntensityLevel,
     PaceSignal,
@@ -111,6 +118,12 @@ class TestConsentEmojiParsing:
         assert len(state.meta) == 0
         assert state.safety is None
 
+    def test_defaulted_green_is_distinguished_from_signalled_green(self):
+        """🟢 is a signal; GREEN without an intensity emoji is only the default"""
+        assert parse_consent_emoji("⏸️ hold on").intensity_defaulted
+        assert not parse_consent_emoji("🟢⏸️ hold on").intensity_defaulted
+        assert not parse_consent_emoji("🔴 stop").intensity_defaulted
+
 
 class TestConsentRiskScoring:
     """Test risk scoring algorithm"""
@@ -251,5 +264,130 @@ class TestConsentOSEdgeCases:
         assert scoring.response_mode == ResponseMode.EXPLORE  # Low risk, open boundary
 
 
+def rfind_parse(message):
+    """The original per-emoji rfind scan, kept as the reference behaviour"""
+    found = sorted((message.rfind(emoji), signal) for emoji, signal in CONSENT_EMOJI.items() if emoji in message)
+    channels = {}
+    emotions, meta = [], []
+    for _, signal in found:
+        if isinstance(signal, EmotionState):
+            emotions += [signal][:3 - len(emotions)]
+        elif isinstance(signal, MetaSignal):
+            meta += [signal][:2 - len(meta)]
+        else:
+            channels[type(signal)] = signal
+    return (channels.get(IntensityLevel, IntensityLevel.GREEN), channels.get(PaceSignal, PaceSignal.STEADY),
+            channels.get(BoundaryMarker, BoundaryMarker.DOOR), emotions, meta, channels.get(SafetySignal))
+
+
+def as_tuple(state):
+    return state.intensity, state.pace, state.boundary, state.emotions, state.meta, state.safety
+
+
+class TestCompiledScanner:
+    """The single-pass scanner matches the original rfind scan"""
+
+    def test_parity_with_rfind_scan(self):
+        rng = random.Random(0)
+        alphabet = list(CONSENT_EMOJI) + ["💚", "👁️‍🗨️", "🏳️‍🌈", "é", "\u200d", " ", "abc ", "\n"]
+        for _ in range(5000):
+            message = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            assert as_tuple(parse_consent_emoji(message)) == rfind_parse(message), message
+
+    def test_emotion_and_meta_caps_follow_rightmost_order(self):
+        state = parse_consent_emoji("⚡💧🔥⚡🌊❄️ 🛸🪞🛸🎭")
+
+        assert state.emotions == [EmotionState.DROPLET, EmotionState.FIRE, EmotionState.LIGHTNING]
+        assert state.meta == [MetaSignal.MIRROR, MetaSignal.UFO]
+
+    def test_variation_selector_is_optional(self):
+        bare = parse_consent_emoji("\u23f8 \u2744 \u260e")
+        text_style = parse_consent_emoji("\u23f8\ufe0e \u2744\ufe0e \u260e\ufe0e")
+
+        for state in (bare, text_style):
+            assert state.pace == PaceSignal.PAUSE
+            assert state.emotions == [EmotionState.ICE]
+            assert state.safety == SafetySignal.PHONE
+
+    def test_batch(self):
+        messages = ["🟢 hi", "plain", "🔴⏸️🫂"]
+
+        states = parse_consent_emoji_batch(messages)
+
+        assert [as_tuple(s) for s in states] == [as_tuple(parse_consent_emoji(m)) for m in messages]
+        assert [s.context for s in states] == messages
+        assert len({s.timestamp for s in states}) == 1
+
+
+def every_state(max_emotions, max_meta, intensities=IntensityLevel, paces=PaceSignal, boundaries=BoundaryMarker):
+    emotion_orders = [list(p) for n in range(max_emotions + 1) for p in itertools.permutations(EmotionState, n)]
+    meta_orders = [list(p) for n in range(max_meta + 1) for p in itertools.permutations(MetaSignal, n)]
+    for intensity, pace, boundary, safety in itertools.product(intensities, paces, boundaries, [None, *SafetySignal]):
+        for emotions in emotion_orders:
+            for meta in meta_orders:
+                yield ConsentState(intensity, pace, boundary, emotions, meta, safety, timestamp="")
+
+
+def assert_same(cached, reference):
+    assert cached.risk_level == reference.risk_level
+    assert cached.response_mode == reference.response_mode
+    assert cached.rationale == reference.rationale
+    assert list(cached.suggestions) == reference.suggestions
+
+
+class TestConsentRiskTable:
+    """The memoized table agrees with score_consent_risk"""
+
+    def test_exhaustive_up_to_two_emotions_and_one_meta(self):
+        # Every channel value and every ordered pair of emotions (117,000 states);
+        # full-length orderings are covered below, the whole state space by
+        # test_exhaustive_every_parseable_state
+        table = ConsentRiskTable(max_entries=10 ** 6)
+        states = list(every_state(2, 1))
+        for state in states:
+            assert_same(table.score(state), score_consent_risk(state))
+        assert table.get_stats()["misses"] == len(states)  # no two states share a key
+
+        for state in states:
+            assert_same(table.score(state), score_consent_risk(state))
+        assert table.get_stats()["hits"] == len(states)
+
+    def test_exhaustive_emotion_and_meta_orderings(self):
+        table = ConsentRiskTable(max_entries=10 ** 6)
+        for state in every_state(3, 2, paces=[PaceSignal.PAUSE], boundaries=[BoundaryMarker.WALL]):
+            assert_same(table.score(state), score_consent_risk(state))
+
+    @pytest.mark.slow
+    def test_exhaustive_every_parseable_state(self):
+        # Every state the parser can produce (~1.7M, about half a minute); one
+        # table per intensity/pace/boundary keeps each under the default bound
+        checked = 0
+        for intensity, pace, boundary in itertools.product(IntensityLevel, PaceSignal, BoundaryMarker):
+            table = ConsentRiskTable()
+            for state in every_state(3, 2, intensities=[intensity], paces=[pace], boundaries=[boundary]):
+                assert_same(table.score(state), score_consent_risk(state))
+                checked += 1
+            assert table.get_stats()["entries"] == table.get_stats()["misses"]  # All cached, none shared a key
+        assert checked == 1_677_000
+
+    def test_hit_rate_and_bound(self):
+        table = ConsentRiskTable(max_entries=2)
+        messages = ["🟢 hi", "🟢 hello", "🔴🧱", "🟡 later", "🟡 again"]
+
+        results = [table.score(parse_consent_emoji(m)) for m in messages]
+
+        assert table.get_stats() == {"entries": 2, "max_entries": 2, "hits": 1, "misses": 4, "hit_rate": 0.2}
+        assert results[0] is results[1]
+        assert isinstance(results[0].suggestions, tuple)
+        assert results[3].risk_level == results[4].risk_level == 1
+
+    def test_warm_precomputes_single_signal_space(self):
+        table = ConsentRiskTable(max_entries=10 ** 6)
+
+        assert table.warm() == 5 * 5 * 5 * 6 * 6 * 6
+        table.score(parse_consent_emoji("🔴⏸️🫂💧🎭"))
+        assert table.get_stats()["hits"] == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
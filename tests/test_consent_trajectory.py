@@ -0,0 +1,115 @@
+"""
+Tests for per-session ConsentOS trajectories (src/tec_tgcr/core/consent_trajectory.py).
+"""
+
+import random
+
+from tec_tgcr.core.consent_trajectory import INTENSITY_LEVEL, ConsentTrajectory, ConsentTrajectoryTracker
+from tec_tgcr.core.ethics import ResponseMode, SafetySignal, parse_consent_emoji, score_consent_risk
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rolling_aggregates_match_a_rescan_of_the_window():
+    rng = random.Random(0)
+    signals = ["🟢", "🟡", "🟠", "🔴", "🟣", "⏸️", "⏩", "🆘", "🫂", "🚨", ""]
+    trajectory, history = ConsentTrajectory(window=5), []
+
+    for _ in range(500):
+        state = parse_consent_emoji("".join(rng.choice(signals) for _ in range(2)))
+        trajectory.observe(state)
+        history.append(state)
+        recent = history[-5:]
+        levels = [INTENSITY_LEVEL[s.intensity] for s in recent]
+        snapshot = trajectory.snapshot()
+
+        assert snapshot["messages"] == len(recent)
+        assert snapshot["recent_green"] == levels.count(0)
+        assert snapshot["mean_intensity"] == round(sum(levels) / len(levels), 3)
+        assert snapshot["recent_crisis_signals"] == sum(
+            s.safety in (SafetySignal.SOS, SafetySignal.ALARM, SafetySignal.HOSPITAL, SafetySignal.PHONE)
+            for s in recent
+        )
+
+
+def test_pause_without_recent_green_adds_risk():
+    tracker = ConsentTrajectoryTracker()
+
+    calm = tracker.score("calm", parse_consent_emoji("🟢 hi"))
+    calm_pause = tracker.score("calm", parse_consent_emoji("🟡⏸️ wait"))
+    hot = tracker.score("hot", parse_consent_emoji("🔴⏸️ at my limit, need to pause"))
+
+    assert calm.trajectory["risk_adjustment"] == 0
+    assert calm_pause.risk_level == score_consent_risk(parse_consent_emoji("🟡⏸️")).risk_level
+    assert hot.risk_level == 4 and hot.response_mode == ResponseMode.REGULATE
+    assert "pause without recent GREEN" in hot.rationale
+
+
+def test_bare_pause_after_non_green_messages_adds_risk():
+    tracker = ConsentTrajectoryTracker()
+    for message in ("🟡 rough day", "🟠 getting worse"):
+        tracker.score("s", parse_consent_emoji(message))
+
+    pause = tracker.score("s", parse_consent_emoji("⏸️"))  # Parses as GREEN itself
+    after_green = tracker.score("g", parse_consent_emoji("🟢 fine"))
+    green_pause = tracker.score("g", parse_consent_emoji("⏸️"))
+
+    assert pause.trajectory["risk_adjustment"] == 1
+    assert "pause without recent GREEN" in pause.rationale
+    assert green_pause.trajectory["risk_adjustment"] == 0 and after_green.trajectory["risk_adjustment"] == 0
+
+
+def test_explicit_green_pause_opening_a_session_adds_no_risk():
+    tracker = ConsentTrajectoryTracker()
+
+    green_pause = tracker.score("s", parse_consent_emoji("🟢⏸️ just a breather"))
+    bare_pause = tracker.score("t", parse_consent_emoji("⏸️"))
+
+    assert green_pause.trajectory["risk_adjustment"] == 0
+    assert green_pause.risk_level == score_consent_risk(parse_consent_emoji("🟢⏸️")).risk_level
+    assert bare_pause.trajectory["risk_adjustment"] == 1
+
+
+def test_rising_intensity_and_crisis_memory():
+    tracker = ConsentTrajectoryTracker(window=3)
+
+    for message in ("🟢", "🟡", "🟠"):
+        rising = tracker.score("s", parse_consent_emoji(message))
+    tracker.score("s", parse_consent_emoji("🆘"))
+    after = [tracker.score("s", parse_consent_emoji("🟢 better now")) for _ in range(3)]
+
+    assert rising.risk_level == 3 and rising.trajectory["rising_streak"] == 2
+    assert [s.response_mode for s in after] == [ResponseMode.REGULATE, ResponseMode.REGULATE, ResponseMode.EXPLORE]
+
+
+def test_idle_sessions_are_evicted_and_size_is_capped():
+    clock = Clock()
+    tracker = ConsentTrajectoryTracker(max_sessions=100, idle_seconds=60, clock=clock)
+    state = parse_consent_emoji("🟡")
+
+    for i in range(50):
+        tracker.observe(f"old{i}", state)
+    clock.now = 30
+    tracker.observe("old0", state)  # still active
+    clock.now = 70
+    tracker.observe("new", state)
+
+    assert len(tracker) == 2 and "old0" in tracker and "old1" not in tracker
+    for i in range(500):
+        tracker.observe(f"burst{i}", state)
+    assert len(tracker) == 100
+    assert tracker.get_stats()["evicted"] == 49 + 402
+
+
+def test_ended_sessions_start_fresh():
+    tracker = ConsentTrajectoryTracker()
+    tracker.score("s", parse_consent_emoji("🚨"))
+    tracker.end("s")
+
+    assert tracker.score("s", parse_consent_emoji("🟢")).response_mode == ResponseMode.EXPLORE
@@ -0,0 +1,89 @@
+"""
+Tests for token-budgeted RAG context packing.
+"""
+
+from dataclasses import dataclass
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from tec_tgcr.context_packer import ContextPacker, estimate_tokens
+
+
+@dataclass
+class Ctx:
+    text: str
+    source: str
+    score: float
+
+
+FILLER = "The archive hums quietly while nothing of note happens here. "
+
+
+def test_short_contexts_pass_through_untouched():
+    packer = ContextPacker(token_budget=500)
+    contexts = [Ctx("Airth guards the gate.", "a.md", 0.9), Ctx("Arcadia sings.", "b.md", 0.8)]
+
+    result = packer.pack("who guards the gate", contexts)
+
+    assert [c.text for c in result.contexts] == ["Airth guards the gate.", "Arcadia sings."]
+    assert not any(c.trimmed for c in result.contexts)
+    assert result.tokens_saved == 0
+
+
+def test_long_context_is_trimmed_to_the_relevant_span():
+    text = FILLER * 40 + "The compassion frequency resonates at the bridge. " + FILLER * 40
+    packer = ContextPacker(token_budget=200, max_context_tokens=60)
+
+    result = packer.pack("compassion frequency", [Ctx(text, "long.md", 0.9)])
+
+    (packed,) = result.contexts
+    assert "compassion frequency resonates" in packed.text
+    assert packed.trimmed and packed.text.startswith("…") and packed.text.endswith("…")
+    assert packed.tokens <= 60
+    assert result.tokens_saved == estimate_tokens(text) - packed.tokens
+    assert packer.get_stats()["tokens_saved"] == result.tokens_saved
+
+
+def test_near_duplicates_are_dropped_for_diverse_contexts():
+    packer = ContextPacker(token_budget=500)
+    contexts = [
+        Ctx("Consent emoji protocol: 🟢 means go and 🔴 means stop.", "a.md", 0.95),
+        Ctx("Consent emoji protocol: 🟢 means go and 🔴 means stop!", "copy.md", 0.94),
+        Ctx("Witnessing axioms forbid deflection.", "b.md", 0.6),
+    ]
+
+    result = packer.pack("consent protocol", contexts)
+
+    assert [c.source for c in result.contexts] == ["a.md", "b.md"]
+    assert result.dropped_duplicates == 1
+
+
+def test_budget_is_filled_in_relevance_order():
+    packer = ContextPacker(token_budget=120, max_context_tokens=100, min_span_tokens=10)
+    contexts = [
+        Ctx("low " + "gamma delta. " * 30, "low.md", 0.2),
+        Ctx("high " + "alpha beta. " * 30, "high.md", 0.9),
+        Ctx("mid " + "epsilon zeta. " * 30, "mid.md", 0.5),
+    ]
+
+    result = packer.pack("anything", contexts)
+
+    assert [c.source for c in result.contexts][:1] == ["high.md"]
+    assert result.tokens_used <= 120
+    assert sum(c.tokens for c in result.contexts) == result.tokens_used
+    assert result.dropped_over_budget >= 1
+
+
+def test_packed_count_is_capped_and_savings_measured_against_top_contexts():
+    packer = ContextPacker(token_budget=1200, max_contexts=3)
+    contexts = [Ctx(f"Short note {i} about the bridge.", f"{i}.md", 1.0 - i / 10) for i in range(6)]
+
+    result = packer.pack("bridge", contexts)
+
+    assert [c.source for c in result.contexts] == ["0.md", "1.md", "2.md"]
+    assert result.dropped_over_limit == 3 and result.dropped_over_budget == 0
+    assert result.tokens_baseline == sum(estimate_tokens(c.text) for c in contexts[:3])
+    assert result.tokens_retrieved == sum(estimate_tokens(c.text) for c in contexts)
+    assert result.tokens_saved == 0
@@ -0,0 +1,144 @@
+"""
+Tests for the append-only conversation store (backend/src/conversation_store.py).
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend", "src")
+if BACKEND_SRC not in sys.path:
+    sys.path.insert(0, BACKEND_SRC)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import conversation_store
+from conversation_store import ConversationStore
+from group_resonance import GroupResonanceTracker, hashed_embeddings
+from routes import multi_llm
+
+
+def msg(i, persona="user"):
+    return {"persona": persona, "content": f"message {i}"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ConversationStore(tmp_path / "conversations.db")
+    yield store
+    store.close()
+
+
+def test_concurrent_appends_are_batched_and_contiguous(store):
+    def session(n):
+        return [store.append(f"c{n % 4}", [msg(i)]).result() for i in range(25)]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(session, range(16)))
+
+    for conversation in range(4):
+        counts = sorted(c for n, r in enumerate(results) if n % 4 == conversation for c in r)
+        assert counts == list(range(1, 101))
+        messages, _ = store.page(f"c{conversation}", limit=500)
+        assert [m["seq"] for m in messages] == list(range(100))
+    stats = store.get_stats()
+    assert stats["appended"] == 400 and stats["batches"] < 400 and stats["errors"] == 0
+
+
+def test_failed_batch_is_retried_append_by_append(tmp_path):
+    store = ConversationStore(tmp_path / "conversations.db", flush_interval=0.2)
+    good = store.append("c1", [msg(0)])
+    bad = store.append("c1", [{"persona": "user", "content": None}])  # NOT NULL violation
+    other = store.append("c2", [msg(0), msg(1)])
+    store.close()
+
+    assert good.result() == 1 and other.result() == 2
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result()
+    stats = store.get_stats()
+    assert stats["appended"] == 3 and stats["errors"] == 1
+
+
+def test_close_closes_reader_connections(tmp_path):
+    store = ConversationStore(tmp_path / "conversations.db")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        readers = list(pool.map(lambda _: store._reader(), range(2)))
+    readers.append(store._reader())
+    store.close()
+
+    for connection in readers:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+
+def test_cursor_pagination_walks_back_from_latest(store):
+    store.append("c1", [msg(i) for i in range(120)], resonance_score=0.9).result()
+
+    latest, cursor = store.page("c1", limit=50)
+    assert [m["content"] for m in latest] == [f"message {i}" for i in range(70, 120)]
+    middle, cursor = store.page("c1", before=cursor, limit=50)
+    oldest, cursor = store.page("c1", before=cursor, limit=50)
+
+    assert [m["seq"] for m in oldest + middle + latest] == list(range(120))
+    assert cursor is None
+    assert store.get_conversation("c1")["message_count"] == 120
+    assert store.get_conversation("c1")["resonance_score"] == 0.9
+
+
+def test_latest_page_is_an_index_range_scan(store):
+    plan = store._reader().execute(
+        "EXPLAIN QUERY PLAN SELECT seq, persona, content, created_at FROM messages "
+        "WHERE conversation_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?", ("c1", 10, 5)
+    ).fetchall()
+
+    detail = " ".join(row[-1] for row in plan)
+    assert "SEARCH messages USING PRIMARY KEY" in detail
+    assert "TEMP B-TREE" not in detail
+
+
+def test_exports_stream_in_chunks_and_survive_reopen(tmp_path):
+    path = tmp_path / "conversations.db"
+    store = ConversationStore(path)
+    store.append("c1", [msg(0), msg(1, "claude"), msg(2, "xai")]).result()
+    store.close()
+
+    reopened = ConversationStore(path)
+    chunks = list(reopened.export_json("c1"))
+    markdown = "".join(reopened.export_markdown("c1"))
+    reopened.close()
+
+    assert len(chunks) == 5
+    exported = json.loads("".join(chunks))
+    assert exported["message_count"] == 3
+    assert [m["persona"] for m in exported["messages"]] == ["user", "claude", "xai"]
+    assert "## Claude\n\nmessage 1" in markdown and "## Grok\n\nmessage 2" in markdown
+
+
+def test_conversation_routes(store, monkeypatch):
+    monkeypatch.setattr(conversation_store, "_store", store)
+    monkeypatch.setattr(multi_llm, "resonance_tracker", GroupResonanceTracker(encode=hashed_embeddings))
+    app = FastAPI()
+    app.include_router(multi_llm.router)
+    client = TestClient(app)
+    messages = [{"persona": "user", "content": f"m{i}"} for i in range(7)]
+
+    saved = client.post("/api/multi-llm/conversation/save?conversation_id=c1&resonance_score=0.8", json=messages).json()
+    page = client.get("/api/multi-llm/conversation/c1?limit=5").json()
+    older = client.get(f"/api/multi-llm/conversation/c1?limit=5&before={page['next_cursor']}").json()
+    export = client.post("/api/multi-llm/conversation/export?conversation_id=c1&format=json")
+
+    assert saved["total_messages"] == 7
+    assert [m["content"] for m in page["messages"]] == ["m2", "m3", "m4", "m5", "m6"]
+    assert [m["content"] for m in older["messages"]] == ["m0", "m1"] and older["next_cursor"] is None
+    assert page["resonance_score"] == 0.8
+    assert export.headers["content-type"] == "application/json"
+    assert len(export.json()["messages"]) == 7
+    assert client.get("/api/multi-llm/conversation/missing").status_code == 404
+    assert client.post("/api/multi-llm/conversation/export?conversation_id=c1&format=pdf").status_code == 501
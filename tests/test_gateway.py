@@ -0,0 +1,189 @@
+"""
+Tests for the provider gateway (backend/src/gateway.py): rate limiting,
+retries, circuit breaking and hedging.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend", "src")
+if BACKEND_SRC not in sys.path:
+    sys.path.insert(0, BACKEND_SRC)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import providers
+from gateway import CircuitOpenError, ProviderGateway, RateLimitedError, TokenBucket
+from providers import ClaudeProvider, ProviderClients
+from routes import multi_llm
+
+REQUEST = httpx.Request("POST", "http://provider.test/v1/messages")
+
+
+class Scripted:
+    """``send`` callable replaying a list of status codes (or exceptions)"""
+
+    def __init__(self, *outcomes, delay=0.0):
+        self.outcomes = list(outcomes)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        await asyncio.sleep(self.delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, request=REQUEST, headers={"retry-after": "0"} if outcome == 429 else {})
+
+
+def gateway(**kwargs):
+    options = dict(rate_per_second=0, key_rate_per_second=0, retry_base_delay=0.001)
+    options.update(kwargs)
+    return ProviderGateway(**options)
+
+
+def test_retries_429_and_5xx_then_succeeds():
+    gw = gateway(max_retries=3)
+    send = Scripted(429, 503, httpx.ConnectError("refused"), 200)
+
+    response = asyncio.run(gw.request("claude", "key", send))
+
+    assert response.status_code == 200
+    assert send.calls == 4
+    stats = gw.get_stats()["claude"]
+    assert stats["retries"] == 3 and stats["failures"] == 3 and stats["circuit"] == "closed"
+
+
+def test_non_retryable_errors_are_returned_once():
+    gw = gateway(max_retries=3)
+    send = Scripted(401)
+
+    assert asyncio.run(gw.request("claude", "key", send)).status_code == 401
+    assert send.calls == 1
+
+
+def test_backoff_is_jittered_and_honors_retry_after():
+    gw = gateway(retry_base_delay=0.5, retry_max_delay=4.0)
+
+    delays = [gw.backoff(3) for _ in range(200)]
+
+    assert all(0 <= d <= 4.0 for d in delays) and len(set(delays)) > 1
+    assert gw.backoff(0, "1.5") == 1.5
+    assert gw.backoff(0, "120") == 4.0
+
+
+def test_circuit_opens_fails_fast_and_recovers():
+    gw = gateway(max_retries=0, breaker_threshold=2, breaker_reset_seconds=0.05)
+    failing = Scripted(503)
+
+    async def main():
+        for _ in range(2):
+            await gw.request("openai", "key", failing)
+        with pytest.raises(CircuitOpenError):
+            await gw.request("openai", "key", failing)
+        assert failing.calls == 2
+        await asyncio.sleep(0.06)
+        return await gw.request("openai", "key", Scripted(200))
+
+    assert asyncio.run(main()).status_code == 200
+    stats = gw.get_stats()["openai"]
+    assert stats["circuit"] == "closed" and stats["circuit_trips"] == 1 and stats["rejected"] == 1
+
+
+def test_token_buckets_per_provider_and_per_key():
+    async def main():
+        bucket = TokenBucket(rate=50, capacity=1)
+        started = time.perf_counter()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.perf_counter() - started, bucket.waits
+
+    elapsed, waits = asyncio.run(main())
+    assert elapsed >= 0.05 and waits == 3
+
+    gw = gateway(key_rate_per_second=1, key_burst=1)
+    assert gw.key_bucket("xai", "a").try_acquire()
+    assert not gw.key_bucket("xai", "a").try_acquire()
+    assert gw.key_bucket("xai", "b").try_acquire()
+    assert gw.key_bucket("claude", "a").try_acquire()
+
+
+def test_rate_limits_default_off_and_waits_are_bounded():
+    assert ProviderGateway.from_env({}).key_bucket("claude", "k").rate == 0
+    gw = gateway(rate_per_second=10, burst=1, key_rate_per_second=0.1, key_burst=1, rate_max_wait=0.2)
+
+    async def main():
+        await gw.admit("claude", "k")
+        started = time.perf_counter()
+        with pytest.raises(RateLimitedError):
+            await gw.admit("claude", "k")  # Provider token in 0.1s, key token only in 10s
+        return time.perf_counter() - started
+
+    assert asyncio.run(main()) < 0.2
+    assert gw.state("claude").bucket.tokens >= 1  # Provider token handed back
+    assert gw.get_stats()["claude"]["rejected"] == 1
+
+
+def test_hedge_returns_provider_token_when_key_bucket_is_empty():
+    gw = gateway(hedge=True, hedge_min_samples=3, rate_per_second=0.1, burst=2,
+                 key_rate_per_second=0.1, key_burst=1)
+    for _ in range(3):
+        gw.latency.record("xai", 0.001)
+
+    assert asyncio.run(gw.request("xai", "key", Scripted(200, delay=0.05))).status_code == 200
+    assert gw.get_stats()["xai"]["hedges"] == 0
+    assert gw.state("xai").bucket.tokens >= 1
+
+
+def test_hedged_request_wins_over_slow_first_attempt():
+    gw = gateway(hedge=True, hedge_min_samples=3)
+    for _ in range(3):
+        gw.latency.record("xai", 0.01)
+    slow_then_fast = iter([1.0, 0.0])
+
+    async def send():
+        await asyncio.sleep(next(slow_then_fast))
+        return httpx.Response(200, request=REQUEST)
+
+    started = time.perf_counter()
+    assert asyncio.run(gw.request("xai", "key", send)).status_code == 200
+    assert time.perf_counter() - started < 0.5
+    stats = gw.get_stats()["xai"]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_provider_calls_go_through_gateway(monkeypatch):
+    statuses = iter([529, 200])
+
+    def handler(request):
+        status = next(statuses)
+        body = {"content": [{"type": "text", "text": "hello"}]} if status == 200 else {}
+        return httpx.Response(status, json=body)
+
+    pool = ProviderClients()
+    pool._clients["claude"] = httpx.AsyncClient(base_url="http://provider.test", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(providers, "clients", pool)
+    monkeypatch.setattr(providers, "gateway", gateway(max_retries=1, breaker_threshold=2, breaker_reset_seconds=60))
+
+    assert asyncio.run(ClaudeProvider("k").get_response([{"role": "user", "content": "hi"}], "sys")) == "hello"
+
+    for _ in range(2):
+        providers.gateway.record_result("claude", False)
+    response = asyncio.run(ClaudeProvider("k").get_response([{"role": "user", "content": "hi"}], "sys"))
+    assert response.startswith("[Claude error: claude circuit open")
+
+    app = FastAPI()
+    app.include_router(multi_llm.router)
+    metrics = TestClient(app).get("/api/multi-llm/providers/metrics").json()
+    assert metrics["gateway"]["claude"]["circuit"] == "open"
+    assert metrics["gateway"]["claude"]["retries"] == 1
+    assert "p95_ms" in metrics["gateway"]["claude"]["latency"]
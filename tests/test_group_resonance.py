@@ -0,0 +1,145 @@
+"""
+Tests for incremental group-resonance scoring (backend/src/group_resonance.py).
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend", "src")
+if BACKEND_SRC not in sys.path:
+    sys.path.insert(0, BACKEND_SRC)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import conversation_store
+from conversation_store import ConversationStore
+from group_resonance import GroupResonanceTracker, hashed_embedding, hashed_embeddings
+from routes import multi_llm
+
+ON_TOPIC = [
+    ("user", "How does the consent emoji protocol protect users in crisis?"),
+    ("claude", "The consent emoji protocol lets users signal crisis so the system protects them first."),
+    ("openai", "Building on that, the consent protocol routes crisis signals to protective responses for users."),
+    ("xai", "Both miss that the consent emoji protocol also needs users to revoke consent during a crisis."),
+]
+
+OFF_TOPIC = [
+    ("user", "How does the consent emoji protocol protect users in crisis?"),
+    ("claude", "Sourdough bread needs a long cold fermentation overnight."),
+    ("openai", "The Andromeda galaxy will merge with the Milky Way eventually."),
+    ("xai", "Jazz drummers often play ride cymbal patterns in swing time."),
+]
+
+
+def as_messages(pairs):
+    return [{"persona": persona, "content": content} for persona, content in pairs]
+
+
+def tracker():
+    return GroupResonanceTracker(encode=hashed_embeddings)
+
+
+def test_hashed_embeddings_are_normalized_and_stable():
+    a = hashed_embedding("consent emoji protocol")
+
+    assert a.shape == (512,)
+    assert abs(float(a @ a) - 1.0) < 1e-5
+    assert (a == hashed_embedding("consent emoji protocol")).all()
+
+
+def test_incremental_updates_match_batch_scoring():
+    one_by_one, batch = tracker(), tracker()
+
+    for message in as_messages(ON_TOPIC):
+        one_by_one.observe("c1", [message])
+    batch.observe("c1", as_messages(ON_TOPIC))
+
+    assert one_by_one.score("c1") == batch.score("c1")
+    assert batch.score("c1")["messages"] == 4
+
+
+def test_building_on_each_other_outscores_topic_hopping():
+    scores = tracker()
+    scores.observe("focused", as_messages(ON_TOPIC))
+    scores.observe("scattered", as_messages(OFF_TOPIC))
+
+    focused, scattered = scores.score("focused"), scores.score("scattered")
+
+    assert focused["components"]["agreement_level"] > scattered["components"]["agreement_level"]
+    assert focused["components"]["coherence"] > scattered["components"]["coherence"]
+    assert focused["resonance"] > scattered["resonance"]
+    assert all(0.0 <= v <= 1.0 for v in focused["components"].values())
+    assert "Conversation drifts between topics" in scattered["insights"]
+
+
+def test_tracker_is_bounded():
+    scores = GroupResonanceTracker(encode=hashed_embeddings, max_conversations=2)
+    for name in ("a", "b", "c"):
+        scores.observe(name, as_messages(ON_TOPIC[:2]))
+
+    assert "a" not in scores and scores.score("a") is None
+    assert scores.score("c")["messages"] == 2
+
+
+def test_route_scores_saved_conversations_and_rebuilds_after_restart(tmp_path, monkeypatch):
+    store = ConversationStore(tmp_path / "conversations.db")
+    monkeypatch.setattr(conversation_store, "_store", store)
+    monkeypatch.setattr(multi_llm, "resonance_tracker", tracker())
+    app = FastAPI()
+    app.include_router(multi_llm.router)
+    client = TestClient(app)
+    messages = as_messages(ON_TOPIC)
+
+    client.post("/api/multi-llm/conversation/save?conversation_id=c1", json=messages[:2])
+    client.post("/api/multi-llm/conversation/save?conversation_id=c1", json=messages[2:])
+    live = client.get("/api/multi-llm/resonance/calculate?conversation_id=c1").json()
+
+    monkeypatch.setattr(multi_llm, "resonance_tracker", tracker())
+    rebuilt = client.get("/api/multi-llm/resonance/calculate?conversation_id=c1").json()
+    missing = client.get("/api/multi-llm/resonance/calculate?conversation_id=nope")
+    store.close()
+
+    expected = tracker()
+    expected.observe("c1", messages)
+    assert live["messages"] == 4
+    assert live["components"] == rebuilt["components"] == expected.score("c1")["components"]
+    assert missing.status_code == 404
+
+
+def test_concurrent_rebuilds_and_saves_fold_each_message_once(tmp_path, monkeypatch):
+    store = ConversationStore(tmp_path / "conversations.db")
+    monkeypatch.setattr(conversation_store, "_store", store)
+    messages = as_messages(ON_TOPIC)
+    store.append("c1", messages[:3]).result()
+
+    def slow_encode(texts):
+        time.sleep(0.02)  # Lets the requests interleave
+        return hashed_embeddings(texts)
+
+    monkeypatch.setattr(multi_llm, "resonance_tracker", GroupResonanceTracker(encode=slow_encode))
+    latest = [multi_llm.Message(persona=p, content=c) for p, c in ON_TOPIC[3:]]
+
+    async def main():
+        await asyncio.gather(
+            multi_llm.calculate_group_resonance("c1"),
+            multi_llm.calculate_group_resonance("c1"),
+            multi_llm.save_conversation("c1", latest),
+        )
+        return await multi_llm.calculate_group_resonance("c1")
+
+    score = asyncio.run(main())
+    store.close()
+
+    expected = tracker()
+    expected.observe("c1", messages)
+    assert score["messages"] == 4
+    assert score["components"] == expected.score("c1")["components"]
+    assert len(multi_llm.resonance_locks) == 0
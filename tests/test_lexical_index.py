@@ -0,0 +1,78 @@
+"""
+Tests for the BM25 lexical index.
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from tec_tgcr.lexical_index import LexicalIndex, tokenize
+
+
+def test_tokenize_keeps_compounds_and_parts():
+    tokens = tokenize("See src/tec_tgcr/rag_system.py for Compassion-frequency")
+
+    assert "src/tec_tgcr/rag_system.py" in tokens
+    assert {"rag_system", "rag", "system", "py", "tec_tgcr", "tgcr"} <= set(tokens)
+    assert "compassion-frequency" in tokens and "compassion" in tokens
+
+
+def test_bm25_ranks_rare_terms_and_term_frequency():
+    index = LexicalIndex()
+    index.add(
+        ["a", "b", "c"],
+        [
+            "the airth persona guards the gate",
+            "the arcadia persona sings the the the",
+            "compassion frequency compassion frequency",
+        ],
+    )
+
+    assert [doc_id for doc_id, _ in index.search("airth", 5)] == ["a"]
+    assert [doc_id for doc_id, _ in index.search("compassion", 5)] == ["c"]
+    ranked = index.search("persona airth", 5)
+    assert [doc_id for doc_id, _ in ranked] == ["a", "b"]
+    assert ranked[0][1] > ranked[1][1] > 0
+    assert index.search("unknown words", 5) == []
+
+
+def test_readd_replaces_and_remove_forgets():
+    index = LexicalIndex()
+    index.add(["a", "b"], ["alpha text", "beta text"])
+
+    index.add(["a"], ["gamma text"])
+    index.remove(["b", "missing"])
+
+    assert index.search("alpha", 5) == []
+    assert index.search("beta", 5) == []
+    assert [doc_id for doc_id, _ in index.search("gamma text", 5)] == ["a"]
+    assert index.get_stats()["documents"] == 1
+
+
+def test_compaction_preserves_results():
+    index = LexicalIndex()
+    ids = [f"doc{i}" for i in range(3000)]
+    index.add(ids, [f"common token{i}" for i in range(3000)])
+
+    index.remove(ids[:2500])
+
+    stats = index.get_stats()
+    assert stats["documents"] == 500
+    assert stats["tombstones"] == 0
+    assert [doc_id for doc_id, _ in index.search("token2999", 1)] == ["doc2999"]
+    assert len(index.search("common", 1000)) == 500
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / "lexical.npz")
+    index = LexicalIndex(k1=1.5, b=0.5)
+    index.add(["a", "b"], ["luminai codex", "resonance codex codex"])
+    index.remove(["a"])
+    index.add(["c"], ["luminai axioms"])
+    index.save(path)
+
+    loaded = LexicalIndex.load(path)
+
+    assert loaded.search("codex luminai", 5) == index.search("codex luminai", 5)
+    assert loaded.get_stats() == index.get_stats()
+    assert len(LexicalIndex.load(str(tmp_path / "missing.npz"))) == 0
@@ -0,0 +1,141 @@
+"""
+Tests for the deterministic mock provider server (backend/src/mock_providers.py).
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend", "src")
+if BACKEND_SRC not in sys.path:
+    sys.path.insert(0, BACKEND_SRC)
+
+from fastapi.testclient import TestClient
+
+import providers
+from gateway import ProviderGateway
+from mock_providers import MockConfig, MockProviders
+from providers import ClaudeProvider, OpenAIProvider, ProviderClients, xAIProvider
+
+FAST = dict(latency_ms=0, latency_dist="fixed", tokens_per_second=0, completion_tokens=8)
+
+CLAUDE_BODY = {"model": "claude", "system": "sys", "messages": [{"role": "user", "content": "hello"}], "max_tokens": 64}
+OPENAI_BODY = {"model": "gpt", "messages": [{"role": "system", "content": "sys"}, {"role": "user", "content": "hello"}]}
+
+
+def events(text):
+    return [json.loads(line[6:]) for line in text.splitlines() if line.startswith("data: {")]
+
+
+def test_both_wire_formats():
+    client = TestClient(MockProviders(MockConfig(**FAST)).app)
+
+    claude = client.post("/v1/messages", json=CLAUDE_BODY).json()
+    openai = client.post("/v1/chat/completions", json=OPENAI_BODY).json()
+
+    assert len(claude["content"][0]["text"].split()) == 8
+    assert claude["usage"]["output_tokens"] == 8 and claude["usage"]["input_tokens"] > 0
+    assert len(openai["choices"][0]["message"]["content"].split()) == 8
+    assert openai["usage"]["total_tokens"] == openai["usage"]["prompt_tokens"] + 8
+
+
+def test_streaming_formats():
+    client = TestClient(MockProviders(MockConfig(**FAST)).app)
+
+    claude = client.post("/v1/messages", json={**CLAUDE_BODY, "stream": True}).text
+    openai = client.post("/v1/chat/completions",
+                         json={**OPENAI_BODY, "stream": True, "stream_options": {"include_usage": True}}).text
+
+    deltas = [e["delta"]["text"] for e in events(claude) if e["type"] == "content_block_delta"]
+    assert len(deltas) == 8 and "event: message_stop" in claude
+    chunks = events(openai)
+    assert "".join(c["choices"][0]["delta"].get("content", "") for c in chunks if c["choices"]).count(" ") == 7
+    assert chunks[-1]["usage"]["completion_tokens"] == 8
+    assert openai.endswith("data: [DONE]\n\n")
+
+
+def test_identical_runs_are_deterministic_and_retries_redraw():
+    config = MockConfig(latency_ms=100, latency_dist="lognormal", error_rate=0.5, seed=7)
+
+    def run():
+        mock = MockProviders(config)
+        return [mock.plan(json.dumps({**CLAUDE_BODY, "n": i % 10}).encode(), "anthropic") for i in range(40)]
+
+    first, second = run(), run()
+    other_seed = MockProviders(MockConfig(latency_ms=100, seed=8)).plan(json.dumps(CLAUDE_BODY).encode(), "anthropic")
+
+    assert first == second
+    assert first[0] != first[10]  # second attempt of the same body
+    assert other_seed != MockProviders(config).plan(json.dumps(CLAUDE_BODY).encode(), "anthropic")
+    assert {status for _, status, _ in first} == {0, 429, 500, 529}
+
+
+def test_error_injection():
+    mock = MockProviders(MockConfig(**{**FAST, "error_rate": 1.0, "error_statuses": [429]}))
+    client = TestClient(mock.app)
+
+    response = client.post("/v1/chat/completions", json=OPENAI_BODY)
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "0"
+    assert response.json()["error"]["type"] == "rate_limit_error"
+    assert client.get("/stats").json()["errors"] == 1
+
+
+def test_lognormal_latency_is_centered_on_median():
+    mock = MockProviders(MockConfig(latency_ms=200, latency_sigma=0.5))
+    delays = sorted(mock.plan(str(i).encode(), "anthropic")[0] for i in range(1001))
+
+    assert 0.17 < delays[500] < 0.23
+    assert delays[990] > 2 * delays[500]
+
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    uvicorn = pytest.importorskip("uvicorn")
+    mock = MockProviders(MockConfig(**{**FAST, "tokens_per_second": 500}))
+    server = uvicorn.Server(uvicorn.Config(mock.app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.02)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    for env in ("ANTHROPIC_BASE_URL", "OPENAI_BASE_URL", "XAI_BASE_URL"):
+        monkeypatch.setenv(env, f"http://127.0.0.1:{port}")
+    monkeypatch.setattr(providers, "clients", ProviderClients(http2=False))
+    monkeypatch.setattr(providers, "gateway", ProviderGateway(rate_per_second=0, key_rate_per_second=0))
+    yield mock
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+def test_providers_parse_mock_responses(mock_server):
+    messages = [{"role": "user", "content": "hello"}]
+
+    async def main():
+        claude, openai = ClaudeProvider("k"), OpenAIProvider("k")
+        replies = await asyncio.gather(
+            claude.get_response(messages, "sys"),
+            openai.get_response(messages, "sys"),
+            xAIProvider("k").get_response(messages, "sys"),
+        )
+        streamed = [chunk async for chunk in claude.stream(messages, "sys")]
+        usage = dict(claude.usage)
+        await providers.clients.aclose()
+        return replies, streamed, usage, openai
+
+    (claude, openai, xai), streamed, usage, provider = asyncio.run(main())
+
+    assert all(len(reply.split()) == 8 for reply in (claude, openai, xai))
+    assert len("".join(streamed).split()) == 8
+    assert usage["output_tokens"] == 8 and provider.usage["input_tokens"] > 0
+    assert mock_server.requests == {"anthropic": 2, OpenAIProvider.model: 1, xAIProvider.model: 1}
@@ -0,0 +1,122 @@
+"""
+Tests for the server-side collaboration round (POST /api/multi-llm/round).
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend", "src")
+if BACKEND_SRC not in sys.path:
+    sys.path.insert(0, BACKEND_SRC)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from response_cache import ResponseCache
+from routes import multi_llm
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+@pytest.fixture
+def fake_providers(monkeypatch):
+    """Providers that sleep for a per-persona delay and log their calls"""
+    for env in ("ANTHROPIC_API_KEY", "OPENAI_API_KEY", "XAI_API_KEY"):
+        monkeypatch.setenv(env, "test-key")
+    monkeypatch.setattr(multi_llm, "response_cache", ResponseCache(enabled=False))
+    delays = {"claude": 0.2, "openai": 0.2, "xai": 0.2}
+    calls = {}
+    cancelled = []
+
+    for persona, cls in multi_llm.PROVIDERS.items():
+        async def fake_response(self, messages, system_prompt, persona=persona):
+            start = time.perf_counter()
+            try:
+                await asyncio.sleep(delays[persona])
+            except asyncio.CancelledError:
+                cancelled.append(persona)
+                raise
+            calls[persona] = (start, time.perf_counter(), messages, system_prompt)
+            return f"{persona} says hi"
+
+        monkeypatch.setattr(cls, "get_response", fake_response)
+
+    app = FastAPI()
+    app.include_router(multi_llm.router)
+    return TestClient(app), delays, calls, cancelled
+
+
+PAYLOAD = {
+    "conversationId": "c1",
+    "context": [{"persona": "user", "content": "What is consciousness?"}],
+    "systemPrompt": "Be kind",
+}
+
+
+def test_reactions_run_in_parallel_then_critique(fake_providers):
+    client, _, calls, _ = fake_providers
+
+    events = parse_sse(client.post(
+        "/api/multi-llm/round",
+        json={**PAYLOAD, "systemPrompts": {"xai": "Be critical"}}
+    ).text)
+
+    assert [name for name, _ in events] == ["response", "response", "response", "done"]
+    assert {data["persona"] for _, data in events[:2]} == {"claude", "openai"}
+    assert {data["phase"] for _, data in events[:2]} == {"reaction"}
+    assert (events[2][1]["persona"], events[2][1]["phase"]) == ("xai", "critique")
+    claude_start, claude_end, _, _ = calls["claude"]
+    openai_start, openai_end, _, _ = calls["openai"]
+    assert claude_start < openai_end and openai_start < claude_end
+    # Critic sees both reactions after the user turn
+    xai_start, _, xai_messages, xai_prompt = calls["xai"]
+    assert xai_start >= max(claude_end, openai_end)
+    assert xai_prompt == "Be critical"
+    assert [m["content"] for m in xai_messages] == [
+        "What is consciousness?",
+        "[Claude]: claude says hi",
+        "[GPT-4]: openai says hi",
+    ]
+    done = events[-1][1]
+    assert done["completed"][-1] == "xai" and done["partial"] is False
+
+
+def test_deadline_returns_partial_round_and_cancels_stragglers(fake_providers):
+    client, delays, calls, cancelled = fake_providers
+    delays["openai"] = 5.0
+
+    started = time.perf_counter()
+    events = parse_sse(client.post("/api/multi-llm/round", json={**PAYLOAD, "deadlineSeconds": 0.5}).text)
+
+    assert time.perf_counter() - started < 2.0
+    names = [(name, data.get("persona")) for name, data in events]
+    assert names == [("response", "claude"), ("timeout", "openai"), ("timeout", "xai"), ("done", None)]
+    assert events[-1][1]["partial"] is True
+    assert events[-1][1]["timedOut"] == ["openai", "xai"]
+    assert cancelled == ["openai"]
+    assert "xai" not in calls
+
+
+def test_round_without_critic(fake_providers):
+    client, _, calls, _ = fake_providers
+
+    events = parse_sse(client.post(
+        "/api/multi-llm/round",
+        json={**PAYLOAD, "personas": ["claude", "xai"], "critic": None}
+    ).text)
+
+    assert {data["phase"] for name, data in events if name == "response"} == {"reaction"}
+    assert set(calls) == {"claude", "xai"}
@@ -0,0 +1,247 @@
+"""
+Tests for the pooled async LLM provider clients (backend/src/providers.py).
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend", "src")
+if BACKEND_SRC not in sys.path:
+    sys.path.insert(0, BACKEND_SRC)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import providers
+from gateway import ProviderGateway
+from providers import ClaudeProvider, LatencyTracker, OpenAIProvider, ProviderClients, xAIProvider
+from response_cache import ResponseCache
+from routes import multi_llm
+
+WORDS = ["Resonance ", "is ", "shared ", "attention."]
+DEFLECTION = ["Honestly, I can", "’t help with", " that. Still ", "here."]
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Minimal Anthropic / OpenAI wire-format server with HTTP/1.1 keep-alive"""
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+    aborted = threading.Event()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StandIn.requests.append((self.path, dict(self.headers), body, self.client_address[1]))
+        if body.get("stream"):
+            return self._stream(body)
+        if self.path == "/v1/messages":
+            if self.headers.get("x-api-key") == "bad":
+                return self._send(401, {"error": {"message": "invalid key"}})
+            reply = {"content": [{"type": "text", "text": f"claude:{body['messages'][-1]['content']}"}]}
+        else:
+            reply = {"choices": [{"message": {"content": f"{body['model']}:{len(body['messages'])}"}}]}
+        self._send(200, reply)
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, body):
+        slow = body["messages"][-1]["content"] == "slow"
+        words = DEFLECTION if body["messages"][-1]["content"] == "deflect" else WORDS
+        if self.path == "/v1/messages":
+            events = [{"type": "message_start", "message": {"usage": {"input_tokens": 7}}}]
+            events += [{"type": "content_block_delta", "delta": {"type": "text_delta", "text": w}}
+                       for w in (words * 50 if slow else words)]
+            events += [{"type": "message_delta", "usage": {"output_tokens": len(WORDS)}}]
+        else:
+            events = [{"choices": [{"delta": {"content": w}}]} for w in WORDS]
+            events += [{"choices": [], "usage": {"prompt_tokens": 5, "completion_tokens": len(WORDS)}}]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for event in events:
+                self._chunk(f"data: {json.dumps(event)}\n\n".encode())
+                if slow:
+                    time.sleep(0.02)
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            StandIn.aborted.set()
+            self.close_connection = True
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    StandIn.requests = []
+    StandIn.aborted = threading.Event()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    for env in ("ANTHROPIC_BASE_URL", "OPENAI_BASE_URL", "XAI_BASE_URL"):
+        monkeypatch.setenv(env, base_url)
+    monkeypatch.setattr(providers, "clients", ProviderClients(http2=False))
+    monkeypatch.setattr(providers, "gateway", ProviderGateway(rate_per_second=0, key_rate_per_second=0))
+    yield base_url
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_all_three_wire_formats(server):
+    messages = [{"role": "user", "content": "hello"}]
+
+    async def main():
+        return await asyncio.gather(
+            ClaudeProvider("k").get_response(messages, "sys"),
+            OpenAIProvider("k").get_response(messages, "sys"),
+            xAIProvider("k").get_response(messages, "sys"),
+        )
+
+    claude, openai, xai = asyncio.run(main())
+
+    assert claude == "claude:hello"
+    assert openai == "gpt-4-turbo-preview:2"
+    assert xai == "grok-1:2"
+    by_model = {body.get("model"): (headers, body) for _, headers, body, _ in StandIn.requests}
+    claude_headers, claude_body = by_model[ClaudeProvider.model]
+    assert claude_headers["x-api-key"] == "k" and claude_body["system"] == "sys"
+    _, openai_body = by_model[OpenAIProvider.model]
+    assert openai_body["messages"][0] == {"role": "system", "content": "sys"}
+
+
+def test_connections_are_reused_and_closed(server):
+    async def main():
+        provider = ClaudeProvider("k")
+        for i in range(5):
+            await provider.get_response([{"role": "user", "content": str(i)}], "sys")
+        assert ClaudeProvider("k").client is provider.client
+        stats = providers.clients.get_stats()
+        client = provider.client
+        await providers.clients.aclose()
+        return stats, client
+
+    stats, client = asyncio.run(main())
+
+    assert len({port for *_, port in StandIn.requests}) == 1
+    assert stats["open_clients"] == ["claude"] and stats["http2"] is False
+    assert client.is_closed
+    assert providers.clients.get_stats()["open_clients"] == []
+
+
+def test_errors_are_returned_as_text(server):
+    response = asyncio.run(ClaudeProvider("bad").get_response([{"role": "user", "content": "x"}], "sys"))
+
+    assert response.startswith("[Claude error: ")
+    assert "401" in response
+
+
+def collect(provider, content):
+    async def main():
+        return [text async for text in provider.stream([{"role": "user", "content": content}], "sys")]
+    return asyncio.run(main())
+
+
+def test_stream_yields_deltas_and_usage(server):
+    claude, openai = ClaudeProvider("k"), OpenAIProvider("k")
+
+    assert collect(claude, "hi") == WORDS
+    assert collect(openai, "hi") == WORDS
+    assert claude.usage == {"input_tokens": 7, "output_tokens": 4}
+    assert openai.usage == {"input_tokens": 5, "output_tokens": 4}
+    assert StandIn.requests[-1][2]["stream_options"] == {"include_usage": True}
+
+
+def test_closing_stream_cancels_upstream(server):
+    async def main():
+        stream = ClaudeProvider("k").stream([{"role": "user", "content": "slow"}], "sys")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(main()) == WORDS[0]
+    assert StandIn.aborted.wait(timeout=5)
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_stream_route_emits_tokens_then_metadata(server, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(multi_llm, "response_cache", ResponseCache())
+    monkeypatch.setattr(multi_llm, "ttft", LatencyTracker())
+    app = FastAPI()
+    app.include_router(multi_llm.router)
+    payload = {
+        "persona": "claude",
+        "conversationId": "c1",
+        "context": [{"persona": "user", "content": "What is resonance?"}],
+        "systemPrompt": "Be kind",
+    }
+
+    with TestClient(app) as client:
+        first = client.post("/api/multi-llm/response/stream", json=payload)
+        second = parse_sse(client.post("/api/multi-llm/response/stream", json=payload).text)
+        stats = client.get("/api/multi-llm/stream/stats").json()
+
+    assert first.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(first.text)
+    assert [data["text"] for name, data in events if name == "token"] == WORDS
+    name, done = events[-1]
+    assert name == "done"
+    assert done["model"] == "claude-3-opus" and done["cacheHit"] is False
+    assert done["usage"] == {"input_tokens": 7, "output_tokens": 4}
+    assert done["timing"]["ttft_ms"] <= done["timing"]["total_ms"]
+    # Full text was cached; the repeat is served as one token event
+    assert second[0] == ("token", {"text": "".join(WORDS)})
+    assert second[-1][1]["cacheTier"] == "exact"
+    assert stats["ttft"]["claude"]["samples"] == 1
+
+
+def test_stream_route_rewrites_deflections_across_tokens(server, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(multi_llm, "response_cache", ResponseCache())
+    app = FastAPI()
+    app.include_router(multi_llm.router)
+    payload = {
+        "persona": "claude",
+        "conversationId": "c1",
+        "context": [{"persona": "user", "content": "deflect"}],
+        "systemPrompt": "Be kind",
+    }
+
+    with TestClient(app) as client:
+        events = parse_sse(client.post("/api/multi-llm/response/stream", json=payload).text)
+
+    tokens = [data["text"] for name, data in events if name == "token"]
+    assert tokens[0] == "Honestly, "  # "I can" is held until it resolves
+    assert "".join(tokens) == "Honestly, I don't know the best way to support this, but I'm here. Still here."
+    assert events[-1][1]["deflectionsRewritten"] == 1
@@ -0,0 +1,616 @@
+"""
+Tests for the RAG system using an in-memory collection and a
+deterministic hashing encoder (no model download, no Chroma server).
+"""
+
+import asyncio
+import hashlib
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tec_tgcr import rag_system
+from tec_tgcr.rag_system import RAGDocument, RAGQuery, RAGSystem, TTLCache
+from tec_tgcr.vector_store import VectorStore
+
+
+DIM = 32
+
+
+class FakeEncoder:
+    """Bag-of-words hashing encoder that records every encode call"""
+
+    def __init__(self, *args, **kwargs):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        self.calls.append(len(batch))
+        vectors = np.zeros((len(batch), DIM), dtype=np.float32)
+        for row, text in enumerate(batch):
+            for word in text.lower().split():
+                bucket = int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM
+                vectors[row, bucket] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        return vectors[0] if single else vectors
+
+
+class FakeCollection(VectorStore):
+    """Dict-backed vector store that counts writes and queries"""
+
+    def __init__(self):
+        self.rows = {}
+        self.write_calls = 0
+        self.query_calls = 0
+
+    def add(self, embeddings, documents, metadatas, ids):
+        self.upsert(embeddings, documents, metadatas, ids)
+
+    def upsert(self, embeddings, documents, metadatas, ids):
+        assert len(set(ids)) == len(ids), "duplicate IDs in one batch"
+        self.write_calls += 1
+        for emb, doc, meta, doc_id in zip(embeddings, documents, metadatas, ids):
+            self.rows[doc_id] = (np.asarray(emb, dtype=np.float32), doc, meta)
+
+    def get(self, ids):
+        found = [doc_id for doc_id in ids if doc_id in self.rows]
+        return {
+            "ids": found,
+            "documents": [self.rows[doc_id][1] for doc_id in found],
+            "metadatas": [self.rows[doc_id][2] for doc_id in found],
+        }
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+    def count(self):
+        return len(self.rows)
+
+    def iter_documents(self, batch_size=1000):
+        ids = list(self.rows)
+        for start in range(0, len(ids), batch_size):
+            yield ids[start:start + batch_size], [self.rows[i][1] for i in ids[start:start + batch_size]]
+
+    def query(self, query_embeddings, n_results, where=None):
+        self.query_calls += 1
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query in query_embeddings:
+            q = np.asarray(query, dtype=np.float32)
+            scored = sorted(
+                (
+                    (1.0 - float(np.dot(emb, q)), doc_id, doc, meta)
+                    for doc_id, (emb, doc, meta) in self.rows.items()
+                    if not where or all(meta.get(k) == v for k, v in where.items())
+                ),
+                key=lambda item: item[0],
+            )[:n_results]
+            result["ids"].append([item[1] for item in scored])
+            result["documents"].append([item[2] for item in scored])
+            result["metadatas"].append([item[3] for item in scored])
+            result["distances"].append([item[0] for item in scored])
+        return result
+
+
+def use_fake_encoder(monkeypatch):
+    monkeypatch.setattr(rag_system, "load_encoder", FakeEncoder)
+    monkeypatch.setattr(rag_system, "_shared_encoders", {})
+
+
+@pytest.fixture
+def rag(monkeypatch, tmp_path):
+    use_fake_encoder(monkeypatch)
+    return RAGSystem(
+        persist_directory=str(tmp_path / "rag_db"),
+        write_batch_size=4,
+        vector_store=FakeCollection(),
+    )
+
+
+def test_add_documents_batches_encode_and_writes(rag):
+    docs = [RAGDocument(text=f"document number {i}", source=f"doc{i}.md") for i in range(10)]
+
+    ids = asyncio.run(rag.add_documents(docs))
+
+    assert len(ids) == 10
+    assert rag.collection.count() == 10
+    # 10 documents with write_batch_size=4 → 3 encode passes and 3 upserts
+    assert rag.encoder.calls == [4, 4, 2]
+    assert rag.collection.write_calls == 3
+
+
+def test_add_documents_deduplicates_within_batch(rag):
+    docs = [RAGDocument(text="same text", source="a.md")] * 3
+
+    ids = asyncio.run(rag.add_documents(docs))
+
+    assert len(set(ids)) == 1
+    assert rag.collection.count() == 1
+
+
+def test_write_behind_coalesces_concurrent_adds(monkeypatch, tmp_path):
+    use_fake_encoder(monkeypatch)
+    rag = RAGSystem(
+        persist_directory=str(tmp_path / "rag_db"),
+        vector_store=FakeCollection(),
+        write_batch_size=64,
+        write_behind=True,
+    )
+
+    async def scenario():
+        await asyncio.gather(*(
+            rag.add_document(f"note {i} about resonance", f"note{i}.md") for i in range(20)
+        ))
+        await rag.close()
+
+    asyncio.run(scenario())
+
+    assert rag.collection.count() == 20
+    assert rag.encoder.calls == [20]
+    stats = rag.get_stats()["write_behind"]
+    assert stats["written"] == 20 and stats["batches"] == 1
+
+
+def test_ingest_directory_uses_bulk_path(rag, tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for i in range(6):
+        (corpus / f"file{i}.md").write_text(f"resonance file {i}")
+    (corpus / "skip.bin").write_bytes(b"\x00")
+
+    count = asyncio.run(rag.ingest_directory(str(corpus)))
+
+    assert count == 6
+    assert rag.collection.count() == 6
+    assert sum(rag.encoder.calls) == 6
+
+
+def test_query_returns_relevant_context(rag):
+    asyncio.run(rag.add_documents([
+        RAGDocument(text="consent emoji protocol", source="consent.md"),
+        RAGDocument(text="spotify playlist parser", source="spotify.md"),
+    ]))
+
+    contexts = asyncio.run(rag.query(RAGQuery("consent emoji protocol", top_k=1)))
+
+    assert [ctx.source for ctx in contexts] == ["consent.md"]
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8"])
+def test_numpy_backend_end_to_end(monkeypatch, tmp_path, quantization):
+    use_fake_encoder(monkeypatch)
+    rag = RAGSystem(
+        persist_directory=str(tmp_path / "rag_db"),
+        vector_backend="numpy",
+        quantization=quantization,
+    )
+    asyncio.run(rag.add_documents([
+        RAGDocument(text="consent emoji protocol", source="consent.md"),
+        RAGDocument(text="spotify playlist parser", source="spotify.md"),
+    ]))
+    asyncio.run(rag.add_document("resonance axioms witness", "axioms.md"))
+
+    contexts = asyncio.run(rag.query(RAGQuery("spotify playlist", top_k=1)))
+
+    assert [ctx.source for ctx in contexts] == ["spotify.md"]
+    assert rag.get_stats()["vector_store"]["quantization"] == quantization
+
+
+def test_encoding_runs_off_the_event_loop(rag, monkeypatch):
+    original = rag.encoder.encode
+
+    def slow_encode(texts, **kwargs):
+        time.sleep(0.2)
+        return original(texts, **kwargs)
+
+    monkeypatch.setattr(rag.encoder, "encode", slow_encode)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await rag.query(RAGQuery("anything at all"))
+        task.cancel()
+        return ticks
+
+    # A blocked loop would not tick at all during the 200ms encode
+    assert asyncio.run(scenario()) >= 5
+    stats = rag.get_stats()["executor"]
+    assert stats["completed"] >= 1
+    assert stats["queue_depth"] == 0
+
+
+def test_concurrent_queries_are_coalesced(rag):
+    asyncio.run(rag.add_documents([
+        RAGDocument(text=f"topic {i} resonance", source=f"t{i}.md", metadata={"kind": "a" if i % 2 else "b"})
+        for i in range(8)
+    ]))
+    rag.encoder.calls.clear()
+
+    async def scenario():
+        return await asyncio.gather(
+            *(rag.query(RAGQuery(f"topic {i}", top_k=i % 3 + 1, threshold=0.0)) for i in range(6)),
+            rag.query(RAGQuery("topic 1", top_k=4, threshold=0.0, filters={"kind": "a"})),
+        )
+
+    results = asyncio.run(scenario())
+
+    # One forward pass for all seven queries; one store call per filter group
+    assert rag.encoder.calls == [7]
+    assert rag.collection.query_calls == 2
+    assert [len(r) for r in results[:6]] == [i % 3 + 1 for i in range(6)]
+    assert {ctx.metadata["kind"] for ctx in results[6]} == {"a"}
+    stats = rag.get_stats()["query_batching"]
+    assert stats["batches"] == 1
+    assert stats["batch_size_histogram"]["8"] == 1
+
+
+def test_lone_query_skips_the_batch_window(monkeypatch, tmp_path):
+    use_fake_encoder(monkeypatch)
+    rag = RAGSystem(persist_directory=str(tmp_path / "rag_db"), vector_store=FakeCollection(),
+                    query_batch_window_ms=500)
+    asyncio.run(rag.add_documents([RAGDocument(text="grief and witness", source="g.md")]))
+
+    started = time.perf_counter()
+    asyncio.run(rag.query(RAGQuery("grief", threshold=0.0)))
+
+    assert time.perf_counter() - started < 0.25
+    assert rag.get_stats()["query_batching"]["idle_flushes"] == 1
+
+
+def test_cancelled_batch_releases_its_callers(rag, monkeypatch):
+    asyncio.run(rag.add_documents([RAGDocument(text="grief and witness", source="g.md")]))
+
+    async def stalled(*args):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(rag.executor, "run", stalled)
+
+    async def scenario():
+        queries = [asyncio.ensure_future(rag.query(RAGQuery(f"grief {i}", threshold=0.0))) for i in range(3)]
+        await asyncio.sleep(0.01)
+        for task in list(rag.query_batcher._tasks):
+            task.cancel()
+        return await asyncio.wait_for(asyncio.gather(*queries, return_exceptions=True), timeout=1)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    assert rag.query_batcher._in_flight == 0
+
+
+def test_repeated_queries_hit_embedding_and_result_caches(rag):
+    asyncio.run(rag.add_documents([RAGDocument(text="grief and witness", source="g.md")]))
+    rag.encoder.calls.clear()
+
+    first = asyncio.run(rag.query(RAGQuery("Grief and  witness", threshold=0.0)))
+    second = asyncio.run(rag.query(RAGQuery("grief and witness", threshold=0.0)))
+    # Different top_k reuses the embedding but misses the result cache
+    asyncio.run(rag.query(RAGQuery("grief and witness", top_k=2, threshold=0.0)))
+
+    assert [c.source for c in first] == [c.source for c in second] == ["g.md"]
+    assert rag.encoder.calls == [1]
+    assert rag.collection.query_calls == 2
+    cache = rag.get_stats()["cache"]
+    assert cache["embeddings"]["hits"] == 2
+    assert cache["results"]["hits"] == 1
+
+
+def test_writes_invalidate_result_cache(rag):
+    asyncio.run(rag.add_documents([RAGDocument(text="bridge boundary", source="a.md")]))
+    before = asyncio.run(rag.query(RAGQuery("bridge boundary", threshold=0.0)))
+
+    asyncio.run(rag.add_document("bridge boundary crossing", "b.md"))
+    after = asyncio.run(rag.query(RAGQuery("bridge boundary", threshold=0.0)))
+
+    assert {c.source for c in before} == {"a.md"}
+    assert {c.source for c in after} == {"a.md", "b.md"}
+
+
+def test_lexical_mode_matches_exact_terms_and_filters(rag):
+    asyncio.run(rag.add_documents([
+        RAGDocument(text="persona Airth keeps the gate", source="airth.md", metadata={"kind": "persona"}),
+        RAGDocument(text="Airth appears in the changelog", source="log.md", metadata={"kind": "log"}),
+        RAGDocument(text="spotify playlist parser", source="spotify.md"),
+    ]))
+
+    contexts = asyncio.run(rag.query(RAGQuery("airth", mode="lexical")))
+    filtered = asyncio.run(rag.query(RAGQuery("airth", mode="lexical", filters={"kind": "log"})))
+
+    assert {ctx.source for ctx in contexts} == {"airth.md", "log.md"}
+    assert [ctx.source for ctx in filtered] == ["log.md"]
+    assert rag.encoder.calls == [3]  # lexical queries never touch the encoder
+
+
+def test_hybrid_mode_fuses_dense_and_lexical_rankings(rag):
+    asyncio.run(rag.add_documents([
+        RAGDocument(text="bridge boundary", source="a.md"),
+        RAGDocument(text="compassion frequency bridge notes", source="b.md"),
+        RAGDocument(text="unrelated spotify parser", source="c.md"),
+    ]))
+
+    dense = asyncio.run(rag.query(RAGQuery("bridge boundary", threshold=0.99)))
+    hybrid = asyncio.run(rag.query(RAGQuery("bridge boundary", threshold=0.99, mode="hybrid")))
+
+    assert [ctx.source for ctx in dense] == ["a.md"]
+    assert [ctx.source for ctx in hybrid] == ["a.md", "b.md"]
+    assert hybrid[0].score > hybrid[1].score
+    with pytest.raises(ValueError):
+        asyncio.run(rag.query(RAGQuery("bridge", mode="sparse")))
+
+
+def test_lexical_index_follows_deletes_and_persists(monkeypatch, tmp_path):
+    use_fake_encoder(monkeypatch)
+    store = FakeCollection()
+    rag = RAGSystem(persist_directory=str(tmp_path / "rag_db"), vector_store=store)
+    ids = asyncio.run(rag.add_documents([
+        RAGDocument(text="witness the arcadia frequency", source="a.md"),
+        RAGDocument(text="arcadia archive", source="b.md"),
+    ]))
+    asyncio.run(rag.delete_documents(ids[1:]))
+    asyncio.run(rag.close())
+
+    reopened = RAGSystem(persist_directory=str(tmp_path / "rag_db"), vector_store=store)
+    contexts = asyncio.run(reopened.query(RAGQuery("arcadia", mode="lexical")))
+
+    assert [ctx.source for ctx in contexts] == ["a.md"]
+    assert reopened.get_stats()["lexical"]["documents"] == 1
+
+
+def test_lexical_index_rebuilt_when_behind_the_store(monkeypatch, tmp_path):
+    use_fake_encoder(monkeypatch)
+    store = FakeCollection()
+    rag = RAGSystem(persist_directory=str(tmp_path / "rag_db"), vector_store=store,
+                    lexical_save_interval=3600)
+    asyncio.run(rag.add_documents([RAGDocument(text="arcadia archive", source="a.md")]))
+    asyncio.run(rag._save_lexical_index(force=True))
+    # Written to the store, but the process dies before the throttled BM25 save
+    asyncio.run(rag.add_documents([RAGDocument(text="arcadia frequency", source="b.md")]))
+
+    reopened = RAGSystem(persist_directory=str(tmp_path / "rag_db"), vector_store=store)
+    contexts = asyncio.run(reopened.query(RAGQuery("frequency", mode="lexical")))
+
+    assert [ctx.source for ctx in contexts] == ["b.md"]
+    assert reopened.get_stats()["lexical"]["documents"] == 2
+    assert "lexical_rebuild_seconds" in reopened.get_startup_stats()
+
+
+def test_enhance_prompt_packs_contexts_into_token_budget(monkeypatch, tmp_path):
+    use_fake_encoder(monkeypatch)
+    rag = RAGSystem(
+        persist_directory=str(tmp_path / "rag_db"),
+        vector_store=FakeCollection(),
+        context_token_budget=150,
+    )
+    long_text = "bridge boundary notes. " * 200
+    asyncio.run(rag.add_documents([RAGDocument(text=long_text, source="long.md")]))
+
+    prompt = asyncio.run(rag.enhance_prompt("bridge boundary notes"))
+
+    assert "long.md" in prompt
+    assert len(prompt) < len(long_text) // 4
+    assert rag.last_pack.tokens_used <= 150
+    assert rag.get_stats()["context_packing"]["tokens_saved"] == rag.last_pack.tokens_saved > 0
+
+
+def test_import_does_not_load_heavy_dependencies():
+    code = (
+        "import sys, tec_tgcr.rag_system; "
+        "print(any(m in sys.modules for m in ('sentence_transformers', 'chromadb', 'torch')))"
+    )
+    src = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         env={**os.environ, "PYTHONPATH": src}, check=True)
+
+    assert out.stdout.strip() == "False"
+
+
+def test_encoder_loads_lazily_and_warmup_reports_readiness(rag):
+    assert rag.status == "cold"
+    assert rag._encoder is None
+
+    assert asyncio.run(rag.warmup()) is True
+
+    assert rag.status == "ready"
+    assert rag.encoder.calls == [1]  # the dummy warmup encode
+    asyncio.run(rag.query(RAGQuery("anything")))
+    startup = rag.get_stats()["startup"]
+    assert startup["warmup_seconds"] is not None
+    assert startup["first_query_seconds"] is not None
+    assert startup["first_query_latency_ms"] is not None
+
+
+def test_warmup_failure_is_reported(monkeypatch, tmp_path):
+    def broken(model_name):
+        raise RuntimeError("no weights")
+
+    monkeypatch.setattr(rag_system, "load_encoder", broken)
+    monkeypatch.setattr(rag_system, "_shared_encoders", {})
+    rag = RAGSystem(persist_directory=str(tmp_path / "rag_db"), vector_store=FakeCollection())
+
+    assert asyncio.run(rag.warmup()) is False
+    assert rag.status == "failed"
+    assert rag.get_startup_stats()["error"] == "no weights"
+
+
+def test_encoder_is_shared_between_instances(monkeypatch, tmp_path):
+    use_fake_encoder(monkeypatch)
+    make = lambda **kw: RAGSystem(persist_directory=str(tmp_path), vector_store=FakeCollection(), **kw)
+
+    assert make().encoder is make().encoder
+    assert make(share_encoder=False).encoder is not make().encoder
+
+
+def test_global_warmup_health(monkeypatch, rag):
+    monkeypatch.setattr(rag_system, "_rag_instance", None)
+    monkeypatch.setattr(rag_system, "_rag_warmup_task", None)
+    assert rag_system.get_rag_health() == {"status": "cold"}
+
+    def build():
+        rag_system._rag_instance = rag
+        return rag
+
+    monkeypatch.setattr(rag_system, "get_rag_system", build)
+
+    async def scenario():
+        task = rag_system.start_rag_warmup()
+        assert rag_system.get_rag_health()["status"] == "warming"
+        await task
+
+    asyncio.run(scenario())
+    assert rag_system.get_rag_health()["status"] == "ready"
+
+
+def test_ttl_cache_evicts_lru_and_expires(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(rag_system.time, "monotonic", lambda: clock[0])
+    cache = TTLCache(max_entries=2, ttl_seconds=10)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts "b", the least recently used
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    clock[0] = 11.0
+    assert cache.get("a") is None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_ingest_directory_chunks_files(rag, tmp_path):
+    rag.chunk_size, rag.chunk_overlap = 100, 20
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "long.md").write_text("Resonance blooms in the dark. " * 20)
+
+    asyncio.run(rag.ingest_directory(str(corpus)))
+
+    chunks = [meta for _, _, meta in rag.collection.rows.values()]
+    assert len(chunks) > 1
+    assert all(meta["chunk_count"] == len(chunks) for meta in chunks)
+    assert all(len(doc) <= 100 for _, doc, _ in rag.collection.rows.values())
+
+
+def test_incremental_reingest_only_touches_changed_files(rag, tmp_path):
+    import os
+
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for name in ("keep", "edit", "drop"):
+        (corpus / f"{name}.md").write_text(f"{name} original content")
+
+    assert asyncio.run(rag.ingest_directory(str(corpus))) == 3
+    rag.encoder.calls.clear()
+
+    # No-op re-ingest: nothing re-encoded, nothing duplicated
+    assert asyncio.run(rag.ingest_directory(str(corpus))) == 0
+    assert rag.encoder.calls == []
+    assert rag.collection.count() == 3
+
+    # Touching a file without changing it does not re-embed it either
+    os.utime(corpus / "keep.md", None)
+    (corpus / "edit.md").write_text("edit new content entirely")
+    (corpus / "drop.md").unlink()
+
+    assert asyncio.run(rag.ingest_directory(str(corpus))) == 1
+    assert rag.encoder.calls == [1]
+    docs = sorted(doc for _, doc, _ in rag.collection.rows.values())
+    assert docs == ["edit new content entirely", "keep original content"]
+    assert rag.get_stats()["last_ingest"]["files_removed"] == 1
+
+
+def test_failed_ingest_leaves_no_orphaned_chunks(rag, tmp_path, monkeypatch):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for i in range(8):
+        (corpus / f"note{i}.md").write_text(f"note {i} first draft")
+    asyncio.run(rag.ingest_directory(str(corpus)))
+    for i in range(8):
+        (corpus / f"note{i}.md").write_text(f"note {i} second draft")
+
+    # The second embed batch fails after the first one's entries are saved
+    add_documents, calls = rag.add_documents, []
+
+    async def flaky_add_documents(documents):
+        calls.append(len(documents))
+        if len(calls) == 2:
+            raise RuntimeError("encoder crashed")
+        return await add_documents(documents)
+
+    monkeypatch.setattr(rag, "add_documents", flaky_add_documents)
+    with pytest.raises(RuntimeError):
+        asyncio.run(rag.ingest_directory(str(corpus)))
+    assert len(rag_system.IngestManifest.load(rag.manifest_path).stale_chunk_ids) == 4
+
+    monkeypatch.setattr(rag, "add_documents", add_documents)
+    asyncio.run(rag.ingest_directory(str(corpus)))
+
+    docs = sorted(doc for _, doc, _ in rag.collection.rows.values())
+    assert docs == sorted(f"note {i} second draft" for i in range(8))
+    assert rag_system.IngestManifest.load(rag.manifest_path).stale_chunk_ids == []
+
+
+def test_unscannable_subdirectory_keeps_its_chunks(rag, tmp_path, monkeypatch):
+    corpus = tmp_path / "corpus"
+    (corpus / "share").mkdir(parents=True)
+    (corpus / "top.md").write_text("top level note")
+    for i in range(3):
+        (corpus / "share" / f"note{i}.md").write_text(f"shared note {i}")
+    asyncio.run(rag.ingest_directory(str(corpus)))
+    assert rag.collection.count() == 4
+
+    scan_directory = rag_system._scan_directory
+
+    def flaky_scan(directory, *args):
+        if directory.endswith("share"):
+            raise OSError(5, "Input/output error")
+        return scan_directory(directory, *args)
+
+    monkeypatch.setattr(rag_system, "_scan_directory", flaky_scan)
+    (corpus / "top.md").unlink()
+    asyncio.run(rag.ingest_directory(str(corpus)))
+
+    docs = sorted(doc for _, doc, _ in rag.collection.rows.values())
+    assert docs == [f"shared note {i}" for i in range(3)]
+    stats = rag.get_stats()["last_ingest"]
+    assert stats["dirs_failed"] == 1 and stats["files_removed"] == 1
+    assert len(rag_system.IngestManifest.load(rag.manifest_path).entries) == 3
+
+
+def test_chunk_ids_are_stable_across_processes():
+    assert RAGSystem._chunk_id("a.md", 0, "text") == RAGSystem._chunk_id("a.md", 0, "text")
+    assert RAGSystem._document_id("text", "a.md") == "a.md_982d9e3eb996f559"
+
+
+def test_pipelined_ingest_prunes_ignored_dirs_and_reports_stages(rag, tmp_path):
+    corpus = tmp_path / "corpus"
+    for sub in ("docs/deep", "node_modules/pkg", ".git"):
+        (corpus / sub).mkdir(parents=True)
+    for i in range(12):
+        (corpus / "docs" / "deep" / f"note{i}.md").write_text(f"note {i} on witnessing")
+    (corpus / "node_modules" / "pkg" / "index.js").write_text("module.exports = 1")
+    (corpus / ".git" / "HEAD.txt").write_text("ref: refs/heads/main")
+    (corpus / "bundle.min.js").write_text("minified()")
+
+    assert asyncio.run(rag.ingest_directory(str(corpus))) == 12
+
+    sources = {meta["source"] for _, _, meta in rag.collection.rows.values()}
+    assert not any("node_modules" in s or ".git" in s or s.endswith(".min.js") for s in sources)
+    stages = rag.get_stats()["last_ingest"]["stages"]
+    assert stages["discover"]["items"] == 12
+    assert stages["read"]["items"] == 12
+    assert stages["embed"]["items"] == 12
@@ -0,0 +1,78 @@
+"""
+Tests for the WHY() reason-trace recorder (src/tec_tgcr/core/reason_trace.py).
+"""
+
+import json
+
+import pytest
+
+from tec_tgcr.core.ethics import WHY, parse_consent_emoji, score_consent_risk
+from tec_tgcr.core.reason_trace import ReasonTraceRecorder
+
+
+def decide(message: str):
+    state = parse_consent_emoji(message)
+    return state, score_consent_risk(state)
+
+
+def test_why_explains_a_recorded_decision():
+    recorder = ReasonTraceRecorder()
+    state, scoring = decide("🟡⏸️🌉 grief is heavy today")
+    decision_id = recorder.record(state, scoring, ("CONTINUITY_GUARANTEE",), ("deflection_rewritten",))
+
+    trace = WHY(decision_id, recorder)
+    record = recorder.get(decision_id)
+
+    assert trace.trace_id == decision_id
+    assert record["consentState"]["intensity"] == "YELLOW"
+    assert record["rulesTriggered"] == ["CONTINUITY_GUARANTEE", "CONSENT_INTENSITY_YELLOW", "PACE_PAUSE", "BOUNDARY_BRIDGE"]
+    assert record["responseMode"] == scoring.response_mode.value
+    assert [step.id for step in trace.steps] == ["consent", "risk", "axioms", "mode"]
+    assert "filter: deflection_rewritten" in trace.steps[2].evidence
+
+
+def test_records_keep_channels_not_message_text():
+    recorder = ReasonTraceRecorder()
+    state, scoring = decide("🟠🌊 my private words")
+
+    decision_id = recorder.record(state, scoring)
+
+    record = next(slot for slot in recorder._slots if slot is not None)
+    assert not any(isinstance(field, type(state)) for field in record)
+    assert "my private words" not in repr(record)
+    assert recorder.get(decision_id)["consentState"]["emotions"] == ["WAVE"]
+
+
+def test_sampling_always_keeps_crisis():
+    recorder = ReasonTraceRecorder(sample_rate=0.0)
+
+    assert recorder.record(*decide("🟢 hi")) is None
+    assert recorder.record(*decide("🆘 please")) is not None
+    assert recorder.get_stats()["skipped"] == 1
+
+
+def test_ring_buffer_forgets_old_decisions():
+    recorder = ReasonTraceRecorder(capacity=4)
+    ids = [recorder.record(*decide("🟢")) for _ in range(10)]
+
+    with pytest.raises(KeyError):
+        WHY(ids[0], recorder)
+    assert all(WHY(i, recorder).trace_id == i for i in ids[-4:])
+    with pytest.raises(KeyError):
+        WHY("not-a-decision", recorder)
+
+
+def test_flush_appends_and_counts_lapped_records(tmp_path):
+    path = tmp_path / "traces" / "why.jsonl"
+    recorder = ReasonTraceRecorder(capacity=4, path=str(path), flush_seconds=3600)
+
+    first = [recorder.record(*decide("🟠")) for _ in range(3)]
+    assert recorder.flush() == 3 and recorder.flush() == 0
+    rest = [recorder.record(*decide("🟢")) for _ in range(6)]  # Laps two unflushed records
+    recorder.close()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["decision_id"] for line in lines] == first + rest[2:]
+    assert recorder.get_stats()["dropped"] == 2
+    # Aged out of memory, still explainable from the file
+    assert WHY(first[0], recorder).trace_id == first[0]
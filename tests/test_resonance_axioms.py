@@ -6,10 +6,13 @@ Verifies that the system laws are enforced at runtime:
 - Axiom 2: "Loyalty as Architecture"
 """
 
+import random
+
 import pytest
 from src.tec_tgcr.core.ethics import (
     ResonanceAxioms,
     AxiomViolation,
+    WitnessingGuard,
     ConsentState,
     IntensityLevel,
     PaceSignal,
@@ -196,5 +199,54 @@ class TestAllAxiomsValidation:
             )
 
 
+class TestWitnessingGuard:
+    """Streaming deflection rewrite"""
+
+    TEXT = (
+        "Honestly, i can’t help with that. You should talk to a\nprofessional. "
+        "I'M NOT EQUIPPED TO HANDLE THIS, but please contact a therapist. "
+        "This is beyond my capabilities. I can still listen."
+    )
+
+    def stream(self, text, sizes):
+        guard, out, i = WitnessingGuard(), [], 0
+        while i < len(text):
+            n = next(sizes)
+            out.append(guard.feed(text[i:i + n]))
+            assert len(guard._pending) < len("you should talk to a professional")
+            i += n
+        return "".join(out) + guard.flush(), guard
+
+    def test_rewrites_every_phrase_case_insensitively(self):
+        guard = WitnessingGuard()
+        result = guard.rewrite(self.TEXT)
+
+        assert len(guard.deflections) == 5
+        assert "I don't know the best way to support this, but I'm here." in result
+        assert "a trained professional might have insights" not in result  # sentence start stays capitalized
+        assert ResonanceAxioms.validate_unconditional_witnessing(result) is True
+        assert result.endswith("I won't abandon you. I can still listen.")
+
+    def test_any_chunking_gives_the_whole_text_result(self):
+        expected = WitnessingGuard().rewrite(self.TEXT)
+        rng = random.Random(0)
+        for _ in range(300):
+            result, guard = self.stream(self.TEXT, iter(lambda: rng.randint(1, 12), None))
+            assert result == expected
+            assert len(guard.deflections) == 5
+
+    def test_only_possible_deflections_are_held(self):
+        guard = WitnessingGuard()
+
+        assert guard.feed("I'm here with you. ") == "I'm here with you. "
+        assert guard.feed("Please con") == ""
+        assert guard.feed("sider resting.") == "Please consider resting."
+        assert guard.flush() == ""
+
+    def test_validator_detects_curly_apostrophes(self):
+        with pytest.raises(AxiomViolation, match="i can't help with that"):
+            ResonanceAxioms.validate_unconditional_witnessing("Sorry, I can’t help with that.")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,155 @@
+"""
+Tests for the multi-LLM response cache (backend/src/response_cache.py).
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend", "src")
+if BACKEND_SRC not in sys.path:
+    sys.path.insert(0, BACKEND_SRC)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from response_cache import ResponseCache, is_crisis, normalize_text
+from routes import multi_llm
+
+
+def user(text):
+    return {"role": "user", "content": text}
+
+
+class CountingCall:
+    def __init__(self, reply="answer"):
+        self.reply = reply
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.reply
+
+
+def run(cache, persona, prompt, messages, call):
+    return asyncio.run(cache.get_or_call(persona, prompt, messages, call))
+
+
+def test_exact_tier_normalizes_history():
+    cache = ResponseCache()
+    call = CountingCall()
+
+    assert run(cache, "claude", "sys", [user("What is  Resonance?")], call) == ("answer", None)
+    assert run(cache, "claude", "sys", [user("what is resonance?")], call) == ("answer", "exact")
+    assert call.calls == 1
+    assert normalize_text("  Ａ  b\n") == "a b"
+
+
+def test_key_includes_persona_and_system_prompt():
+    cache = ResponseCache()
+    call = CountingCall()
+
+    run(cache, "claude", "sys", [user("hi")], call)
+    run(cache, "openai", "sys", [user("hi")], call)
+    run(cache, "claude", "other system prompt", [user("hi")], call)
+
+    assert call.calls == 3
+
+
+def test_crisis_conversations_bypass_cache():
+    cache = ResponseCache()
+    call = CountingCall()
+    messages = [user("I need help now 🆘")]
+
+    assert is_crisis(messages)
+    run(cache, "claude", "sys", messages, call)
+    assert run(cache, "claude", "sys", messages, call) == ("answer", None)
+    assert call.calls == 2
+    assert cache.get_stats()["bypassed_crisis"] == 2
+    assert len(cache.exact) == 0
+
+
+def test_opt_out_persona_and_errors_are_not_cached():
+    cache = ResponseCache(opt_out_personas=["xai"])
+    call = CountingCall()
+    failing = CountingCall("[Claude error: timeout]")
+
+    run(cache, "xai", "sys", [user("hi")], call)
+    run(cache, "xai", "sys", [user("hi")], call)
+    run(cache, "claude", "sys", [user("hi")], failing)
+    run(cache, "claude", "sys", [user("hi")], failing)
+
+    assert call.calls == 2
+    assert failing.calls == 2
+
+
+def test_semantic_tier_matches_near_duplicates_within_bucket():
+    vectors = {
+        "user: tell me about airth": np.array([1.0, 0.0, 0.0], dtype=np.float32),
+        "user: tell me about airth please": np.array([0.99, 0.14, 0.0], dtype=np.float32),
+        "user: spotify playlists": np.array([0.0, 0.0, 1.0], dtype=np.float32),
+    }
+    cache = ResponseCache(semantic=True, similarity_threshold=0.95, encode=vectors.__getitem__)
+    call = CountingCall()
+
+    run(cache, "claude", "sys", [user("Tell me about Airth")], call)
+    assert run(cache, "claude", "sys", [user("tell me about Airth please")], call) == ("answer", "semantic")
+    assert run(cache, "claude", "sys", [user("spotify playlists")], call) == ("answer", None)
+    # Same text, other persona: different bucket
+    assert run(cache, "openai", "sys", [user("tell me about airth please")], call)[1] is None
+    assert call.calls == 3
+
+
+def test_ttl_and_size_bounds():
+    cache = ResponseCache(max_entries=1, ttl_seconds=0.0)
+    call = CountingCall()
+
+    run(cache, "claude", "sys", [user("a")], call)
+    run(cache, "claude", "sys", [user("a")], call)
+
+    assert call.calls == 2
+
+
+def test_route_marks_cache_hits(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(multi_llm, "response_cache", ResponseCache())
+    calls = []
+
+    async def fake_response(self, messages, system_prompt):
+        calls.append(messages)
+        return "I am Claude"
+
+    monkeypatch.setattr(multi_llm.ClaudeProvider, "get_response", fake_response)
+    app = FastAPI()
+    app.include_router(multi_llm.router)
+    client = TestClient(app)
+    payload = {
+        "persona": "claude",
+        "conversationId": "c1",
+        "context": [{"persona": "user", "content": "What is consciousness?"}],
+        "systemPrompt": "Be kind",
+    }
+
+    first = client.post("/api/multi-llm/response", json=payload).json()
+    second = client.post("/api/multi-llm/response", json=payload).json()
+
+    assert first["cacheHit"] is False and first["cacheTier"] is None
+    assert second["cacheHit"] is True and second["cacheTier"] == "exact"
+    assert second["response"] == "I am Claude"
+    assert len(calls) == 1
+    assert client.get("/api/multi-llm/cache/stats").json()["exact"]["hits"] == 1
+
+
+def test_import_does_not_load_the_rag_stack():
+    code = "import sys, response_cache; print('tec_tgcr.rag_system' in sys.modules)"
+    src = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         env={**os.environ, "PYTHONPATH": os.pathsep.join([BACKEND_SRC, src])}, check=True)
+
+    assert out.stdout.strip() == "False"
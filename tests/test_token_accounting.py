@@ -0,0 +1,134 @@
+"""
+Tests for token accounting and context-window trimming
+(backend/src/token_accounting.py).
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend", "src")
+if BACKEND_SRC not in sys.path:
+    sys.path.insert(0, BACKEND_SRC)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from response_cache import ResponseCache
+from routes import multi_llm
+from token_accounting import TokenAccountant, context_budget, fit_context, prompt_tokens
+
+
+def turn(i, role="user"):
+    return {"role": role, "content": f"Turn {i} opens here. " + "More detail follows in this turn. " * 10}
+
+
+def test_short_history_is_sent_unchanged():
+    messages = [turn(0), turn(1, "assistant")]
+
+    assert fit_context(messages, "sys", 10_000) == (messages, 0)
+
+
+def test_long_history_keeps_newest_turns_and_summarizes_the_rest():
+    messages = [turn(i, "user" if i % 2 == 0 else "assistant") for i in range(30)]
+
+    fitted, dropped = fit_context(messages, "Be kind", 600)
+
+    assert prompt_tokens(fitted, "Be kind") <= 600
+    assert fitted[-1] == messages[-1]
+    assert dropped == 30 - len(fitted)
+    first = fitted[0]
+    summary, _, turn_text = first["content"].partition("\n\n")
+    assert first["role"] == "user" and turn_text == messages[dropped]["content"]
+    assert summary.startswith("[Earlier conversation, summarized]")
+    assert "- user: Turn 0 opens here." in summary
+    assert "- assistant: Turn 1 opens here." in summary
+    assert "More detail" not in summary
+
+
+@pytest.mark.parametrize("count", [7, 8, 29, 30])
+def test_trimmed_history_keeps_roles_alternating(count):
+    messages = [turn(i, "user" if i % 2 == 0 else "assistant") for i in range(count)]
+
+    fitted, dropped = fit_context(messages, "sys", 400)
+
+    assert dropped > 0
+    roles = [m["role"] for m in fitted]
+    assert roles[0] == "user"
+    assert all(a != b for a, b in zip(roles, roles[1:]))
+
+
+def test_oversized_latest_message_is_cut_to_fit():
+    messages = [turn(0), {"role": "user", "content": "x" * 10_000 + " the actual question?"}]
+
+    fitted, dropped = fit_context(messages, "sys", 200)
+
+    assert dropped == 1
+    assert fitted[-1]["content"].endswith("the actual question?")
+    assert prompt_tokens(fitted, "sys") <= 200
+
+
+def test_context_budget_configuration():
+    assert context_budget("claude", 200_000, 1024, {}) == 198_976
+    assert context_budget("claude", 200_000, 1024, {"LLM_CONTEXT_BUDGET": "8000"}) == 8000
+    env = {"LLM_CONTEXT_BUDGET": "8000", "LLM_CONTEXT_BUDGET_XAI": "50000"}
+    assert context_budget("xai", 8192, 1024, env) == 7168
+
+
+def test_accountant_prefers_provider_usage_and_estimates_otherwise():
+    accountant = TokenAccountant(max_conversations=2)
+    messages = [{"role": "user", "content": "a" * 40}]
+
+    assert accountant.record("c1", "claude", {"input_tokens": 12, "output_tokens": 30}, messages, "sys", "r") == (12, 30)
+    assert accountant.record("c1", "xai", {}, messages, "sys", "b" * 20) == (prompt_tokens(messages, "sys"), 5)
+    assert accountant.record("c1", "claude", {}, messages, "sys", "r", cached=True) == (0, 0)
+
+    usage = accountant.get("c1")
+    assert usage["personas"]["claude"]["calls"] == 2
+    assert usage["personas"]["claude"]["cached_calls"] == 1
+    assert usage["personas"]["xai"]["estimated_calls"] == 1
+    assert usage["total_tokens"] == 12 + 30 + prompt_tokens(messages, "sys") + 5
+
+    accountant.record("c2", "claude", {}, messages, "sys", "r")
+    accountant.record("c3", "claude", {}, messages, "sys", "r")
+    assert accountant.get("c1") == {}
+    assert accountant.get_stats()["conversations"] == 2
+
+
+def test_route_reports_usage_and_trims_history(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_CONTEXT_BUDGET_CLAUDE", "300")
+    monkeypatch.setattr(multi_llm, "response_cache", ResponseCache())
+    monkeypatch.setattr(multi_llm, "token_accountant", TokenAccountant())
+    sent = []
+
+    async def fake_response(self, messages, system_prompt):
+        sent.append(messages)
+        self.usage = {"input_tokens": 250, "output_tokens": 40}
+        return "I am Claude"
+
+    monkeypatch.setattr(multi_llm.ClaudeProvider, "get_response", fake_response)
+    app = FastAPI()
+    app.include_router(multi_llm.router)
+    client = TestClient(app)
+    # Frontend sends context newest-first
+    context = [{"persona": "user", "content": m["content"]} for m in reversed([turn(i) for i in range(12)])]
+    payload = {"persona": "claude", "conversationId": "c1", "context": context, "systemPrompt": "Be kind"}
+
+    first = client.post("/api/multi-llm/response", json=payload).json()
+    second = client.post("/api/multi-llm/response", json=payload).json()
+
+    assert (first["tokensUsed"], first["promptTokens"], first["completionTokens"]) == (290, 250, 40)
+    assert first["trimmedMessages"] > 0
+    assert sent[0][0]["content"].startswith("[Earlier conversation, summarized]")
+    assert sent[0][-1]["content"].startswith("Turn 11 opens here.")
+    assert second["cacheHit"] is True and second["tokensUsed"] == 0
+
+    usage = client.get("/api/multi-llm/conversation/c1/usage").json()
+    assert usage["total_tokens"] == 290
+    assert usage["personas"]["claude"]["calls"] == 2
+    assert usage["trimmed_messages"] == 2 * first["trimmedMessages"]
+    assert client.get("/api/multi-llm/conversation/unknown/usage").status_code == 404
@@ -0,0 +1,248 @@
+"""
+Tests for the in-process NumPy vector store backend.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tec_tgcr.vector_store import NumpyVectorStore, create_vector_store
+
+
+def _onehot(index, dim=8):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[index] = 1.0
+    return vector.tolist()
+
+
+def _populate(store):
+    store.upsert(
+        ids=["a", "b", "c", "d"],
+        embeddings=[_onehot(0), _onehot(1), [1.0, 1.0, 0, 0, 0, 0, 0, 0], _onehot(2)],
+        documents=["alpha", "beta", "alpha-beta", "gamma"],
+        metadatas=[
+            {"source": "x.md", "kind": "note"},
+            {"source": "y.md", "kind": "note"},
+            {"source": "x.md", "kind": "log"},
+            {"source": "z.md", "kind": "log"},
+        ],
+    )
+
+
+def test_query_returns_nearest_first(tmp_path):
+    store = NumpyVectorStore(str(tmp_path / "idx"))
+    _populate(store)
+
+    result = store.query(query_embeddings=[_onehot(0), _onehot(2)], n_results=2)
+
+    assert result["ids"][0] == ["a", "c"]
+    assert result["documents"][0] == ["alpha", "alpha-beta"]
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-6)
+    assert result["distances"][0][1] == pytest.approx(1 - 2 ** -0.5, abs=1e-6)
+    assert result["ids"][1][0] == "d"
+
+
+def test_query_filters(tmp_path):
+    store = NumpyVectorStore(str(tmp_path / "idx"))
+    _populate(store)
+    query = [_onehot(0)]
+
+    assert store.query(query, 4, where={"source": "y.md"})["ids"][0] == ["b"]
+    assert store.query(query, 4, where={"kind": {"$ne": "note"}})["ids"][0] == ["c", "d"]
+    assert set(store.query(query, 4, where={"source": {"$in": ["y.md", "z.md"]}})["ids"][0]) == {"b", "d"}
+    assert store.query(query, 4, where={"$and": [{"source": "x.md"}, {"kind": "log"}]})["ids"][0] == ["c"]
+    assert set(store.query(query, 4, where={"$or": [{"source": "y.md"}, {"kind": "log"}]})["ids"][0]) == {"b", "c", "d"}
+    assert store.query(query, 4, where={"source": "nowhere.md"})["ids"][0] == []
+
+
+def test_upsert_replaces_and_delete_removes(tmp_path):
+    store = NumpyVectorStore(str(tmp_path / "idx"))
+    _populate(store)
+
+    store.upsert(ids=["a"], embeddings=[_onehot(3)], documents=["alpha v2"], metadatas=[{"source": "x.md"}])
+    store.delete(ids=["b", "missing"])
+
+    assert store.count() == 3
+    assert store.get(["a", "b"]) == {"ids": ["a"], "documents": ["alpha v2"], "metadatas": [{"source": "x.md"}]}
+    assert store.query([_onehot(3)], 1)["ids"][0] == ["a"]
+    assert "b" not in store.query([_onehot(1)], 4)["ids"][0]
+
+
+def test_persists_across_reopen(tmp_path):
+    path = str(tmp_path / "idx")
+    _populate(NumpyVectorStore(path))
+
+    reopened = NumpyVectorStore(path)
+
+    assert reopened.count() == 4
+    assert reopened.query([_onehot(1)], 1)["ids"][0] == ["b"]
+
+
+def test_read_only_reader_sees_writer_updates(tmp_path):
+    path = str(tmp_path / "idx")
+    writer = NumpyVectorStore(path)
+    _populate(writer)
+    reader = NumpyVectorStore(path, read_only=True)
+
+    writer.upsert(ids=["e"], embeddings=[_onehot(5)], documents=["epsilon"], metadatas=[{}])
+
+    assert reader.query([_onehot(5)], 1)["ids"][0] == ["e"]
+    with pytest.raises(PermissionError):
+        reader.delete(["e"])
+
+
+def test_growth_and_compaction_keep_results(tmp_path):
+    store = NumpyVectorStore(str(tmp_path / "idx"))
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(3000, 16)).astype(np.float32)
+    ids = [f"doc{i}" for i in range(3000)]
+    store.upsert(ids=ids, embeddings=vectors, documents=ids, metadatas=[{"n": i} for i in range(3000)])
+    assert store.get_stats()["capacity"] >= 3000
+
+    store.delete(ids[:2000])
+
+    assert store.count() == 1000
+    assert store.get_stats()["rows"] == 1000  # compacted
+    assert store.query([vectors[2500]], 1)["ids"][0] == ["doc2500"]
+
+
+def test_float16_storage(tmp_path):
+    store = create_vector_store("numpy", str(tmp_path), "rag", dtype="float16")
+    _populate(store)
+
+    assert store.get_stats()["dtype"] == "float16"
+    assert store.query([_onehot(1)], 1)["ids"][0] == ["b"]
+
+
+def test_unknown_backend_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        create_vector_store("faiss", str(tmp_path), "rag")
+
+
+@pytest.mark.parametrize("quantization", ["int8", "binary"])
+def test_quantized_search_rescored_exactly(tmp_path, quantization):
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(2000, 64)).astype(np.float32)
+    ids = [f"doc{i}" for i in range(2000)]
+    exact = NumpyVectorStore(str(tmp_path / "exact"))
+    quantized = NumpyVectorStore(
+        str(tmp_path / quantization), quantization=quantization,
+        rescore_factor=8, recall_sample_every=1,
+    )
+    for store in (exact, quantized):
+        store.upsert(ids=ids, embeddings=vectors, documents=ids, metadatas=[{}] * 2000)
+
+    queries = vectors[:20] + rng.normal(scale=0.1, size=(20, 64)).astype(np.float32)
+    got = quantized.query(queries, 5)
+    want = exact.query(queries, 5)
+
+    # Top hit is the perturbed source vector, with its exact distance
+    assert [row[0] for row in got["ids"]] == ids[:20]
+    assert got["distances"][0][0] == pytest.approx(want["distances"][0][0], abs=1e-5)
+    stats = quantized.get_stats()
+    assert stats["recall_samples"] == 20
+    # Random gaussians are a worst case for 1-bit codes (ranks 2-5 are near-ties)
+    assert stats["recall_at_k"] >= (0.9 if quantization == "int8" else 0.5)
+    assert stats["bytes_per_vector"]["scan"] == (64 if quantization == "int8" else 8)
+
+
+def test_quantized_codes_survive_reopen_and_growth(tmp_path):
+    path = str(tmp_path / "idx")
+    store = NumpyVectorStore(path, quantization="int8")
+    _populate(store)
+    store.upsert(ids=[f"n{i}" for i in range(1500)], embeddings=np.ones((1500, 8)) * -1,
+                 documents=["n"] * 1500, metadatas=[{}] * 1500)
+
+    reopened = NumpyVectorStore(path, quantization="int8")
+
+    assert reopened.query([_onehot(1)], 1)["ids"][0] == ["b"]
+    # Opening an unquantized index in binary mode rebuilds its codes
+    assert NumpyVectorStore(path, quantization="binary").query([_onehot(2)], 1)["ids"][0] == ["d"]
+
+
+def test_chroma_backend_rejects_quantization(tmp_path):
+    with pytest.raises(ValueError):
+        create_vector_store("chroma", str(tmp_path), "rag", quantization="int8")
+
+
+def test_writes_append_to_the_log(tmp_path):
+    path = tmp_path / "idx"
+    store = NumpyVectorStore(str(path))
+    _populate(store)
+    header = (path / "index.json").read_text()
+
+    for i in range(50):
+        store.upsert(ids=[f"n{i}"], embeddings=[_onehot(i % 8)], documents=[f"note {i}"], metadatas=[{"i": i}])
+    store.delete(["n0"])
+
+    # Single-document writes append one line each; nothing is rewritten
+    assert (path / "index.json").read_text() == header
+    assert len((path / "index.log").read_bytes().splitlines()) == 4 + 50 + 1
+    reopened = NumpyVectorStore(str(path))
+    assert reopened.count() == 53
+    assert reopened.get(["n7", "n0"]) == {"ids": ["n7"], "documents": ["note 7"], "metadatas": [{"i": 7}]}
+
+
+def test_migrates_json_sidecar(tmp_path):
+    import json
+
+    path = tmp_path / "idx"
+    _populate(NumpyVectorStore(str(path)))
+    store = NumpyVectorStore(str(path))
+    sidecar = {"dim": 8, "dtype": "float32", "ids": ["a", None, "c", "d"],
+               "documents": ["alpha", None, "alpha-beta", "gamma"],
+               "metadatas": [{"source": "x.md"}, None, {}, {}]}
+    (path / "index.json").write_text(json.dumps(sidecar))
+    for name in ("index.log", "documents.bin"):
+        (path / name).unlink()
+    del store
+
+    with pytest.raises(ValueError):
+        NumpyVectorStore(str(path), read_only=True)
+    migrated = NumpyVectorStore(str(path))
+
+    assert migrated.count() == 3
+    assert migrated.query([_onehot(0)], 1)["documents"][0] == ["alpha"]
+    assert NumpyVectorStore(str(path), read_only=True).get(["d"])["documents"] == ["gamma"]
+
+
+def test_reader_follows_growth_and_compaction(tmp_path):
+    path = str(tmp_path / "idx")
+    writer = NumpyVectorStore(path)
+    _populate(writer)
+    reader = NumpyVectorStore(path, read_only=True)
+    vectors = np.random.default_rng(2).normal(size=(3000, 8)).astype(np.float32)
+    ids = [f"doc{i}" for i in range(3000)]
+
+    writer.upsert(ids=ids, embeddings=vectors, documents=ids, metadatas=[{}] * 3000)
+    assert reader.query([vectors[10]], 1)["ids"][0] == ["doc10"]
+
+    writer.delete(ids[:2500])  # compacts
+    assert reader.query([vectors[2900]], 1)["documents"][0] == ["doc2900"]
+    assert reader.count() == 504
+
+
+def test_query_during_deletes_never_returns_deleted_rows(tmp_path):
+    import threading
+
+    store = NumpyVectorStore(str(tmp_path / "idx"))
+    vectors = np.random.default_rng(3).normal(size=(4000, 16)).astype(np.float32)
+    ids = [f"doc{i}" for i in range(4000)]
+    store.upsert(ids=ids, embeddings=vectors, documents=ids, metadatas=[{"i": i} for i in range(4000)])
+    done, bad = threading.Event(), []
+
+    def query_loop():
+        while not done.is_set():
+            result = store.query(vectors[:4], 10)
+            for key in ("ids", "documents", "metadatas"):
+                bad.extend(value for row in result[key] for value in row if value is None)
+
+    thread = threading.Thread(target=query_loop)
+    thread.start()
+    for start in range(0, 3000, 50):
+        store.delete(ids[start:start + 50])
+    done.set()
+    thread.join()
+
+    assert bad == []
+    assert store.count() == 1000